@@ -0,0 +1,44 @@
+from timeit import repeat
+from secrets import randbelow
+
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import mnt4_753
+
+N = 20
+
+for name, pairing in [('BLS12_381', bls12_381), ('MNT4_753', mnt4_753)]:
+    for group, generator in [('G1', pairing.g1), ('G2', pairing.g2)]:
+        P = generator.multiply(randbelow(pairing.r))
+        Q = generator.multiply(randbelow(pairing.r))
+        P_projective, Q_projective = P.to_projective().double(), Q.to_projective().double()
+        P_jacobian, Q_jacobian = P.to_jacobian().double(), Q.to_jacobian().double()
+        n = randbelow(pairing.r)
+
+        operations = {
+            'affine add': lambda: P + Q,
+            'affine double': lambda: P + P,
+            'projective add': lambda: P_projective + Q_projective,
+            'projective mixed add': lambda: P_projective.mixed_add(Q),
+            'projective double': lambda: P_projective.double(),
+            'jacobian add': lambda: P_jacobian + Q_jacobian,
+            'jacobian mixed add': lambda: P_jacobian.mixed_add(Q),
+            'jacobian double': lambda: P_jacobian.double(),
+            'multiply': lambda: P.multiply(n),
+        }
+
+        for operation_name, operation in operations.items():
+            number = 1 if operation_name == 'multiply' else N
+            seconds = min(repeat(operation, number=number, repeat=3))
+            print(f'{name} {group} {operation_name:<22} {seconds / number * 1e3:10.3f} ms/op')
+
+        # Batched affine additions share one inversion per batch (per level for tree_sum)
+        points = [generator.multiply(randbelow(pairing.r)) for i in range(100)]
+        pairs = list(zip(points[0::2], points[1::2]))
+        Curve = type(P)
+
+        seconds = min(repeat(lambda: [P + Q for P, Q in pairs], number=1, repeat=3))
+        print(f'{name} {group} {"affine add (50 pairs)":<22} {seconds / len(pairs) * 1e3:10.3f} ms/op')
+        seconds = min(repeat(lambda: Curve.batch_add(pairs), number=1, repeat=3))
+        print(f'{name} {group} {"batch add (50 pairs)":<22} {seconds / len(pairs) * 1e3:10.3f} ms/op')
+        seconds = min(repeat(lambda: Curve.tree_sum(points), number=1, repeat=3))
+        print(f'{name} {group} {"tree sum (100 points)":<22} {seconds / len(points) * 1e3:10.3f} ms/op')
@@ -0,0 +1,15 @@
+from timeit import repeat
+from secrets import randbelow
+
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381
+
+N = 10
+
+# Scalar multiplication with and without the endomorphism of the curve, on random points of the groups
+for group, generator in [('G1', bls12_381.g1), ('G2', bls12_381.g2)]:
+    P = generator.multiply(randbelow(bls12_381.r))
+    n = randbelow(bls12_381.r)
+
+    multiply_seconds = min(repeat(lambda: P.multiply(n), number=N, repeat=5))
+    endomorphism_seconds = min(repeat(lambda: P.multiply_with_endomorphism(n), number=N, repeat=5))
+    print(f'BLS12_381 {group} multiply {multiply_seconds / N * 1e3:8.2f} ms   multiply_with_endomorphism {endomorphism_seconds / N * 1e3:8.2f} ms   speedup {multiply_seconds / endomorphism_seconds:5.2f}x')
@@ -0,0 +1,30 @@
+from timeit import repeat
+
+from elliptic_curves.fields.exponentiation import PowerTable
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381, Fq12, Fr
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import mnt4_753, Fq4
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import Fr as Fr_mnt4
+
+N = 3
+
+for name, pairing, Field, ScalarField in [('BLS12_381', bls12_381, Fq12, Fr), ('MNT4_753', mnt4_753, Fq4, Fr_mnt4)]:
+    f = Field.generate_random_point()
+    gt = pairing.easy_exponentiation(Field.generate_random_point())
+    n = ScalarField.generate_random_point().x
+
+    # A window of size one is the plain square-and-multiply
+    binary = PowerTable(f, 1, Field.square)
+    table = f.power_table(n.bit_length())
+    cyclotomic_table = gt.cyclotomic_power_table(n.bit_length())
+
+    operations = {
+        'binary power': lambda: binary.power(n),
+        'windowed power': lambda: f.power(n),
+        'power with table': lambda: table.power(n),
+        'cyclotomic_exp': lambda: gt.cyclotomic_exp(n),
+        'cyclotomic with table': lambda: cyclotomic_table.power(n),
+    }
+
+    for operation_name, operation in operations.items():
+        seconds = min(repeat(operation, number=N, repeat=3))
+        print(f'{name} {operation_name:<22} {seconds / N * 1e3:10.2f} ms/op')
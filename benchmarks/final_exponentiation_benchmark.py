@@ -0,0 +1,20 @@
+from timeit import repeat
+
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381, Fq12
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import mnt4_753, Fq4
+
+N = 3
+
+for name, pairing, Field in [('BLS12_381', bls12_381, Fq12), ('MNT4_753', mnt4_753, Fq4)]:
+    f = Field.generate_random_point()
+    easy = pairing.easy_exponentiation(f)
+
+    operations = {
+        'frobenius': lambda: f.frobenius(1),
+        'easy_exponentiation': lambda: pairing.easy_exponentiation(f),
+        'hard_exponentiation': lambda: pairing.hard_exponentiation(easy),
+    }
+
+    for operation_name, operation in operations.items():
+        seconds = min(repeat(operation, number=N, repeat=3))
+        print(f'{name} {operation_name:<20} {seconds / N * 1e3:10.2f} ms/op')
@@ -0,0 +1,27 @@
+from timeit import repeat
+from time import perf_counter
+from secrets import randbelow
+
+from elliptic_curves.models.fixed_base import FixedBaseTable
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import mnt4_753
+
+N = 5
+
+for name, pairing in [('BLS12_381', bls12_381), ('MNT4_753', mnt4_753)]:
+    for group, generator in [('G1', pairing.g1), ('G2', pairing.g2)]:
+        # Copy of the generator without the default table
+        base = type(generator)(generator.x, generator.y)
+        n = randbelow(pairing.r)
+
+        seconds = min(repeat(lambda: base.multiply(n), number=N, repeat=3))
+        print(f'{name} {group} no table {"":<27} multiply {seconds / N * 1e3:8.2f} ms')
+
+        for window in [2, 4, 6, 8]:
+            start = perf_counter()
+            table = FixedBaseTable(base, window, pairing.r)
+            build = perf_counter() - start
+            size = len(table.to_bytes())
+
+            seconds = min(repeat(lambda: table.multiply(n), number=N, repeat=3))
+            print(f'{name} {group} window {window} build {build * 1e3:8.1f} ms {size / 1024:8.1f} KiB multiply {seconds / N * 1e3:8.2f} ms')
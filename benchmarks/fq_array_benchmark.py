@@ -0,0 +1,30 @@
+from timeit import repeat
+
+from elliptic_curves.fields.fq_array import fq_array_from_base_field
+from elliptic_curves.instantiations.bls12_381.bls12_381 import Fq as Fq_bls12_381
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import Fq as Fq_mnt4_753
+
+# Throughput of the vectorised FqArray against the scalar Fq, in ns per element
+for name, Fq in [('BLS12_381', Fq_bls12_381), ('MNT4_753', Fq_mnt4_753)]:
+    FqArray = fq_array_from_base_field(Fq)
+
+    for N in [100, 1000, 10000]:
+        a = [Fq.generate_random_point() for i in range(N)]
+        b = [Fq.generate_random_point() for i in range(N)]
+        A = FqArray.from_elements(a)
+        B = FqArray.from_elements(b)
+
+        operations = {
+            'add': (lambda: [x + y for x, y in zip(a, b)], lambda: A + B),
+            'sub': (lambda: [x - y for x, y in zip(a, b)], lambda: A - B),
+            'mul': (lambda: [x * y for x, y in zip(a, b)], lambda: A * B),
+            'square': (lambda: [x.square() for x in a], lambda: A.square()),
+            'batch_invert': (lambda: Fq.batch_invert(a), lambda: A.batch_invert()),
+            'conversion': (lambda: a[:], lambda: FqArray.from_elements(a).to_elements()),
+        }
+
+        for operation, (scalar, vectorised) in operations.items():
+            number = max(1, 10000 // N)
+            scalar_seconds = min(repeat(scalar, number=number, repeat=5))
+            vectorised_seconds = min(repeat(vectorised, number=number, repeat=5))
+            print(f'{name} N={N:<6} {operation:<13} scalar {scalar_seconds / number / N * 1e9:8.1f} ns/el   FqArray {vectorised_seconds / number / N * 1e9:8.1f} ns/el')
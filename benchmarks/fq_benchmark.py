@@ -0,0 +1,57 @@
+from timeit import repeat
+from copy import deepcopy
+
+from elliptic_curves.instantiations.bls12_381.bls12_381 import Fq
+
+N = 100000
+
+class DictFq:
+    """
+    The previous representation of Fq (an instance __dict__, a reduction in every constructor), kept here as the baseline of the comparison
+    """
+    MODULUS = Fq.MODULUS
+
+    def __init__(self, x: int):
+        self.x = x % DictFq.MODULUS
+
+    def __eq__(x,y):
+        return x.__dict__ == y.__dict__
+
+    def __add__(x,y):
+        assert(type(x) == type(y))
+        return DictFq(x.x + y.x)
+
+    def __sub__(x,y):
+        assert(type(x) == type(y))
+        return DictFq(x.x - y.x)
+
+    def __neg__(self):
+        return DictFq(-self.x)
+
+    def __mul__(x,y):
+        return DictFq(x.x * y.x)
+
+    def frobenius(self, n: int):
+        return deepcopy(self)
+
+a = Fq.generate_random_point()
+b = Fq.generate_random_point()
+a_dict = DictFq(a.x)
+b_dict = DictFq(b.x)
+
+def operations(a, b):
+    return {
+        'add': lambda: a + b,
+        'sub': lambda: a - b,
+        'neg': lambda: -a,
+        'mul': lambda: a * b,
+        'eq': lambda: a == b,
+        'frobenius': lambda: a.frobenius(1),
+        'deepcopy': lambda: deepcopy(a),
+    }
+
+# Previous representation against the current one, in ns per operation
+for (name, before), after in zip(operations(a_dict, b_dict).items(), operations(a, b).values()):
+    before_seconds = min(repeat(before, number=N, repeat=5))
+    after_seconds = min(repeat(after, number=N, repeat=5))
+    print(f'Fq {name:<10} before {before_seconds / N * 1e9:8.1f} ns/op   after {after_seconds / N * 1e9:8.1f} ns/op')
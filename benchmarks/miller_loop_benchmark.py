@@ -0,0 +1,32 @@
+from timeit import repeat
+
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381, Fr as Fr_bls12_381
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import mnt4_753, Fr as Fr_mnt4_753
+
+N = 3
+
+# Affine Miller loops (with and without denominator elimination) against the inversion-free projective one
+for name, pairing, Fr in [('BLS12_381', bls12_381, Fr_bls12_381), ('MNT4_753', mnt4_753, Fr_mnt4_753)]:
+    P = pairing.g1.multiply(Fr.generate_random_point().x)
+    Q = pairing.g2.multiply(Fr.generate_random_point().x)
+    prepared = pairing.prepare_g2(Q)
+
+    operations = {
+        'base_curve': lambda: pairing.miller_loop_on_base_curve(P, Q),
+        'base_curve_quadratic': lambda: pairing.miller_loop_on_base_curve(P, Q, 'quadratic'),
+        'twisted_curve_quadratic': lambda: pairing.miller_loop_on_twisted_curve(P, Q, 'quadratic'),
+        'projective': lambda: pairing.miller_loop(P, Q),
+        'pairing': lambda: pairing.pairing(P, Q),
+        # The lines of a fixed Q are computed once by prepare_g2
+        'prepared_g2': lambda: pairing.multi_miller_loop([(P, prepared)]),
+        # Three pairs: three loops multiplied together, and the loop with a shared accumulator
+        'projective_x3': lambda: pairing.miller_loop(P, Q) * pairing.miller_loop(P, Q) * pairing.miller_loop(P, Q),
+        'multi_miller_loop_x3': lambda: pairing.multi_miller_loop([(P, Q)] * 3),
+        # Checking that a product of three pairings is one: three final exponentiations, and a single one
+        'pairing_x3_is_one': lambda: pairing.pairing(P, Q) * pairing.pairing(P, Q) * pairing.pairing(-P, Q) == pairing.miller_output_type.identity(),
+        'pairing_product_is_one_x3': lambda: pairing.pairing_product_is_one([(P, Q), (P, Q), (-P, Q)]),
+    }
+
+    for operation_name, operation in operations.items():
+        seconds = min(repeat(operation, number=N, repeat=3))
+        print(f'{name} {operation_name:<24} {seconds / N * 1e3:10.2f} ms/op')
@@ -0,0 +1,31 @@
+from timeit import repeat
+from secrets import randbelow
+
+from elliptic_curves.models.ec import msm
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import mnt4_753
+
+# msm against the sum of separate multiplications, in ms per point. The separate multiplications are only timed up to 1000 points
+for name, pairing in [('BLS12_381', bls12_381), ('MNT4_753', mnt4_753)]:
+    # Copy of the generator without the default table
+    generator = type(pairing.g1)(pairing.g1.x, pairing.g1.y)
+
+    # Consecutive multiples of a random point, to build many points quickly
+    points = [generator.multiply(randbelow(pairing.r))]
+    for i in range(10**4 - 1):
+        points.append(points[-1] + points[0])
+    scalars = [randbelow(pairing.r) for i in range(10**4)]
+
+    for N in [1, 10, 100, 1000, 10000]:
+        msm_seconds = min(repeat(lambda: msm(points[:N], scalars[:N]), number=1, repeat=3 if N < 10000 else 1))
+
+        if N <= 1000:
+            def separate():
+                result = type(generator).point_at_infinity()
+                for P, n in zip(points[:N], scalars[:N]):
+                    result = result + P.multiply(n)
+                return result
+            separate_seconds = min(repeat(separate, number=1, repeat=3 if N < 1000 else 1))
+            print(f'{name} G1 N={N:<6} separate {separate_seconds / N * 1e3:8.2f} ms/point   msm {msm_seconds / N * 1e3:8.2f} ms/point')
+        else:
+            print(f'{name} G1 N={N:<6} separate {"":>8}            msm {msm_seconds / N * 1e3:8.2f} ms/point')
@@ -0,0 +1,18 @@
+from timeit import repeat
+from secrets import randbelow
+
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import mnt4_753
+
+N = 20
+
+# Size and decoding time of a Groth16 proof in the uncompressed and compressed modes
+for name, pairing in [('BLS12_381', bls12_381), ('MNT4_753', mnt4_753)]:
+    proof = {'a': pairing.g1.multiply(randbelow(pairing.r)), 'b': pairing.g2.multiply(randbelow(pairing.r)), 'c': pairing.g1.multiply(randbelow(pairing.r))}
+
+    for compressed in [False, True]:
+        serialised = pairing.serialise_proof(proof, compressed)
+        seconds = min(repeat(lambda: pairing.deserialise_proof(serialised, compressed = compressed), number=N, repeat=3))
+        validated_seconds = min(repeat(lambda: pairing.deserialise_proof(serialised, validate = True, compressed = compressed), number=N, repeat=3))
+        mode = 'compressed' if compressed else 'uncompressed'
+        print(f'{name} {mode:<12} {len(serialised):5} bytes/proof   decode {seconds / N * 1e3:8.2f} ms   decode and validate {validated_seconds / N * 1e3:8.2f} ms')
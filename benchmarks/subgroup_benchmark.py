@@ -0,0 +1,43 @@
+from timeit import repeat
+from secrets import randbelow
+
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import mnt4_753
+
+N = 5
+
+def multiply_unreduced(P, n: int):
+    """
+    n * P with double-and-add in Jacobian coordinates. Unlike multiply, n is not reduced modulo the order of the curve (which would turn
+    multiplication by r into a no-op when the cofactor is 1)
+    """
+    R = P.to_jacobian()
+    for bit in bin(n)[3:]:
+        R = R.double()
+        if bit == '1':
+            R = R.mixed_add(P)
+
+    return R
+
+# Subgroup membership: generic check (multiplication by r) against is_in_subgroup, and batched check of 100 points, in ms per element.
+# Cofactor clearing: multiplication by the cofactor against clear_cofactor
+for name, pairing in [('BLS12_381', bls12_381), ('MNT4_753', mnt4_753)]:
+    for group, generator in [('G1', pairing.g1), ('G2', pairing.g2)]:
+        P = generator.multiply(randbelow(pairing.r))
+        points = [generator.multiply(randbelow(pairing.r)) for i in range(100)]
+        Curve = type(P)
+
+        generic_seconds = min(repeat(lambda: multiply_unreduced(P, pairing.r).is_infinity(), number=N, repeat=3))
+        seconds = min(repeat(lambda: P.is_in_subgroup(), number=N, repeat=3))
+        batch_seconds = min(repeat(lambda: Curve.batch_is_in_subgroup(points), number=1, repeat=3))
+        print(f'{name} {group} multiply(r) {generic_seconds / N * 1e3:8.2f} ms   is_in_subgroup {seconds / N * 1e3:8.2f} ms   batch_is_in_subgroup {batch_seconds / len(points) * 1e3:8.2f} ms/point')
+
+        cofactor = pairing.h1 if group == 'G1' else pairing.h2
+        generic_seconds = min(repeat(lambda: P.to_jacobian().multiply(cofactor).to_affine(), number=N, repeat=3))
+        seconds = min(repeat(lambda: P.clear_cofactor(), number=N, repeat=3))
+        print(f'{name} {group} multiply(h) {generic_seconds / N * 1e3:8.2f} ms   clear_cofactor {seconds / N * 1e3:8.2f} ms')
+
+    f = pairing.pairing(pairing.g1.multiply(randbelow(pairing.r)), pairing.g2)
+    generic_seconds = min(repeat(lambda: f.power(pairing.r) == type(f).identity(), number=N, repeat=3))
+    seconds = min(repeat(lambda: f.is_in_subgroup(), number=N, repeat=3))
+    print(f'{name} GT power(r)  {generic_seconds / N * 1e3:8.2f} ms   is_in_subgroup {seconds / N * 1e3:8.2f} ms')
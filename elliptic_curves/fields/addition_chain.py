@@ -0,0 +1,105 @@
+from elliptic_curves.fields.exponentiation import sliding_window_digits, wnaf_digits
+
+class AdditionChain:
+    """
+    Program computing x^n for a fixed exponent n, obtained by compile_chain.
+
+    The program is made of the odd powers of x to precompute, the initial odd power, and a list of steps (squarings, digit):
+    each step squares the accumulator squarings times, and then multiplies it by x^digit (digit is odd, and negative digits
+    multiply by the inverse of x^|digit|). If digit is 0, the step only squares the accumulator.
+    """
+
+    def __init__(self, n: int, digits: list[int]):
+        """
+        Build the program from the (signed) digits of abs(n), LSB to MSB
+        """
+        assert(n != 0)
+
+        self.n = n
+        self.signed = any(digit < 0 for digit in digits)
+
+        non_zero = [(i, digit) for i, digit in enumerate(digits) if digit != 0][::-1]
+
+        self.initial_digit = non_zero[0][1]
+        self.steps = []
+        for (i, _), (j, digit) in zip(non_zero, non_zero[1:]):
+            self.steps.append((i - j, digit))
+        if non_zero[-1][0] != 0:
+            self.steps.append((non_zero[-1][0], 0))
+
+        self.odd_powers = sorted(set(abs(digit) for _, digit in non_zero))
+
+        return
+
+    def n_squarings(self) -> int:
+        """
+        Number of squarings performed by the program, including the precomputation
+        """
+        return sum(squarings for squarings, _ in self.steps) + (1 if self.odd_powers[-1] > 1 else 0)
+
+    def n_multiplications(self) -> int:
+        """
+        Number of multiplications performed by the program, including the precomputation
+        """
+        return len([digit for _, digit in self.steps if digit != 0]) + (self.odd_powers[-1] - 1) // 2
+
+    def evaluate(self, base, square, inverse = None, repeated_square = None):
+        """
+        Compute base^n.
+
+        square squares an element, inverse inverts it (it is only used if the program has negative digits or n is negative), and
+        repeated_square(x,k) computes x^(2^k). If repeated_square is None, it is computed with k calls to square
+        """
+        # Precompute the odd powers x^1, x^3, ..., x^max(odd_powers)
+        powers = {1: base}
+        if self.odd_powers[-1] > 1:
+            base_squared = square(base)
+            power = base
+            for k in range(3, self.odd_powers[-1] + 1, 2):
+                power = power * base_squared
+                if k in self.odd_powers:
+                    powers[k] = power
+
+        # With signed digits, x^-n is computed by swapping the odd powers with their inverses
+        inverses = {}
+        if self.signed:
+            inverses = {k: inverse(power) for k, power in powers.items()}
+            if self.n < 0:
+                powers, inverses = inverses, powers
+
+        result = powers[self.initial_digit] if self.initial_digit > 0 else inverses[-self.initial_digit]
+        for squarings, digit in self.steps:
+            if repeated_square is None:
+                for i in range(squarings):
+                    result = square(result)
+            else:
+                result = repeated_square(result, squarings)
+            if digit > 0:
+                result = result * powers[digit]
+            elif digit < 0:
+                result = result * inverses[-digit]
+
+        if self.n < 0 and not self.signed:
+            result = inverse(result)
+
+        return result
+
+    def __repr__(self):
+        return f'AdditionChain(n={self.n}, squarings={self.n_squarings()}, multiplications={self.n_multiplications()})'
+
+def compile_chain(n: int, signed: bool = True, max_window: int = 8) -> AdditionChain:
+    """
+    Compile the fixed exponent n into an AdditionChain. Every window size up to max_window is tried, both with an unsigned sliding window
+    and (if signed is True) with a signed non-adjacent form, and the program with the fewest multiplications plus squarings is returned.
+
+    Use signed = True only if inverses are cheap (e.g., conjugation in the cyclotomic subgroup)
+    """
+    assert(n != 0)
+
+    candidates = []
+    for window in range(1, max_window + 1):
+        candidates.append(AdditionChain(n, sliding_window_digits(abs(n), window)))
+        if signed:
+            candidates.append(AdditionChain(n, wnaf_digits(abs(n), window + 1)))
+
+    return min(candidates, key = lambda chain: chain.n_squarings() + chain.n_multiplications())
@@ -1,6 +1,10 @@
 from copy import deepcopy
 from math import gcd
 
+from elliptic_curves.fields.exponentiation import PowerTable, window_size
+
+from elliptic_curves.fields.quadratic_extension import frobenius_coefficients, is_generator_of_base_field, montgomery_batch_invert
+
 # The following class is not meant to be used by the user. It should be re-exported using the function below
 class CubicExtension:
     """
@@ -11,6 +15,9 @@ class CubicExtension:
     BASE_FIELD = None
     EXTENSION_DEGREE = None
     EXTENSION_DEGREE_OVER_BASE_FIELD = None
+    # FROBENIUS_COEFFICIENTS_X1[n] = NON_RESIDUE^((q^n-1)/3), FROBENIUS_COEFFICIENTS_X2[n] = NON_RESIDUE^(2(q^n-1)/3)
+    FROBENIUS_COEFFICIENTS_X1 = None
+    FROBENIUS_COEFFICIENTS_X2 = None
 
     def __init__(self, x0, x1, x2):
         self.x0 = x0
@@ -47,15 +54,18 @@ class CubicExtension:
         if gcd(Field.EXTENSION_DEGREE,Field_Y.EXTENSION_DEGREE) == 1 and Field_Y.EXTENSION_DEGREE != 1:
             raise ValueError('Multiplication not implemented')
 
-        if Field_Y == Field: # Same type
+        if Field_Y == Field: # Same type, Karatsuba multiplication
+            v0 = x.x0 * y.x0
+            v1 = x.x1 * y.x1
+            v2 = x.x2 * y.x2
             return Field(
-            x.x0 * y.x0 + (x.x1 * y.x2  + x.x2 * y.x1) * Field.NON_RESIDUE,
-            x.x0 * y.x1 + x.x1 * y.x0 + x.x2 * y.x2 * Field.NON_RESIDUE, 
-            x.x0 * y.x2 + x.x1 * y.x1 + x.x2 * y.x0
+            v0 + Field.mul_by_non_residue((x.x1 + x.x2) * (y.x1 + y.x2) - v1 - v2),
+            (x.x0 + x.x1) * (y.x0 + y.x1) - v0 - v1 + Field.mul_by_non_residue(v2),
+            (x.x0 + x.x2) * (y.x0 + y.x2) - v0 - v2 + v1
             )
         else:
-            a = deepcopy(x)
-            b = deepcopy(y)
+            a = x
+            b = y
             # Ensure first element is in the largest extension
             if Field.EXTENSION_DEGREE < Field_Y.EXTENSION_DEGREE:
                 a, b = b, a
@@ -78,18 +88,76 @@ class CubicExtension:
     def __repr__(self):
         return f'({self.x0},{self.x1},{self.x2})'
 
+    def square(self):
+        """
+        Chung-Hasan SQR2 squaring
+        """
+        Field = type(self)
+
+        s0 = self.x0.square()
+        s1 = self.x0 * self.x1
+        s1 = s1 + s1
+        s2 = (self.x0 - self.x1 + self.x2).square()
+        s3 = self.x1 * self.x2
+        s3 = s3 + s3
+        s4 = self.x2.square()
+
+        return Field(
+            s0 + Field.mul_by_non_residue(s3),
+            s1 + Field.mul_by_non_residue(s4),
+            s1 + s2 + s3 - s0 - s4
+        )
+
+    def mul_by_generator(self):
+        """
+        Multiplication by the generator v of the extension: (x0 + x1 v + x2 v^2) * v = NON_RESIDUE * x2 + x0 v + x1 v^2
+        """
+        Field = type(self)
+
+        return Field(Field.mul_by_non_residue(self.x2), self.x0, self.x1)
+
+    def mul_by_01(self, c0, c1):
+        """
+        Multiplication by the sparse element c0 + c1 v, with c0 and c1 in the base field: 5 multiplications in the base field
+        """
+        Field = type(self)
+
+        v0 = self.x0 * c0
+        v1 = self.x1 * c1
+
+        return Field(
+            v0 + Field.mul_by_non_residue(self.x2 * c1),
+            (self.x0 + self.x1) * (c0 + c1) - v0 - v1,
+            self.x2 * c0 + v1
+        )
+
+    def mul_by_1(self, c1):
+        """
+        Multiplication by the sparse element c1 v, with c1 in the base field: 3 multiplications in the base field
+        """
+        Field = type(self)
+
+        return Field(Field.mul_by_non_residue(self.x2 * c1), self.x0 * c1, self.x1 * c1)
+
     def invert(self):
         assert(not self.is_zero())
         Field = type(self)
 
-        a = self.x0 * self.x0 - self.x1 * self.x2 * Field.NON_RESIDUE
-        b = self.x2 * self.x2 * Field.NON_RESIDUE - self.x0 * self.x1
-        c = self.x1 * self.x1 - self.x0 * self.x2
-        d = self.x1 * Field.NON_RESIDUE * c + self.x0 * a + self.x2 * Field.NON_RESIDUE * b
+        a = self.x0.square() - Field.mul_by_non_residue(self.x1 * self.x2)
+        b = Field.mul_by_non_residue(self.x2.square()) - self.x0 * self.x1
+        c = self.x1.square() - self.x0 * self.x2
+        d = Field.mul_by_non_residue(self.x1 * c + self.x2 * b) + self.x0 * a
         e = d.invert()
 
         return Field(a * e, b * e, c * e)
 
+    def batch_invert(elements: list):
+        """
+        Invert a list of elements with a single field inversion (Montgomery's trick, see montgomery_batch_invert).
+        Zero elements are returned unchanged
+        """
+        return montgomery_batch_invert(elements)
+
     def identity():
         return CubicExtension(CubicExtension.BASE_FIELD.identity(),CubicExtension.BASE_FIELD.zero(),CubicExtension.BASE_FIELD.zero())
 
@@ -106,6 +174,12 @@ class CubicExtension:
     def v():
         return CubicExtension(CubicExtension.BASE_FIELD.zero(),CubicExtension.BASE_FIELD.identity(),CubicExtension.BASE_FIELD.zero())
 
+    def mul_by_non_residue(x):
+        """
+        Multiply the element x of BASE_FIELD by NON_RESIDUE
+        """
+        return x * CubicExtension.NON_RESIDUE
+
     def generate_random_point():
         return CubicExtension(
             CubicExtension.BASE_FIELD.generate_random_point(),
@@ -124,28 +198,38 @@ class CubicExtension:
         if n == 0:
             return Field.identity()
         
-        val = deepcopy(self)
-        result = Field.identity()
+        val = self
 
         if n < 0:
             n = -n
             val = val.invert()
 
-        while n > 0:
-            if n % 2 == 1:
-                result = result * val
-            val = val * val
-            n = n // 2
+        return val.power_table(n.bit_length()).power(n)
+
+    def power_by_chain(self, chain):
+        """
+        Compute self^chain.n, where chain is an AdditionChain obtained with compile_chain (preferably with signed = False, as inverses are expensive)
+        """
+        Field = type(self)
 
-        return result
+        return chain.evaluate(self, Field.square, Field.invert)
+
+    def power_table(self, bit_length: int):
+        """
+        Precompute the odd powers of self used to raise self to exponents of (at most) bit_length bits with a sliding window.
+        The table can be reused for many exponents: table.power(n) = self.power(n)
+        """
+        Field = type(self)
+
+        return PowerTable(self, window_size(bit_length), Field.square)
     
     def frobenius(self, n:int):
         """
         Frobenius: f -> f^q^n
         """
         Field = type(self)
-        gamma_x1 = Field.NON_RESIDUE.power((Field.get_modulus()**(n % Field.EXTENSION_DEGREE)-1)//3)
-        gamma_x2 = Field.NON_RESIDUE.power(2*(Field.get_modulus()**(n % Field.EXTENSION_DEGREE)-1)//3)
+        gamma_x1 = Field.FROBENIUS_COEFFICIENTS_X1[n % Field.EXTENSION_DEGREE]
+        gamma_x2 = Field.FROBENIUS_COEFFICIENTS_X2[n % Field.EXTENSION_DEGREE]
 
         return Field(
             self.x0.frobenius(n),
@@ -219,17 +303,46 @@ class CubicExtension:
             index += length * CubicExtension.EXTENSION_DEGREE//3
         
         return CubicExtension(tmp[0],tmp[1],tmp[2])
+
+    def from_buffer(buf, offset: int = 0):
+        """
+        Reads the element of CubicExtension starting at offset in buf (bytes, bytearray, memoryview, mmap, ...) without copying the buffer
+        """
+        length = (CubicExtension.get_modulus().bit_length() + 8)//8 * CubicExtension.EXTENSION_DEGREE//3
+        x0 = CubicExtension.BASE_FIELD.from_buffer(buf, offset)
+        x1 = CubicExtension.BASE_FIELD.from_buffer(buf, offset + length)
+        x2 = CubicExtension.BASE_FIELD.from_buffer(buf, offset + 2 * length)
+
+        return CubicExtension(x0,x1,x2)
+
+    def from_buffer_array(buf, count: int, offset: int = 0):
+        """
+        Reads count contiguous elements of CubicExtension starting at offset in buf, in one pass and without copying the buffer
+        """
+        coordinates = CubicExtension.BASE_FIELD.from_buffer_array(buf, 3 * count, offset)
+
+        return [CubicExtension(coordinates[i],coordinates[i+1],coordinates[i+2]) for i in range(0,3 * count,3)]
+
+    def to_bytes(self) -> bytes:
+        """
+        Little-endian byte representation of the CubicExtension element (same layout as serialise). The order is: x0, x1, x2
+        """
+        return self.x0.to_bytes() + self.x1.to_bytes() + self.x2.to_bytes()
     
 def cubic_extension_from_base_field_and_non_residue(base_field, non_residue):
     """
     Function to export class CubicExtension with BASE_FIELD = base_field and NON_RESIDUE = non_residue
     """
 
+    non_residue_is_generator = is_generator_of_base_field(base_field, non_residue)
+
     class CubicExtensionField(CubicExtension):
         NON_RESIDUE = non_residue
         BASE_FIELD = base_field
         EXTENSION_DEGREE = 3 * BASE_FIELD.EXTENSION_DEGREE
         EXTENSION_DEGREE_OVER_BASE_FIELD = 3
+        FROBENIUS_COEFFICIENTS_X1 = frobenius_coefficients(non_residue, base_field.get_modulus(), EXTENSION_DEGREE, 1, 3)
+        FROBENIUS_COEFFICIENTS_X2 = frobenius_coefficients(non_residue, base_field.get_modulus(), EXTENSION_DEGREE, 2, 3)
 
         def identity():
             return CubicExtensionField(CubicExtensionField.BASE_FIELD.identity(),CubicExtensionField.BASE_FIELD.zero(),CubicExtensionField.BASE_FIELD.zero())
@@ -243,6 +356,15 @@ def cubic_extension_from_base_field_and_non_residue(base_field, non_residue):
                 CubicExtensionField.BASE_FIELD.identity(),
                 CubicExtensionField.BASE_FIELD.zero()
                 )
+
+        def mul_by_non_residue(x):
+            """
+            Multiply the element x of BASE_FIELD by NON_RESIDUE
+            """
+            if non_residue_is_generator:
+                return x.mul_by_generator()
+            else:
+                return x * CubicExtensionField.NON_RESIDUE
         
         def generate_random_point():
             x0 = CubicExtensionField.BASE_FIELD.generate_random_point()
@@ -301,7 +423,26 @@ def cubic_extension_from_base_field_and_non_residue(base_field, non_residue):
                 index += length * CubicExtensionField.EXTENSION_DEGREE//3
             
             return CubicExtensionField(tmp[0],tmp[1],tmp[2])
-        
+
+        def from_buffer(buf, offset: int = 0):
+            """
+            Reads the element of CubicExtensionField starting at offset in buf (bytes, bytearray, memoryview, mmap, ...) without copying the buffer
+            """
+            length = (CubicExtensionField.get_modulus().bit_length() + 8)//8 * CubicExtensionField.EXTENSION_DEGREE//3
+            x0 = CubicExtensionField.BASE_FIELD.from_buffer(buf, offset)
+            x1 = CubicExtensionField.BASE_FIELD.from_buffer(buf, offset + length)
+            x2 = CubicExtensionField.BASE_FIELD.from_buffer(buf, offset + 2 * length)
+
+            return CubicExtensionField(x0,x1,x2)
+
+        def from_buffer_array(buf, count: int, offset: int = 0):
+            """
+            Reads count contiguous elements of CubicExtensionField starting at offset in buf, in one pass and without copying the buffer
+            """
+            coordinates = CubicExtensionField.BASE_FIELD.from_buffer_array(buf, 3 * count, offset)
+
+            return [CubicExtensionField(coordinates[i],coordinates[i+1],coordinates[i+2]) for i in range(0,3 * count,3)]
+
     return CubicExtensionField
 
         
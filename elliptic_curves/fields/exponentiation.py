@@ -0,0 +1,129 @@
+def window_size(bit_length: int) -> int:
+    """
+    Window size minimising the number of multiplications in a sliding window exponentiation with an exponent of bit_length bits
+    """
+    if bit_length <= 8:
+        return 1
+    elif bit_length <= 24:
+        return 2
+    elif bit_length <= 80:
+        return 3
+    elif bit_length <= 240:
+        return 4
+    elif bit_length <= 672:
+        return 5
+    else:
+        return 6
+
+def sliding_window_digits(n: int, window: int) -> list[int]:
+    """
+    Recode the positive integer n in digits, LSB to MSB: n = sum digits[i] * 2^i, every non-zero digit is odd and smaller than 2^window,
+    and every non-zero digit is followed by at least window-1 zero digits
+    """
+    digits = []
+    while n > 0:
+        if n % 2 == 1:
+            digit = n % (1 << window)
+            n -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        n = n >> 1
+
+    return digits
+
+def wnaf_digits(n: int, width: int) -> list[int]:
+    """
+    Width-w non-adjacent form of the positive integer n, LSB to MSB: n = sum digits[i] * 2^i, every non-zero digit is odd and in
+    absolute value smaller than 2^(width-1), and every non-zero digit is followed by at least width-1 zero digits
+    """
+    assert(width >= 2)
+
+    digits = []
+    while n > 0:
+        if n % 2 == 1:
+            digit = n % (1 << width)
+            if digit >= (1 << (width - 1)):
+                digit -= (1 << width)
+            n -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        n = n >> 1
+
+    return digits
+
+def signed_digits(n: int, window: int) -> list[int]:
+    """
+    Recode the positive integer n in signed digits of base 2^window, LSB to MSB: n = sum digits[i] * 2^(window * i), with
+    -2^(window-1) <= digits[i] <= 2^(window-1)
+    """
+    digits = []
+    while n > 0:
+        digit = n & ((1 << window) - 1)
+        if digit > (1 << (window - 1)):
+            digit -= 1 << window
+        digits.append(digit)
+        n = (n - digit) >> window
+
+    return digits
+
+class PowerTable:
+    """
+    Precomputed odd powers base, base^3, base^5, ... used to compute base^n with windowed exponentiation.
+
+    square is the function used to square elements (e.g., Field.square, or Field.cyclotomic_square in the cyclotomic subgroup).
+    If inverse is given (e.g., Field.conjugate in the cyclotomic subgroup), it must be cheap: the exponents are recoded in width-(window+1)
+    non-adjacent form, and negative digits multiply by the inverses of the odd powers. Otherwise, the exponents are recoded with a sliding
+    window of size window, and negative exponents cost an inversion of the result.
+
+    A table can be reused to raise the same base to many exponents.
+    """
+
+    def __init__(self, base, window: int, square, inverse = None):
+        self.base = base
+        self.window = window
+        self.square = square
+        self.inverse = inverse
+
+        # powers[k] = base^(2k+1), for k < 2^(window-1)
+        self.powers = [base]
+        if window > 1:
+            base_squared = square(base)
+            for k in range(1,1 << (window - 1)):
+                self.powers.append(self.powers[-1] * base_squared)
+
+        if inverse is not None:
+            self.inverses = [inverse(power) for power in self.powers]
+
+        return
+
+    def power(self, n: int):
+        """
+        Compute base^n
+        """
+        Field = type(self.base)
+
+        if n == 0:
+            return Field.identity()
+
+        if self.inverse is None:
+            if n < 0:
+                return self.power(-n).invert()
+            digits = sliding_window_digits(n, self.window)
+            positive, negative = self.powers, None
+        else:
+            digits = wnaf_digits(abs(n), self.window + 1)
+            positive, negative = (self.powers, self.inverses) if n > 0 else (self.inverses, self.powers)
+
+        square = self.square
+        result = None
+        for digit in digits[::-1]:
+            if result is not None:
+                result = square(result)
+            if digit > 0:
+                result = positive[digit >> 1] if result is None else result * positive[digit >> 1]
+            elif digit < 0:
+                result = negative[(-digit) >> 1] if result is None else result * negative[(-digit) >> 1]
+
+        return result
@@ -1,42 +1,85 @@
-from copy import deepcopy
 from secrets import randbelow
 
 # The following class is not meant to be used by the user. It should be re-exported using the function below
 class Fq:
+    """
+    Element of the prime field of characteristic MODULUS.
+    Elements are immutable: every operation returns a new element.
+    """
     EXTENSION_DEGREE = 1
     MODULUS = None
+    # Square root constants, see sqrt_constants
+    SQRT_EXPONENT = None
+    TWO_ADICITY = None
+    TWO_ADIC_ROOTS_OF_UNITY = None
+
+    __slots__ = ('x',)
 
     def __init__(self, x: int):
         Field = type(self)
-        self.x = x % Field.MODULUS
+        _set_x(self, x % Field.MODULUS)
 
         return
 
+    @classmethod
+    def _new(Field, x: int):
+        """
+        Build an element from an integer already reduced modulo MODULUS, skipping the reduction
+        """
+        out = _new_object(Field)
+        _set_x(out, x)
+
+        return out
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Field elements are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Field elements are immutable')
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (type(self), (self.x,))
+
+    def __hash__(self):
+        return hash(self.x)
+
     def __eq__(x,y):
-        return x.__dict__== y.__dict__
+        return type(x) is type(y) and x.x == y.x
 
     def __add__(x,y):
-        assert(type(x) == type(y))
         Field = type(x)
+        assert(type(y) is Field)
+        z = x.x + y.x
+        if z >= Field.MODULUS:
+            z -= Field.MODULUS
 
-        return Field(x.x + y.x)
+        return Field._new(z)
 
     def __sub__(x,y):
-        assert(type(x) == type(y))
         Field = type(x)
+        assert(type(y) is Field)
+        z = x.x - y.x
+        if z < 0:
+            z += Field.MODULUS
 
-        return Field(x.x - y.x)
+        return Field._new(z)
 
     def __neg__(self):
         Field = type(self)
 
-        return Field(-self.x)
+        return Field._new(Field.MODULUS - self.x if self.x else 0)
 
     def __mul__(x,y):
         Field = type(x)
 
-        if type(y) == Field:
-            return Field(x.x * y.x)
+        if type(y) is Field:
+            return Field._new(x.x * y.x % Field.MODULUS)
         else:
             return y.scalar_mul(x.x)
 
@@ -46,12 +89,104 @@ class Fq:
     def invert(self):
         Field = type(self)
 
-        return Field(pow(self.x,-1,Field.MODULUS))
+        return Field._new(pow(self.x,-1,Field.MODULUS))
+
+    def square(self):
+        Field = type(self)
+
+        return Field._new(self.x * self.x % Field.MODULUS)
+
+    def batch_invert(elements: list):
+        """
+        Invert a list of elements with a single field inversion (Montgomery's trick).
+        Zero elements are returned unchanged
+        """
+        if len(elements) == 0:
+            return []
+
+        Field = type(elements[0])
+        modulus = Field.MODULUS
+
+        # prefix[i] is the product of the non-zero elements in elements[:i]
+        prefix = []
+        accumulator = 1
+        for element in elements:
+            prefix.append(accumulator)
+            if element.x != 0:
+                accumulator = accumulator * element.x % modulus
+
+        inverse = pow(accumulator,-1,modulus)
+
+        out = [None] * len(elements)
+        for i in range(len(elements)-1,-1,-1):
+            if elements[i].x == 0:
+                out[i] = elements[i]
+            else:
+                out[i] = Field._new(prefix[i] * inverse % modulus)
+                inverse = inverse * elements[i].x % modulus
+
+        return out
 
     def power(self, n:int):
         Field = type(self)
 
-        return Field(pow(self.x,n,Field.MODULUS))
+        return Field._new(pow(self.x,n,Field.MODULUS))
+
+    def legendre_symbol(self) -> int:
+        """
+        Legendre symbol of the element: 1 if it is a non-zero square, -1 if it is not a square, 0 if it is zero
+        """
+        Field = type(self)
+
+        return jacobi_symbol(self.x, Field.MODULUS)
+
+    def is_square(self) -> bool:
+        return self.legendre_symbol() != -1
+
+    def sqrt(self):
+        """
+        Square root of the element, or None if the element is not a square.
+        MODULUS = 3 mod 4 and MODULUS = 5 mod 8 (Atkin) use a single exponentiation, the other moduli use Tonelli-Shanks
+        """
+        Field = type(self)
+        q = Field.MODULUS
+        x = self.x
+
+        if x == 0:
+            return self
+
+        if q & 3 == 3:
+            root = pow(x,Field.SQRT_EXPONENT,q)
+        elif q & 7 == 5:
+            t = pow(2 * x,Field.SQRT_EXPONENT,q)
+            i = 2 * x * t * t % q
+            root = x * t * (i - 1) % q
+        else:
+            # Tonelli-Shanks: q - 1 = 2^s * t, w = x^((t-1)/2), root = x^((t+1)/2), b = x^t
+            roots_of_unity = Field.TWO_ADIC_ROOTS_OF_UNITY
+            w = pow(x,Field.SQRT_EXPONENT,q)
+            root = w * x % q
+            b = w * root % q
+            m = Field.TWO_ADICITY
+            while b != 1:
+                # Least i such that b^(2^i) = 1
+                i = 0
+                b_power = b
+                while b_power != 1:
+                    b_power = b_power * b_power % q
+                    i += 1
+                    if i == m:
+                        return None
+
+                c = roots_of_unity[Field.TWO_ADICITY - i - 1]
+                root = root * c % q
+                b = b * c * c % q
+                m = i
+
+        if root * root % q != x:
+            return None
+
+        return Field._new(root)
 
     def identity():
         return Fq(1)
@@ -75,7 +210,7 @@ class Fq:
         Frobenius morphism: f --> f^q^n
         """
 
-        return deepcopy(self)
+        return self
     
     def get_modulus():
         """
@@ -102,11 +237,16 @@ class Fq:
         """
         Serialise the Fq element as its little-endian byte representation
         """
+        return list(self.to_bytes())
+
+    def to_bytes(self) -> bytes:
+        """
+        Little-endian byte representation of the Fq element (same layout as serialise)
+        """
         Field = type(self)
         length = (Field.MODULUS.bit_length()+8)//8
-        little_endian = bytearray(self.x.to_bytes(length=length,byteorder='little'))
-        
-        return list(little_endian)
+
+        return self.x.to_bytes(length=length,byteorder='little')
 
     def deserialise(L: list[bytes]):
         """
@@ -118,7 +258,73 @@ class Fq:
         x0 = int.from_bytes(bytes=L,byteorder='little')
 
         return Fq(x0)
-    
+
+    def from_buffer(buf, offset: int = 0):
+        """
+        Reads the element of Fq starting at offset in buf (bytes, bytearray, memoryview, mmap, ...) without copying the buffer
+        """
+        length = (Fq.MODULUS.bit_length() + 8)//8
+        view = memoryview(buf)
+        assert(offset + length <= len(view))
+
+        return Fq(int.from_bytes(view[offset:offset+length],byteorder='little'))
+
+    def from_buffer_array(buf, count: int, offset: int = 0):
+        """
+        Reads count contiguous elements of Fq starting at offset in buf, in one pass and without copying the buffer
+        """
+        length = (Fq.MODULUS.bit_length() + 8)//8
+        view = memoryview(buf)
+        end = offset + count * length
+        assert(end <= len(view))
+
+        return [Fq(int.from_bytes(view[i:i+length],byteorder='little')) for i in range(offset,end,length)]
+
+def jacobi_symbol(a: int, n: int) -> int:
+    """
+    Jacobi symbol (a/n) for an odd positive integer n, computed with the binary quadratic reciprocity algorithm (no exponentiation)
+    """
+    a %= n
+    result = 1
+    while a != 0:
+        # Remove the factors of 2: (2/n) = -1 iff n = 3,5 mod 8
+        s = (a & -a).bit_length() - 1
+        a >>= s
+        if s & 1 and n & 7 in (3,5):
+            result = -result
+        # Quadratic reciprocity: (a/n) = -(n/a) iff a = n = 3 mod 4
+        if a & n & 3 == 3:
+            result = -result
+        a, n = n % a, a
+
+    return result if n == 1 else 0
+
+def sqrt_constants(q: int):
+    """
+    Constants used by Fq.sqrt: the exponent of the single exponentiation ((q+1)/4 if q = 3 mod 4, (q-5)/8 if q = 5 mod 8, (t-1)/2
+    otherwise), the 2-adicity s of q - 1 = 2^s * t, and the roots of unity z^(t * 2^k) for k < s, z a quadratic non-residue
+    """
+    s = ((q - 1) & (1 - q)).bit_length() - 1
+    t = (q - 1) >> s
+
+    if q & 3 == 3:
+        return (q + 1) // 4, s, None
+    elif q & 7 == 5:
+        return (q - 5) // 8, s, None
+
+    z = 2
+    while jacobi_symbol(z, q) != -1:
+        z += 1
+    roots_of_unity = [pow(z,t,q)]
+    for k in range(1,s):
+        roots_of_unity.append(roots_of_unity[-1] * roots_of_unity[-1] % q)
+
+    return (t - 1) // 2, s, roots_of_unity
+
+# Raw constructor and slot setter, used to build elements without going through __init__ or __setattr__
+_new_object = object.__new__
+_set_x = Fq.x.__set__
+
 def base_field_from_modulus(q: int):
     """
     Function to export class Fq with MODULUS set to q
@@ -127,6 +333,9 @@ def base_field_from_modulus(q: int):
     class Field(Fq):
         MODULUS = q
         EXTENSION_DEGREE = 1
+        SQRT_EXPONENT, TWO_ADICITY, TWO_ADIC_ROOTS_OF_UNITY = sqrt_constants(q)
+
+        __slots__ = ()
 
         def identity():
             return Field(1)
@@ -162,5 +371,26 @@ def base_field_from_modulus(q: int):
             x0 = int.from_bytes(bytes=L,byteorder='little')
 
             return Field(x0)
+
+        def from_buffer(buf, offset: int = 0):
+            """
+            Reads the element of Fq starting at offset in buf (bytes, bytearray, memoryview, mmap, ...) without copying the buffer
+            """
+            length = (Field.MODULUS.bit_length() + 8)//8
+            view = memoryview(buf)
+            assert(offset + length <= len(view))
+
+            return Field(int.from_bytes(view[offset:offset+length],byteorder='little'))
+
+        def from_buffer_array(buf, count: int, offset: int = 0):
+            """
+            Reads count contiguous elements of Fq starting at offset in buf, in one pass and without copying the buffer
+            """
+            length = (Field.MODULUS.bit_length() + 8)//8
+            view = memoryview(buf)
+            end = offset + count * length
+            assert(end <= len(view))
+
+            return [Field(int.from_bytes(view[i:i+length],byteorder='little')) for i in range(offset,end,length)]
         
     return Field
\ No newline at end of file
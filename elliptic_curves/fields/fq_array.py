@@ -0,0 +1,293 @@
+import numpy as np
+
+# Elements are stored as LIMB_BITS-bit limbs in uint64 words, so that the product of two limbs fits in a word
+LIMB_BITS = 32
+LIMB_MASK = np.uint64((1 << LIMB_BITS) - 1)
+LIMB_SHIFT = np.uint64(LIMB_BITS)
+
+# The following class is not meant to be used by the user. It should be re-exported using the function below
+class FqArray:
+    """
+    Array of elements of the prime field FIELD, used to apply the same operation to many elements at once.
+
+    The elements are stored in Montgomery form (x * 2^(LIMB_BITS * N_LIMBS) mod MODULUS), as a uint64 matrix of shape
+    (N_LIMBS, len(array)): row i holds the i-th little-endian limb of every element. Elements are always fully reduced.
+    Arrays are immutable: every operation returns a new array.
+    """
+    FIELD = None
+    MODULUS = None
+    N_LIMBS = None
+    R = None
+    R_INVERSE = None
+    MODULUS_LIMBS = None
+    MODULUS_INVERSE = None
+
+    def __init__(self, limbs: np.ndarray):
+        """
+        Build the array from its limb matrix (in Montgomery form). Use from_elements or from_integers to build an array from field elements
+        """
+        Array = type(self)
+        assert(limbs.shape[0] == Array.N_LIMBS)
+
+        self.limbs = limbs
+
+        return
+
+    def __len__(self):
+        return self.limbs.shape[1]
+
+    def __getitem__(self, key):
+        Array = type(self)
+
+        if isinstance(key, slice):
+            return Array(self.limbs[:,key])
+        else:
+            return Array(self.limbs[:,[key]]).to_elements()[0]
+
+    def __eq__(x,y):
+        return type(x) is type(y) and np.array_equal(x.limbs, y.limbs)
+
+    def __add__(x,y):
+        Array = type(x)
+        z = _propagate_carries(x.limbs + y.limbs)
+
+        return Array(_subtract_modulus_if_larger(z, Array.MODULUS_LIMBS))
+
+    def __sub__(x,y):
+        Array = type(x)
+        z = x.limbs.view(np.int64) - y.limbs.view(np.int64)
+        borrow = _propagate_borrows(z)
+
+        # If x < y, add back the modulus (the carry out of the top limb is dropped)
+        z = z.view(np.uint64) + Array.MODULUS_LIMBS * borrow.view(np.uint64)
+        z = _propagate_carries(z)
+        z[-1] &= LIMB_MASK
+
+        return Array(z)
+
+    def __neg__(self):
+        Array = type(self)
+
+        return Array.zero(len(self)) - self
+
+    def __mul__(x,y):
+        Array = type(x)
+
+        return Array(_montgomery_product(x.limbs, y.limbs, Array.MODULUS_LIMBS, Array.MODULUS_INVERSE))
+
+    def __repr__(self):
+        return f'{self.to_integers()}'
+
+    def square(self):
+        Array = type(self)
+
+        return Array(_montgomery_square(self.limbs, Array.MODULUS_LIMBS, Array.MODULUS_INVERSE))
+
+    def batch_invert(self):
+        """
+        Invert every element of the array with a single field inversion: the elements are multiplied in pairs up a binary tree, the root is
+        inverted, and the inverses are propagated down the tree with one vectorised multiplication per level.
+        Zero elements are returned unchanged
+        """
+        Array = type(self)
+
+        if len(self) == 0:
+            return self
+
+        # Replace zeros by one, so that they do not spoil the product
+        is_zero = ~self.limbs.any(axis=0)
+        one = Array.identity(1).limbs
+        limbs = np.where(is_zero, one, self.limbs)
+
+        # levels[k+1][:,i] = levels[k][:,2i] * levels[k][:,2i+1]
+        levels = [limbs]
+        while levels[-1].shape[1] > 1:
+            level = levels[-1]
+            if level.shape[1] % 2 == 1:
+                level = np.concatenate([level, one], axis=1)
+                levels[-1] = level
+            levels.append(_montgomery_product(level[:,0::2], level[:,1::2], Array.MODULUS_LIMBS, Array.MODULUS_INVERSE))
+
+        inverse = Array.from_integers([pow(Array.to_integers(Array(levels[-1]))[0],-1,Array.MODULUS)]).limbs
+
+        # The inverse of levels[k][:,2i] is inverse[:,i] * levels[k][:,2i+1], and vice versa
+        for level in levels[-2::-1]:
+            inverse = inverse[:,:level.shape[1]//2]
+            inverses = np.empty_like(level)
+            inverses[:,0::2] = _montgomery_product(inverse, level[:,1::2], Array.MODULUS_LIMBS, Array.MODULUS_INVERSE)
+            inverses[:,1::2] = _montgomery_product(inverse, level[:,0::2], Array.MODULUS_LIMBS, Array.MODULUS_INVERSE)
+            inverse = inverses
+
+        inverse = inverse[:,:len(self)]
+
+        return Array(np.where(is_zero, self.limbs, inverse))
+
+    def to_integers(self) -> list[int]:
+        """
+        Convert the array to the list of integers (in [0,MODULUS)) it represents
+        """
+        Array = type(self)
+        length = Array.N_LIMBS * LIMB_BITS // 8
+        little_endian = self.limbs.T.astype('<u4').tobytes()
+        r_inverse = Array.R_INVERSE
+        modulus = Array.MODULUS
+
+        return [int.from_bytes(little_endian[i:i+length],byteorder='little') * r_inverse % modulus for i in range(0,len(little_endian),length)]
+
+    def to_elements(self) -> list:
+        """
+        Convert the array to a list of elements of FIELD
+        """
+        Array = type(self)
+
+        return [Array.FIELD._new(x) for x in self.to_integers()]
+
+    def from_integers(L: list[int]):
+        """
+        Build an array from a list of integers
+        """
+        return FqArray(_limbs_from_integers([x * FqArray.R % FqArray.MODULUS for x in L], FqArray.N_LIMBS))
+
+    def from_elements(elements: list):
+        """
+        Build an array from a list of elements of FIELD
+        """
+        return FqArray.from_integers([element.x for element in elements])
+
+    def zero(n: int):
+        return FqArray(np.zeros((FqArray.N_LIMBS,n),dtype=np.uint64))
+
+    def identity(n: int):
+        return FqArray.from_integers([1] * n)
+
+def _limbs_from_integers(L: list[int], n_limbs: int) -> np.ndarray:
+    """
+    Limb matrix of shape (n_limbs, len(L)) of the non-negative integers in L (smaller than 2^(LIMB_BITS * n_limbs))
+    """
+    length = n_limbs * LIMB_BITS // 8
+    little_endian = b''.join(x.to_bytes(length=length,byteorder='little') for x in L)
+
+    return np.frombuffer(little_endian,dtype='<u4').reshape(len(L),n_limbs).T.astype(np.uint64)
+
+def _propagate_carries(z: np.ndarray) -> np.ndarray:
+    """
+    Normalise the limbs z[:-1] to LIMB_BITS bits by moving their excess into the next limb (in place). The top limb is left unbounded
+    """
+    for i in range(z.shape[0]-1):
+        z[i+1] += z[i] >> LIMB_SHIFT
+        z[i] &= LIMB_MASK
+
+    return z
+
+def _propagate_borrows(z: np.ndarray) -> np.ndarray:
+    """
+    Normalise the signed limbs z (int64, |z[i]| < 2^(LIMB_BITS+1)) to [0,2^LIMB_BITS) in place, and return the borrow out of the top limb
+    (1 if the number represented by z is negative, 0 otherwise)
+    """
+    borrow = np.zeros(z.shape[1],dtype=np.int64)
+    for i in range(z.shape[0]):
+        z[i] -= borrow
+        borrow = (z[i] < 0).astype(np.int64)
+        z[i] += borrow << LIMB_BITS
+
+    return borrow
+
+def _subtract_modulus_if_larger(z: np.ndarray, modulus: np.ndarray) -> np.ndarray:
+    """
+    Return z - modulus where z >= modulus, and z elsewhere. The limbs of z, except the top one, must be normalised
+    """
+    difference = z.view(np.int64) - modulus.view(np.int64)
+    borrow = _propagate_borrows(difference)
+
+    return np.where(borrow.astype(bool), z, difference.view(np.uint64))
+
+def _montgomery_reduce(t: np.ndarray, modulus: np.ndarray, modulus_inverse: np.uint64) -> np.ndarray:
+    """
+    Montgomery reduction of the product t (2 * n_limbs + 1 limbs, not normalised): return t / 2^(LIMB_BITS * n_limbs) mod modulus.
+
+    The limbs of t are kept unnormalised as long as possible: the partial products are split in their low and high halves, which are
+    accumulated in t with one vectorised operation per limb of the multiplier
+    """
+    n = modulus.shape[0]
+    for i in range(n):
+        t[i+1] += t[i] >> LIMB_SHIFT
+        t[i] &= LIMB_MASK
+
+        # Adding m * modulus * 2^(LIMB_BITS * i) clears the i-th limb
+        m = (t[i] * modulus_inverse) & LIMB_MASK
+        product = m * modulus
+        t[i:i+n] += product & LIMB_MASK
+        t[i+1:i+n+1] += product >> LIMB_SHIFT
+        t[i+1] += t[i] >> LIMB_SHIFT
+
+    z = _propagate_carries(t[n:2*n+1])
+    z[-2] += z[-1] << LIMB_SHIFT
+
+    return _subtract_modulus_if_larger(z[:-1], modulus)
+
+def _montgomery_product(x: np.ndarray, y: np.ndarray, modulus: np.ndarray, modulus_inverse: np.uint64) -> np.ndarray:
+    """
+    Montgomery product of the limb matrices x and y
+    """
+    n = modulus.shape[0]
+    t = np.zeros((2*n+1,max(x.shape[1],y.shape[1])),dtype=np.uint64)
+    for i in range(n):
+        product = x[i] * y
+        t[i:i+n] += product & LIMB_MASK
+        t[i+1:i+n+1] += product >> LIMB_SHIFT
+
+    return _montgomery_reduce(t, modulus, modulus_inverse)
+
+def _montgomery_square(x: np.ndarray, modulus: np.ndarray, modulus_inverse: np.uint64) -> np.ndarray:
+    """
+    Montgomery square of the limb matrix x: the products x[i] * x[j] with i != j are computed once and doubled
+    """
+    n = modulus.shape[0]
+    t = np.zeros((2*n+1,x.shape[1]),dtype=np.uint64)
+    for i in range(n-1):
+        product = x[i] * x[i+1:]
+        t[2*i+1:i+n] += (product & LIMB_MASK) << np.uint64(1)
+        t[2*i+2:i+n+1] += (product >> LIMB_SHIFT) << np.uint64(1)
+    product = x * x
+    t[0:2*n:2] += product & LIMB_MASK
+    t[1:2*n+1:2] += product >> LIMB_SHIFT
+
+    return _montgomery_reduce(t, modulus, modulus_inverse)
+
+def fq_array_from_base_field(base_field):
+    """
+    Function to export class FqArray with FIELD set to base_field (a prime field built with base_field_from_modulus)
+    """
+    assert(base_field.EXTENSION_DEGREE == 1)
+
+    q = base_field.get_modulus()
+    n_limbs = -(-q.bit_length() // LIMB_BITS)
+
+    class FieldArray(FqArray):
+        FIELD = base_field
+        MODULUS = q
+        N_LIMBS = n_limbs
+        R = (1 << (LIMB_BITS * n_limbs)) % q
+        R_INVERSE = pow(1 << (LIMB_BITS * n_limbs),-1,q)
+        MODULUS_LIMBS = _limbs_from_integers([q], n_limbs)
+        MODULUS_INVERSE = np.uint64(-pow(q,-1,1 << LIMB_BITS) % (1 << LIMB_BITS))
+
+        def from_integers(L: list[int]):
+            """
+            Build an array from a list of integers
+            """
+            return FieldArray(_limbs_from_integers([x * FieldArray.R % FieldArray.MODULUS for x in L], FieldArray.N_LIMBS))
+
+        def from_elements(elements: list):
+            """
+            Build an array from a list of elements of FIELD
+            """
+            return FieldArray.from_integers([element.x for element in elements])
+
+        def zero(n: int):
+            return FieldArray(np.zeros((FieldArray.N_LIMBS,n),dtype=np.uint64))
+
+        def identity(n: int):
+            return FieldArray.from_integers([1] * n)
+
+    return FieldArray
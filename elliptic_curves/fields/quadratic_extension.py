@@ -1,6 +1,8 @@
 from copy import deepcopy
 from math import gcd
 
+from elliptic_curves.fields.exponentiation import PowerTable, window_size
+
 # The following class is not meant to be used by the user. It should be re-exported using the function below
 class QuadraticExtension:
     """
@@ -11,6 +13,12 @@ class QuadraticExtension:
     BASE_FIELD = None
     EXTENSION_DEGREE = None
     EXTENSION_DEGREE_OVER_BASE_FIELD = None
+    # FROBENIUS_COEFFICIENTS[n] = NON_RESIDUE^((q^n-1)/2)
+    FROBENIUS_COEFFICIENTS = None
+    # If BASE_FIELD is a prime field, the representative of NON_RESIDUE of smallest absolute value
+    NON_RESIDUE_INTEGER = None
+    # Inverse of NON_RESIDUE, used by sqrt
+    NON_RESIDUE_INVERSE = None
 
     def __init__(self, x0, x1):
         self.x0 = x0
@@ -46,11 +54,24 @@ class QuadraticExtension:
         if gcd(Field.EXTENSION_DEGREE,Field_Y.EXTENSION_DEGREE) == 1 and Field_Y.EXTENSION_DEGREE != 1:
             raise ValueError('Multiplication not implemented')
 
-        if Field_Y == Field: # Same type
-            return Field(x.x0 * y.x0 + x.x1 * y.x1 * Field.NON_RESIDUE, x.x0 * y.x1 + x.x1 * y.x0)
+        if Field_Y == Field: # Same type, Karatsuba multiplication
+            if Field.BASE_FIELD.EXTENSION_DEGREE == 1:
+                # Base field is a prime field: work on the integers and reduce once per coordinate
+                BaseField = Field.BASE_FIELD
+                modulus = BaseField.MODULUS
+                v0 = x.x0.x * y.x0.x
+                v1 = x.x1.x * y.x1.x
+                return Field(
+                    BaseField._new((v0 + Field.NON_RESIDUE_INTEGER * v1) % modulus),
+                    BaseField._new(((x.x0.x + x.x1.x) * (y.x0.x + y.x1.x) - v0 - v1) % modulus)
+                    )
+
+            v0 = x.x0 * y.x0
+            v1 = x.x1 * y.x1
+            return Field(v0 + Field.mul_by_non_residue(v1), (x.x0 + x.x1) * (y.x0 + y.x1) - v0 - v1)
         else:
-            a = deepcopy(x)
-            b = deepcopy(y)
+            a = x
+            b = y
             # Ensure first element is in the largest extension
             if Field.EXTENSION_DEGREE < Field_Y.EXTENSION_DEGREE:
                 a, b = b, a
@@ -73,22 +94,144 @@ class QuadraticExtension:
     def __repr__(self):
         return f'({self.x0},{self.x1})'
 
+    def square(self):
+        """
+        Complex squaring: (x0 + x1 u)^2 = (x0 + x1) * (x0 + NON_RESIDUE * x1) - (1 + NON_RESIDUE) * x0 * x1 + 2 * x0 * x1 u
+        """
+        Field = type(self)
+
+        if Field.BASE_FIELD.EXTENSION_DEGREE == 1:
+            # Base field is a prime field: work on the integers and reduce once per coordinate
+            BaseField = Field.BASE_FIELD
+            modulus = BaseField.MODULUS
+            non_residue = Field.NON_RESIDUE_INTEGER
+            v = self.x0.x * self.x1.x
+            return Field(
+                BaseField._new(((self.x0.x + self.x1.x) * (self.x0.x + non_residue * self.x1.x) - v - non_residue * v) % modulus),
+                BaseField._new(2 * v % modulus)
+                )
+
+        v = self.x0 * self.x1
+        x0 = (self.x0 + self.x1) * (self.x0 + Field.mul_by_non_residue(self.x1)) - v - Field.mul_by_non_residue(v)
+
+        return Field(x0, v + v)
+
+    def mul_by_generator(self):
+        """
+        Multiplication by the generator u of the extension: (x0 + x1 u) * u = NON_RESIDUE * x1 + x0 u
+        """
+        Field = type(self)
+
+        return Field(Field.mul_by_non_residue(self.x1), self.x0)
+
     def conjugate(self):
         Field = type(self)
 
         return Field(self.x0,-self.x1)
 
+    def cyclotomic_square(self):
+        """
+        Squaring of an element of norm one over BASE_FIELD (e.g., the output of the easy part of the final exponentiation).
+        As x0^2 - NON_RESIDUE * x1^2 = 1, we have: (x0 + x1 u)^2 = 2 * x0^2 - 1 + 2 * x0 * x1 u
+        """
+        Field = type(self)
+
+        x0_squared = self.x0.square()
+        x0_x1 = self.x0 * self.x1
+
+        return Field(x0_squared + x0_squared - Field.BASE_FIELD.identity(), x0_x1 + x0_x1)
+
+    def repeated_cyclotomic_square(self, k: int):
+        """
+        Compute self^(2^k) for an element of norm one over BASE_FIELD
+        """
+        result = self
+        for i in range(k):
+            result = result.cyclotomic_square()
+
+        return result
+
+    def cyclotomic_exp(self, n: int):
+        """
+        Exponentiation of an element of norm one over BASE_FIELD. The exponent is recoded in signed digits (wNAF),
+        and negative digits are handled with the conjugate, which is the inverse in the cyclotomic subgroup
+        """
+        return self.cyclotomic_power_table(abs(n).bit_length()).power(n)
+
+    def cyclotomic_power_table(self, bit_length: int):
+        """
+        Precompute the odd powers of self (an element of norm one over BASE_FIELD) used to raise self to exponents of (at most) bit_length bits.
+        The table can be reused for many exponents: table.power(n) = self.cyclotomic_exp(n)
+        """
+        Field = type(self)
+
+        return PowerTable(self, window_size(bit_length), Field.cyclotomic_square, Field.conjugate)
+
     def invert(self):
         assert(not self.is_zero())
         Field = type(self)
 
-        z = self.x0.power(2) - self.x1.power(2) * Field.NON_RESIDUE
+        z = self.x0.square() - Field.mul_by_non_residue(self.x1.square())
         z = z.invert()
 
         conjugate = self.conjugate()
 
         return Field(conjugate.x0 * z, conjugate.x1 * z)
 
+    def norm(self):
+        """
+        Norm of the element over BASE_FIELD: x0^2 - NON_RESIDUE * x1^2
+        """
+        Field = type(self)
+
+        return self.x0.square() - Field.mul_by_non_residue(self.x1.square())
+
+    def legendre_symbol(self) -> int:
+        """
+        Legendre symbol of the element: 1 if it is a non-zero square, -1 if it is not a square, 0 if it is zero.
+        It is computed on the norm, as x^((Q-1)/2) = norm(x)^((q-1)/2) for Q = q^2
+        """
+        return self.norm().legendre_symbol()
+
+    def is_square(self) -> bool:
+        return self.legendre_symbol() != -1
+
+    def sqrt(self):
+        """
+        Square root of the element, or None if the element is not a square.
+        The root is computed with square roots in BASE_FIELD: if x = (x0 + x1 u)^2, then x0^2 = (x.x0 + sqrt(norm(x)))/2
+        """
+        Field = type(self)
+
+        if self.x1.is_zero():
+            # Elements of BASE_FIELD are squares: either x0 is a square in BASE_FIELD, or x0 / NON_RESIDUE is
+            root = self.x0.sqrt()
+            if root is not None:
+                return Field(root, self.x1)
+            else:
+                return Field(self.x1, (self.x0 * Field.NON_RESIDUE_INVERSE).sqrt())
+
+        alpha = self.norm().sqrt()
+        if alpha is None:
+            return None
+
+        # Exactly one of (x0 + alpha)/2 and (x0 - alpha)/2 is a square in BASE_FIELD
+        half = (Field.get_modulus() + 1) // 2
+        delta = (self.x0 + alpha).scalar_mul(half)
+        if not delta.is_square():
+            delta = (self.x0 - alpha).scalar_mul(half)
+        x0 = delta.sqrt()
+        x1 = self.x1 * (x0 + x0).invert()
+
+        return Field(x0, x1)
+
+    def batch_invert(elements: list):
+        """
+        Invert a list of elements with a single field inversion (Montgomery's trick, see montgomery_batch_invert).
+        Zero elements are returned unchanged
+        """
+        return montgomery_batch_invert(elements)
+
     def identity():
         return QuadraticExtension(QuadraticExtension.BASE_FIELD.identity(),QuadraticExtension.BASE_FIELD.zero())
 
@@ -106,6 +249,12 @@ class QuadraticExtension:
     def u():
         return QuadraticExtension(QuadraticExtension.BASE_FIELD.zero(),QuadraticExtension.BASE_FIELD.identity())
 
+    def mul_by_non_residue(x):
+        """
+        Multiply the element x of BASE_FIELD by NON_RESIDUE
+        """
+        return x * QuadraticExtension.NON_RESIDUE
+
     def power(self,n: int):
         if self.is_zero():
             if n != 0:
@@ -117,20 +266,38 @@ class QuadraticExtension:
         if n == 0:
             return Field.identity()
             
-        val = deepcopy(self)
-        result = Field.identity()
+        val = self
 
         if n < 0:
             n = -n
             val = val.invert()
 
-        while n > 0:
-            if n % 2 == 1:
-                result = result * val
-            val = val * val
-            n = n // 2
+        return val.power_table(n.bit_length()).power(n)
 
-        return result
+    def power_by_chain(self, chain):
+        """
+        Compute self^chain.n, where chain is an AdditionChain obtained with compile_chain (preferably with signed = False, as inverses are expensive)
+        """
+        Field = type(self)
+
+        return chain.evaluate(self, Field.square, Field.invert)
+
+    def cyclotomic_power_by_chain(self, chain):
+        """
+        Compute self^chain.n, where self has norm one over BASE_FIELD and chain is an AdditionChain obtained with compile_chain
+        """
+        Field = type(self)
+
+        return chain.evaluate(self, Field.cyclotomic_square, Field.conjugate, Field.repeated_cyclotomic_square)
+
+    def power_table(self, bit_length: int):
+        """
+        Precompute the odd powers of self used to raise self to exponents of (at most) bit_length bits with a sliding window.
+        The table can be reused for many exponents: table.power(n) = self.power(n)
+        """
+        Field = type(self)
+
+        return PowerTable(self, window_size(bit_length), Field.square)
 
     def generate_random_point():
         x0 = QuadraticExtension.BASE_FIELD.generate_random_point()
@@ -143,7 +310,7 @@ class QuadraticExtension:
         Frobenius: f -> f^q^n
         """
         Field = type(self)
-        gamma = Field.NON_RESIDUE.power((Field.get_modulus()**(n % Field.EXTENSION_DEGREE)-1)//2)
+        gamma = Field.FROBENIUS_COEFFICIENTS[n % Field.EXTENSION_DEGREE]
 
         return Field(self.x0.frobenius(n), self.x1.frobenius(n) * gamma)
     
@@ -210,17 +377,110 @@ class QuadraticExtension:
             index += length * QuadraticExtension.EXTENSION_DEGREE//2
 
         return QuadraticExtension(tmp[0],tmp[1])
-    
+
+    def from_buffer(buf, offset: int = 0):
+        """
+        Reads the element of QuadraticExtension starting at offset in buf (bytes, bytearray, memoryview, mmap, ...) without copying the buffer
+        """
+        length = (QuadraticExtension.get_modulus().bit_length() + 8)//8 * QuadraticExtension.EXTENSION_DEGREE//2
+        x0 = QuadraticExtension.BASE_FIELD.from_buffer(buf, offset)
+        x1 = QuadraticExtension.BASE_FIELD.from_buffer(buf, offset + length)
+
+        return QuadraticExtension(x0,x1)
+
+    def from_buffer_array(buf, count: int, offset: int = 0):
+        """
+        Reads count contiguous elements of QuadraticExtension starting at offset in buf, in one pass and without copying the buffer
+        """
+        coordinates = QuadraticExtension.BASE_FIELD.from_buffer_array(buf, 2 * count, offset)
+
+        return [QuadraticExtension(coordinates[i],coordinates[i+1]) for i in range(0,2 * count,2)]
+
+    def to_bytes(self) -> bytes:
+        """
+        Little-endian byte representation of the QuadraticExtension element (same layout as serialise). The order is: x0, x1
+        """
+        return self.x0.to_bytes() + self.x1.to_bytes()
+
+def montgomery_batch_invert(elements: list) -> list:
+    """
+    Invert a list of elements of an extension field with a single field inversion (Montgomery's trick): the prefix products are
+    inverted once, and the inverses are peeled off from the last element to the first. Zero elements are returned unchanged
+    """
+    if len(elements) == 0:
+        return []
+
+    # prefix[i] is the product of the non-zero elements in elements[:i]
+    prefix = []
+    accumulator = None
+    for element in elements:
+        prefix.append(accumulator)
+        if not element.is_zero():
+            accumulator = element if accumulator is None else accumulator * element
+
+    if accumulator is None:
+        return list(elements)
+
+    inverse = accumulator.invert()
+
+    out = [None] * len(elements)
+    for i in range(len(elements)-1,-1,-1):
+        if elements[i].is_zero():
+            out[i] = elements[i]
+        elif prefix[i] is None:
+            out[i] = inverse
+        else:
+            out[i] = prefix[i] * inverse
+            inverse = inverse * elements[i]
+
+    return out
+
+def frobenius_coefficients(non_residue, q: int, extension_degree: int, k: int, d: int) -> list:
+    """
+    Compute the list [non_residue^(k*(q^n-1)//d) for n in range(extension_degree)].
+
+    If d divides q-1, the coefficients are computed with the recursion:
+        non_residue^(k*(q^n-1)/d) = (non_residue^(k*(q^(n-1)-1)/d))^q * non_residue^(k*(q-1)/d)
+    so that only one exponentiation is needed, the rest being Frobenius applications in the field of non_residue
+    """
+    if (q-1) % d != 0:
+        return [non_residue.power((k*(q**n-1))//d) for n in range(extension_degree)]
+
+    gamma = non_residue.power(k*(q-1)//d)
+    out = [type(non_residue).identity()]
+    for n in range(1,extension_degree):
+        out.append(out[-1].frobenius(1) * gamma)
+
+    return out
+
+def is_generator_of_base_field(base_field, non_residue) -> bool:
+    """
+    Check whether non_residue is the generator of base_field over its own base field (u for quadratic extensions, v for cubic ones).
+    In that case, multiplying by non_residue is a shift of coordinates, see mul_by_generator
+    """
+    if base_field.EXTENSION_DEGREE == 1:
+        return False
+    elif base_field.EXTENSION_DEGREE_OVER_BASE_FIELD == 2:
+        return non_residue == base_field.u()
+    else:
+        return non_residue == base_field.v()
+
 def quadratic_extension_from_base_field_and_non_residue(base_field, non_residue):
     """
     Function to export class QuadraticExtension with BASE_FIELD = base_field and NON_RESIDUE = non_residue
     """
 
+    non_residue_is_generator = is_generator_of_base_field(base_field, non_residue)
+
     class QuadraticExtensionField(QuadraticExtension):
         NON_RESIDUE = non_residue
         BASE_FIELD = base_field
         EXTENSION_DEGREE = 2 * BASE_FIELD.EXTENSION_DEGREE
         EXTENSION_DEGREE_OVER_BASE_FIELD = 2
+        FROBENIUS_COEFFICIENTS = frobenius_coefficients(non_residue, base_field.get_modulus(), EXTENSION_DEGREE, 1, 2)
+        if BASE_FIELD.EXTENSION_DEGREE == 1:
+            NON_RESIDUE_INTEGER = non_residue.x if non_residue.x <= BASE_FIELD.MODULUS // 2 else non_residue.x - BASE_FIELD.MODULUS
+        NON_RESIDUE_INVERSE = non_residue.invert()
 
         def identity():
             return QuadraticExtensionField(QuadraticExtensionField.BASE_FIELD.identity(),QuadraticExtensionField.BASE_FIELD.zero())
@@ -230,6 +490,15 @@ def quadratic_extension_from_base_field_and_non_residue(base_field, non_residue)
         
         def u():
             return QuadraticExtensionField(QuadraticExtensionField.BASE_FIELD.zero(),QuadraticExtensionField.BASE_FIELD.identity())
+
+        def mul_by_non_residue(x):
+            """
+            Multiply the element x of BASE_FIELD by NON_RESIDUE
+            """
+            if non_residue_is_generator:
+                return x.mul_by_generator()
+            else:
+                return x * QuadraticExtensionField.NON_RESIDUE
         
         def generate_random_point():
             x0 = QuadraticExtensionField.BASE_FIELD.generate_random_point()
@@ -272,7 +541,25 @@ def quadratic_extension_from_base_field_and_non_residue(base_field, non_residue)
                 index += length * QuadraticExtensionField.EXTENSION_DEGREE//2
 
             return QuadraticExtensionField(tmp[0],tmp[1])
-        
+
+        def from_buffer(buf, offset: int = 0):
+            """
+            Reads the element of QuadraticExtensionField starting at offset in buf (bytes, bytearray, memoryview, mmap, ...) without copying the buffer
+            """
+            length = (QuadraticExtensionField.get_modulus().bit_length() + 8)//8 * QuadraticExtensionField.EXTENSION_DEGREE//2
+            x0 = QuadraticExtensionField.BASE_FIELD.from_buffer(buf, offset)
+            x1 = QuadraticExtensionField.BASE_FIELD.from_buffer(buf, offset + length)
+
+            return QuadraticExtensionField(x0,x1)
+
+        def from_buffer_array(buf, count: int, offset: int = 0):
+            """
+            Reads count contiguous elements of QuadraticExtensionField starting at offset in buf, in one pass and without copying the buffer
+            """
+            coordinates = QuadraticExtensionField.BASE_FIELD.from_buffer_array(buf, 2 * count, offset)
+
+            return [QuadraticExtensionField(coordinates[i],coordinates[i+1]) for i in range(0,2 * count,2)]
+
     return QuadraticExtensionField
 
         
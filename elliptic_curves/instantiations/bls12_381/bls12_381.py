@@ -2,11 +2,14 @@ from elliptic_curves.fields.fq import base_field_from_modulus
 from elliptic_curves.fields.quadratic_extension import quadratic_extension_from_base_field_and_non_residue
 from elliptic_curves.fields.cubic_extension import cubic_extension_from_base_field_and_non_residue
 
-from elliptic_curves.models.ec import elliptic_curve_from_curve
+from elliptic_curves.models.ec import elliptic_curve_from_curve, EllipticCurve
 from elliptic_curves.models.curve import Curve, BilinearPairingCurve
+from elliptic_curves.models.scalar_decomposition import ScalarDecomposition
+from elliptic_curves.models.line_evaluation import LineEvaluation
 
 from elliptic_curves.instantiations.bls12_381.parameters import *
-from elliptic_curves.instantiations.bls12_381.final_exponentiation import easy_exponentiation, hard_exponentiation
+from elliptic_curves.instantiations.bls12_381.final_exponentiation import easy_exponentiation, hard_exponentiation, u_chain
+from elliptic_curves.instantiations.bls12_381.cyclotomic import cyclotomic_square, compressed_cyclotomic_square, repeated_cyclotomic_square, compressed_cyclotomic_exp
 
 # Field instantiation
 Fq = base_field_from_modulus(q=q)
@@ -17,19 +20,61 @@ Fq6 = cubic_extension_from_base_field_and_non_residue(base_field=Fq2,non_residue
 NON_RESIDUE_FQ6 = Fq6.from_list(NON_RESIDUE_FQ6)
 Fq12 = quadratic_extension_from_base_field_and_non_residue(base_field=Fq6,non_residue=NON_RESIDUE_FQ6)
 
-# Define mul_by_line_eval method for Fq12
-# We are not customising line_evaluations, so they will be elements in the miller_ouput_type
-def mul_by_line_eval(self,line_eval):
+# Sparse multiplications for the line evaluations of the Miller loops
+def mul_by_014(self, c0, c1, c4):
+    '''
+    Multiplication by the sparse element (c0 + c1 v) + c4 v w of Fq12, with c0, c1, c4 in Fq2: 13 multiplications in Fq2 instead of 18
+    '''
+    t0 = self.x0.mul_by_01(c0, c1)
+    t1 = self.x1.mul_by_1(c4)
+    x1 = (self.x0 + self.x1).mul_by_01(c0, c1 + c4) - t0 - t1
+
+    return Fq12(t0 + t1.mul_by_generator(), x1)
+
+def mul_by_045(self, c0, c4, c5):
+    '''
+    Multiplication by the sparse element c0 + (c4 v + c5 v^2) w of Fq12, with c0, c4, c5 in Fq2: 14 multiplications in Fq2 instead of 18
+    '''
+    t0 = self.x0 * c0
+    t1 = self.x1.mul_by_01(c4, c5).mul_by_generator()
+    x1 = (self.x0 + self.x1) * Fq6(c0, c4, c5) - t0 - t1
+
+    return Fq12(t0 + t1.mul_by_generator(), x1)
+
+def mul_by_line_eval(self, line_eval):
+    '''
+    Multiplication by line_eval, an element of Fq12 or a LineEvaluation. As BLS12_381 uses an M-twist, the lines of the Miller loop on the
+    twisted curve (and of BilinearPairing.miller_loop) have non-zero slots 0, 1, 4, and those of the Miller loop on the base curve have
+    non-zero slots 0, 4, 5: these are multiplied with the sparse kernels above. Other elements are multiplied as dense elements
+    '''
+    if isinstance(line_eval, LineEvaluation):
+        slots = line_eval.slots
+        match line_eval.pattern():
+            case (0, 1, 4):
+                return self.mul_by_014(slots[0], slots[1], slots[4])
+            case (0, 4, 5):
+                return self.mul_by_045(slots[0], slots[4], slots[5])
+            case _:
+                line_eval = line_eval.to_dense()
+
     return self * line_eval
 
+Fq12.mul_by_014 = mul_by_014
+Fq12.mul_by_045 = mul_by_045
 Fq12.mul_by_line_eval = mul_by_line_eval
 
+# Granger-Scott and Karabina squarings in the cyclotomic subgroup of Fq12
+Fq12.cyclotomic_square = cyclotomic_square
+Fq12.compressed_cyclotomic_square = compressed_cyclotomic_square
+Fq12.repeated_cyclotomic_square = repeated_cyclotomic_square
+Fq12.compressed_cyclotomic_exp = compressed_cyclotomic_exp
+
 # Scalar field of the curve
 Fr = base_field_from_modulus(q=r)
 
 # Curves
-bls12_381_curve = Curve(a = Fq(a), b = Fq(b))
-bls12_381_twisted_curve = Curve(a = Fq2.zero(), b = Fq(b) * NON_RESIDUE_FQ2)
+bls12_381_curve = Curve(a = Fq(a), b = Fq(b), order = h1 * r, subgroup_order = r)
+bls12_381_twisted_curve = Curve(a = Fq2.zero(), b = Fq(b) * NON_RESIDUE_FQ2, order = h2 * r, subgroup_order = r)
 
 # Curve classes
 BLS12_381, _ = elliptic_curve_from_curve(curve=bls12_381_curve)
@@ -60,6 +105,102 @@ def to_base_curve(self):
 BLS12_381.to_twisted_curve = to_twisted_curve
 BLS12_381_Twist.to_base_curve = to_base_curve
 
+# GLV endomorphism of G1
+GLV_BETA = Fq(glv_beta)
+
+def endomorphism(self):
+    '''
+    Endomorphism phi : E --> E, (x,y) --> (beta * x, y). On G1, phi acts as multiplication by glv_lambda
+    '''
+    if self.is_infinity():
+        return BLS12_381.point_at_infinity()
+
+    return BLS12_381._new(self.x * GLV_BETA, self.y)
+
+BLS12_381.endomorphism = endomorphism
+BLS12_381.scalar_decomposition = ScalarDecomposition(basis = glv_basis, eigenvalue = glv_lambda, order = r)
+
+# GLS endomorphism of G2
+# psi(x',y') = (conj(x') * xi^-((q-1)/3), conj(y') * xi^-((q-1)/2)), where xi = NON_RESIDUE_FQ2
+PSI_X = NON_RESIDUE_FQ2.power((q-1)//3).invert()
+PSI_Y = NON_RESIDUE_FQ2.power((q-1)//2).invert()
+
+def psi(self):
+    '''
+    Endomorphism psi = Phi o Frob o Psi : E' --> E', where Psi is the untwisting morphism and Frob the q-power Frobenius.
+    Computed directly on E'(F_q^2) with the constants PSI_X and PSI_Y. On G2, psi acts as multiplication by u
+    '''
+    if self.is_infinity():
+        return BLS12_381_Twist.point_at_infinity()
+
+    return BLS12_381_Twist._new(self.x.conjugate() * PSI_X, self.y.conjugate() * PSI_Y)
+
+BLS12_381_Twist.psi = psi
+BLS12_381_Twist.endomorphism = psi
+BLS12_381_Twist.scalar_decomposition = ScalarDecomposition(basis = gls_basis, eigenvalue = u, order = r)
+
+# Subgroup membership tests [https://eprint.iacr.org/2021/1130]
+GLV_BETA_SQUARED = GLV_BETA.square()
+
+def g1_is_in_subgroup(self):
+    '''
+    P is in G1 if and only if sigma(P) = -u^2 P, where sigma = phi^2 : (x,y) --> (beta^2 * x, y)
+    '''
+    if self.is_infinity():
+        return True
+    if type(self.x) is not Fq:
+        return EllipticCurve.is_in_subgroup(self)
+
+    sigma = BLS12_381._new(self.x * GLV_BETA_SQUARED, self.y)
+
+    return sigma.to_jacobian() == self.to_jacobian().multiply(-u**2)
+
+def g2_is_in_subgroup(self):
+    '''
+    Q is in G2 if and only if psi(Q) = u Q
+    '''
+    if self.is_infinity():
+        return True
+
+    return self.psi().to_jacobian() == self.to_jacobian().multiply(u)
+
+def gt_is_in_subgroup(self):
+    '''
+    f is in GT if and only if f is in the cyclotomic subgroup (f^(q^4 - q^2 + 1) = 1) and f^q = f^u
+    '''
+    if self.frobenius(4) * self != self.frobenius(2):
+        return False
+
+    return self.frobenius(1) == self.cyclotomic_power_by_chain(u_chain)
+
+BLS12_381.is_in_subgroup = g1_is_in_subgroup
+BLS12_381_Twist.is_in_subgroup = g2_is_in_subgroup
+Fq12.is_in_subgroup = gt_is_in_subgroup
+
+# Cofactor clearing [https://datatracker.ietf.org/doc/html/rfc9380#section-8.8]
+def g1_clear_cofactor(self):
+    '''
+    Map P to G1 by computing h_eff1 * P = (1 - u) P
+    '''
+    return self.to_jacobian().multiply(h_eff1).to_affine()
+
+def g2_clear_cofactor(self):
+    '''
+    Map Q to G2 by computing h_eff2 * Q = (u^2 - u - 1) Q + (u - 1) psi(Q) + psi^2(2 Q) (Budroni-Pintore)
+    '''
+    t1 = self.to_jacobian().multiply(u).to_affine()
+    t2 = self.psi()
+    t3 = (self + self).psi().psi()
+    t3 = t3 - t2
+    t2 = (t1 + t2).to_jacobian().multiply(u).to_affine()
+    t3 = t3 + t2
+    t3 = t3 - t1
+
+    return t3 - self
+
+BLS12_381.clear_cofactor = g1_clear_cofactor
+BLS12_381_Twist.clear_cofactor = g2_clear_cofactor
+
 # BilinearPairing
 bls12_381 = BilinearPairingCurve(
     q = q,
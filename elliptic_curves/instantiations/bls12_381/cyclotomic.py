@@ -0,0 +1,174 @@
+# Arithmetic in the cyclotomic subgroup of F_q^12 = F_q^6[w] / (w^2 - v), F_q^6 = F_q^2[v] / (v^3 - xi) ----------------------
+#
+# Writing y = w^3 (so that y^2 = xi), an element f = (a0 + a1 v + a2 v^2) + (b0 + b1 v + b2 v^2) w of F_q^12 can be seen as
+#   f = A + B w + C w^2, with A = a0 + b1 y, B = b0 + a2 y, C = a1 + b2 y in F_q^4 = F_q^2[y] / (y^2 - xi)
+# and w^3 = y. This is the representation used by Granger-Scott and Karabina to square elements of the cyclotomic subgroup.
+
+def fq4_square(x0, x1, mul_by_xi):
+    """
+    Square the element x0 + x1 y of F_q^4 = F_q^2[y] / (y^2 - xi). Return the two coordinates of the result
+    """
+    x0_squared = x0.square()
+    x1_squared = x1.square()
+
+    return x0_squared + mul_by_xi(x1_squared), (x0 + x1).square() - x0_squared - x1_squared
+
+def cyclotomic_square(self):
+    """
+    Granger-Scott squaring in the cyclotomic subgroup [https://eprint.iacr.org/2009/565]:
+        f^2 = (3 A^2 - 2 conj(A)) + (3 y C^2 + 2 conj(B)) w + (3 B^2 - 2 conj(C)) w^2
+    """
+    Fq12 = type(self)
+    Fq6 = Fq12.BASE_FIELD
+    mul_by_xi = Fq6.mul_by_non_residue
+
+    a0, a1, a2 = self.x0.x0, self.x0.x1, self.x0.x2
+    b0, b1, b2 = self.x1.x0, self.x1.x1, self.x1.x2
+
+    # A^2, B^2, C^2
+    t0, t1 = fq4_square(a0, b1, mul_by_xi)
+    t2, t3 = fq4_square(b0, a2, mul_by_xi)
+    t4, t5 = fq4_square(a1, b2, mul_by_xi)
+
+    # 3 A^2 - 2 conj(A)
+    a0 = (t0 - a0).scalar_mul(2) + t0
+    b1 = (t1 + b1).scalar_mul(2) + t1
+    # 3 y C^2 + 2 conj(B)
+    t5 = mul_by_xi(t5)
+    b0 = (t5 + b0).scalar_mul(2) + t5
+    a2 = (t4 - a2).scalar_mul(2) + t4
+    # 3 B^2 - 2 conj(C)
+    a1 = (t2 - a1).scalar_mul(2) + t2
+    b2 = (t3 + b2).scalar_mul(2) + t3
+
+    return Fq12(Fq6(a0, a1, a2), Fq6(b0, b1, b2))
+
+def compressed_cyclotomic_square(self):
+    """
+    Karabina's compressed squaring [https://eprint.iacr.org/2010/542]: only B and C are squared (their squares only depend on B and C).
+    The coordinates a0 and b1 of the output are set to zero, use batch_decompress to recover them
+    """
+    Fq12 = type(self)
+    Fq6 = Fq12.BASE_FIELD
+    Fq2 = Fq6.BASE_FIELD
+    mul_by_xi = Fq6.mul_by_non_residue
+
+    a1, a2 = self.x0.x1, self.x0.x2
+    b0, b2 = self.x1.x0, self.x1.x2
+
+    # B^2, C^2
+    t2, t3 = fq4_square(b0, a2, mul_by_xi)
+    t4, t5 = fq4_square(a1, b2, mul_by_xi)
+
+    # 3 y C^2 + 2 conj(B)
+    t5 = mul_by_xi(t5)
+    b0 = (t5 + b0).scalar_mul(2) + t5
+    a2 = (t4 - a2).scalar_mul(2) + t4
+    # 3 B^2 - 2 conj(C)
+    a1 = (t2 - a1).scalar_mul(2) + t2
+    b2 = (t3 + b2).scalar_mul(2) + t3
+
+    return Fq12(Fq6(Fq2.zero(), a1, a2), Fq6(b0, Fq2.zero(), b2))
+
+def batch_decompress(compressed: list) -> list:
+    """
+    Recover the coordinates a0 and b1 of the elements in compressed (see compressed_cyclotomic_square). The divisions are batched in a single inversion.
+        b1 = (xi * b2^2 + 3 * a1^2 - 2 * a2) / (4 * b0)   if b0 != 0
+        b1 = 2 * a1 * b2 / a2                            if b0 == 0
+        a0 = xi * (2 * b1^2 + b0 * b2 - 3 * a1 * a2) + 1
+    If b0 == a2 == 0, b1 is not determined by the compressed coordinates and None is returned for the element: the callers fall back
+    to uncompressed squarings
+    """
+    if len(compressed) == 0:
+        return []
+
+    Fq12 = type(compressed[0])
+    Fq6 = Fq12.BASE_FIELD
+    Fq2 = Fq6.BASE_FIELD
+    mul_by_xi = Fq6.mul_by_non_residue
+
+    numerators = []
+    denominators = []
+    for element in compressed:
+        a1, a2 = element.x0.x1, element.x0.x2
+        b0, b2 = element.x1.x0, element.x1.x2
+        if b0.is_zero():
+            numerators.append((a1 * b2).scalar_mul(2))
+            denominators.append(a2)
+        else:
+            a1_squared = a1.square()
+            numerators.append(mul_by_xi(b2.square()) + a1_squared.scalar_mul(3) - a2.scalar_mul(2))
+            denominators.append(b0.scalar_mul(4))
+
+    inverses = Fq2.batch_invert(denominators)
+
+    out = []
+    for element, numerator, denominator, inverse in zip(compressed, numerators, denominators, inverses):
+        if denominator.is_zero():
+            out.append(None)
+            continue
+
+        a1, a2 = element.x0.x1, element.x0.x2
+        b0, b2 = element.x1.x0, element.x1.x2
+        b1 = numerator * inverse
+        a0 = mul_by_xi(b1.square().scalar_mul(2) + b0 * b2 - (a1 * a2).scalar_mul(3)) + Fq2.identity()
+        out.append(Fq12(Fq6(a0, a1, a2), Fq6(b0, b1, b2)))
+
+    return out
+
+def repeated_cyclotomic_square(self, k: int):
+    """
+    Compute self^(2^k). Long runs of squarings use compressed squarings followed by a single decompression
+    """
+    if k >= 8:
+        compressed = self
+        for i in range(k):
+            compressed = compressed.compressed_cyclotomic_square()
+
+        result = batch_decompress([compressed])[0]
+        if result is not None:
+            return result
+
+    result = self
+    for i in range(k):
+        result = result.cyclotomic_square()
+
+    return result
+
+def compressed_cyclotomic_exp(self, n: int):
+    """
+    Exponentiation in the cyclotomic subgroup using compressed squarings. The squares f^(2^i) needed for the
+    non-zero bits of n are decompressed together, so the whole exponentiation costs a single F_q^2 inversion.
+    This is advantageous for exponents of low Hamming weight, such as the seed of BLS12_381
+    """
+    Fq12 = type(self)
+
+    if n == 0:
+        return Fq12.identity()
+
+    m = abs(n)
+
+    squares = []
+    compressed = self
+    for i in range(1,m.bit_length()):
+        compressed = compressed.compressed_cyclotomic_square()
+        if (m >> i) & 1:
+            squares.append(compressed)
+
+    squares = batch_decompress(squares)
+    if any(square is None for square in squares):
+        # Some squares cannot be decompressed (see batch_decompress): compute them with uncompressed squarings
+        squares = []
+        square = self
+        for i in range(1,m.bit_length()):
+            square = square.cyclotomic_square()
+            if (m >> i) & 1:
+                squares.append(square)
+
+    result = self if m & 1 else Fq12.identity()
+    for square in squares:
+        result = result * square
+
+    return result.conjugate() if n < 0 else result
+
+# -----------------------------------------------------------------------------------------------------------------------------
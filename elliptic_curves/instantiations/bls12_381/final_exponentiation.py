@@ -1,7 +1,12 @@
+from elliptic_curves.fields.addition_chain import compile_chain
 from elliptic_curves.instantiations.bls12_381.parameters import u
 
 # Final exponentiation --------------------------------------------------------------------------------------------------------
 
+# Programs for the exponentiations by u and u//2 in the cyclotomic subgroup, compiled once at import
+u_chain = compile_chain(u)
+half_u_chain = compile_chain(u//2)
+
 def easy_exponentiation(miller_loop_output):
         '''
         Easy exponentation for BLS12_381: f -> f^{(q^6-1)(q^2+1)}
@@ -15,24 +20,27 @@ def easy_exponentiation(miller_loop_output):
 def hard_exponentiation(miller_loop_output):
     '''
     Hard exponentation for BLS12_381
+
+    The input is the output of the easy exponentiation, so it lies in the cyclotomic subgroup: squarings are
+    cyclotomic squarings, inverses are conjugates, and the powers by u and u//2 run the precompiled chains
     '''
 
-    t0 = miller_loop_output.power(2)
-    t1 = t0.power(u)
-    t2 = t1.power(u//2)
+    t0 = miller_loop_output.cyclotomic_square()
+    t1 = t0.cyclotomic_power_by_chain(u_chain)
+    t2 = t1.cyclotomic_power_by_chain(half_u_chain)
     t3 = miller_loop_output.conjugate()
     t1 = t1 * t3
     t1 = t1.conjugate()
     t1 = t1 * t2
-    t2 = t1.power(u)
-    t3 = t2.power(u)
+    t2 = t1.cyclotomic_power_by_chain(u_chain)
+    t3 = t2.cyclotomic_power_by_chain(u_chain)
     t1 = t1.conjugate()
     t3 = t1 * t3
-    t1 = t1.invert()
+    t1 = t1.conjugate()
     t1 = t1.frobenius(n=3)
     t2 = t2.frobenius(n=2)
     t1 = t1 * t2
-    t2 = t3.power(u)
+    t2 = t3.cyclotomic_power_by_chain(u_chain)
     t2 = t2 * t0
     t2 = t2 * miller_loop_output
     t1 = t1 * t2 
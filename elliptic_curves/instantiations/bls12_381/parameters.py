@@ -26,6 +26,21 @@ NON_RESIDUE_FQ6 = [0,0,1,0,0,0] # List serialisation
 h1 = (u-1)**2 // 3
 h2 = (u**8 - 4*u**7 + 5*u**6 - 4*u**4 + 6*u**3 - 4*u**2 - 4*u + 13) // 9
 
+# Effective cofactors: clear_cofactor multiplies by h_eff1 on E and h_eff2 on the twist, which clear the cofactors faster than h1 and h2
+h_eff1 = 1 - u
+h_eff2 = 3 * (u**2 - 1) * h2
+
+# GLV endomorphism of G1: (x,y) --> (beta * x, y), with beta a cube root of unity in F_q, acts on G1 as multiplication by
+# lambda = u^2 - 1, a cube root of unity modulo r
+glv_beta = 4002409555221667392624310435006688643935503118305586438271171395842971157480381377015405980053539358417135540939436
+glv_lambda = u**2 - 1
+# Reduced basis of the lattice {(k0,k1) : k0 + k1 * lambda = 0 mod r}
+glv_basis = [[glv_lambda, -1], [1, glv_lambda + 1]]
+
+# GLS endomorphism of G2: psi = untwist-Frobenius-twist acts on G2 as multiplication by u
+# Reduced basis of the lattice {(k0,k1,k2,k3) : k0 + k1 * u + k2 * u^2 + k3 * u^3 = 0 mod r}
+gls_basis = [[u, -1, 0, 0], [0, u, -1, 0], [0, 0, u, -1], [1, 0, -1, u]]
+
 # Generators
 g1_X = 3685416753713387016781088315183077757961620795782546409894578378688607592378376318836054947676345821548104185464507
 g1_Y = 1339506544944476473020471379941921221584933875938349620426543736416511423956333506472724655353366534992391756441569
@@ -1,7 +1,11 @@
+from elliptic_curves.fields.addition_chain import compile_chain
 from elliptic_curves.instantiations.mnt4_753.parameters import u
 
 # Final exponentiation --------------------------------------------------------------------------------------------------------
 
+# Program for the exponentiation by u (the non-trivial part of the hard exponent q + u + 1) in the cyclotomic subgroup, compiled once at import
+u_chain = compile_chain(u)
+
 def easy_exponentiation(miller_loop_output):
     """
     Easy exponentiation for MNT4_753 is f -> f^{q^2-1}
@@ -13,8 +17,10 @@ def easy_exponentiation(miller_loop_output):
 def hard_exponentiation(cyclotomic_element):
     """
     Hard exponentiation for MNT4_753 is f -> f^{q + u + 1}
+
+    The input lies in the cyclotomic subgroup, so the power by the (negative) u runs the precompiled chain with cyclotomic squarings and conjugates
     """
 
-    return cyclotomic_element.frobenius(1) * cyclotomic_element.power(u) * cyclotomic_element
+    return cyclotomic_element.frobenius(1) * cyclotomic_element.cyclotomic_power_by_chain(u_chain) * cyclotomic_element
     
 # -----------------------------------------------------------------------------------------------------------------------------
\ No newline at end of file
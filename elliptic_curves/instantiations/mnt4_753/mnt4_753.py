@@ -3,9 +3,10 @@ from elliptic_curves.fields.quadratic_extension import quadratic_extension_from_
 
 from elliptic_curves.models.ec import elliptic_curve_from_curve
 from elliptic_curves.models.curve import Curve, BilinearPairingCurve
+from elliptic_curves.models.line_evaluation import LineEvaluation
 
 from elliptic_curves.instantiations.mnt4_753.parameters import *
-from elliptic_curves.instantiations.mnt4_753.final_exponentiation import easy_exponentiation, hard_exponentiation
+from elliptic_curves.instantiations.mnt4_753.final_exponentiation import easy_exponentiation, hard_exponentiation, u_chain
 
 # Field instantiation
 Fq = base_field_from_modulus(q=q)
@@ -14,9 +15,28 @@ Fq2 = quadratic_extension_from_base_field_and_non_residue(base_field=Fq,non_resi
 NON_RESIDUE_FQ2 = Fq2.from_list(NON_RESIDUE_FQ2)
 Fq4 = quadratic_extension_from_base_field_and_non_residue(base_field=Fq2,non_residue=NON_RESIDUE_FQ2)
 
-# Define mul_by_line_eval method for Fq4
-# We are not customising line_evaluations, so they will be elements in the miller_ouput_type
-def mul_by_line_eval(self,line_eval):
+# Sparse multiplication for the line evaluations of the Miller loops
+def mul_by_line_eval(self, line_eval):
+    '''
+    Multiplication by line_eval, an element of Fq4 or a LineEvaluation. The slots of a LineEvaluation are multiplied directly: 2
+    multiplications in Fq2 if only one slot is non-zero, 3 (Karatsuba) otherwise
+    '''
+    if isinstance(line_eval, LineEvaluation):
+        slots = line_eval.slots
+        match line_eval.pattern():
+            case (0,):
+                return Fq4(self.x0 * slots[0], self.x1 * slots[0])
+            case (1,):
+                # (x0 + x1 r) * c1 r = x1 c1 u + x0 c1 r
+                return Fq4((self.x1 * slots[1]).mul_by_generator(), self.x0 * slots[1])
+            case (0, 1):
+                c0, c1 = slots[0], slots[1]
+                v0 = self.x0 * c0
+                v1 = self.x1 * c1
+                return Fq4(v0 + v1.mul_by_generator(), (self.x0 + self.x1) * (c0 + c1) - v0 - v1)
+            case _:
+                return Fq4.zero()
+
     return self * line_eval
 
 Fq4.mul_by_line_eval = mul_by_line_eval
@@ -25,8 +45,8 @@ Fq4.mul_by_line_eval = mul_by_line_eval
 Fr = base_field_from_modulus(q=r)
 
 # Curves
-mnt4_753_curve = Curve(a = Fq(a), b = Fq(b))
-mnt4_753_twisted_curve = Curve(a = Fq2(NON_RESIDUE_FQ.scalar_mul(a),Fq.zero()), b = Fq2(Fq.zero(),NON_RESIDUE_FQ.scalar_mul(b)))
+mnt4_753_curve = Curve(a = Fq(a), b = Fq(b), order = h1 * r, subgroup_order = r)
+mnt4_753_twisted_curve = Curve(a = Fq2(NON_RESIDUE_FQ.scalar_mul(a),Fq.zero()), b = Fq2(Fq.zero(),NON_RESIDUE_FQ.scalar_mul(b)), order = h2 * r, subgroup_order = r)
 
 # Curve classes
 MNT4_753, _ = elliptic_curve_from_curve(curve=mnt4_753_curve)
@@ -57,6 +77,17 @@ MNT4_753.to_twisted_curve = to_twisted_curve
 MNT4_753_Twist.to_base_curve = to_base_curve
 
 # BilinearPairing
+def gt_is_in_subgroup(self):
+    '''
+    f is in GT if and only if f is in the cyclotomic subgroup (f^(q^2 + 1) = 1) and f^q = f^u, as q - u = r
+    '''
+    if self.frobenius(2) * self != Fq4.identity():
+        return False
+
+    return self.frobenius(1) == self.cyclotomic_power_by_chain(u_chain)
+
+Fq4.is_in_subgroup = gt_is_in_subgroup
+
 mnt4_753 = BilinearPairingCurve(
     q = q,
     r = r,
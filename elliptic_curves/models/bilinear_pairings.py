@@ -1,5 +1,35 @@
 from typing import Optional
-from copy import deepcopy
+
+from elliptic_curves.models.line_evaluation import LineEvaluation
+from elliptic_curves.models.prepared_g2 import PreparedG2, curve_identifier
+
+def evaluate_line(line: tuple, twisted_P: tuple):
+    """
+    Evaluate the line c0 + cx * x + cy * y on the twisted curve, line = (c0, cx, cy), at the image (x_P, y_P) = twisted_P of P on the
+    twisted curve (see BilinearPairing.twisted_coordinates)
+    """
+    c0, cx, cy = line
+    x_P, y_P = twisted_P
+
+    return LineEvaluation(x_P.Field, {0: c0}) + x_P.scale(cx) + y_P.scale(cy)
+
+def miller_loop_step(T, R, P, denominator_elimination: Optional[str]):
+    """
+    One step of the affine Miller loops: return T + R and the evaluation at P of the line through T and R, with the denominator
+    elimination technique denominator_elimination
+    """
+    line_eval = T.sparse_line_evaluation(R,P)
+    T = T + R
+
+    match denominator_elimination:
+        case 'quadratic':
+            line_eval = line_eval
+        case 'cubic':
+            raise ValueError("To do!")
+        case None:
+            line_eval = line_eval * T.sparse_line_evaluation(-T,P).invert()
+
+    return T, line_eval
 
 class BilinearPairing:
     def __init__(self, bilinear_pairing_curve, miller_output_type, easy_exponentiation, hard_exponentation):
@@ -19,77 +49,13 @@ class BilinearPairing:
 
         The denominator_elimination variable decides which technique to use for denominator elimination
         """
-        assert(denominator_elimination in [None, 'quadratic', 'cubic'])
-
-        f = self.miller_output_type.identity()
-        untwisted_Q = Q.to_base_curve()
-        exp_miller_loop = self.exp_miller_loop
-
-        if exp_miller_loop[-1] == 1:
-            T = untwisted_Q
-        elif exp_miller_loop[-1] == -1:
-            T = -untwisted_Q
-        else:
-            raise ValueError('The most significant element of exp_miller_loop must be non-zero')
-
-        for i in range(len(exp_miller_loop)-2,-1,-1):
-            f = f.power(2)
-
-            line_eval = T.line_evaluation(T,P)
-            T = T + T
-
-            match denominator_elimination:
-                case 'quadratic':
-                    line_eval = line_eval
-                case 'cubic':
-                    raise ValueError("To do!")
-                case None:
-                    line_eval = line_eval * T.line_evaluation(-T,P).invert()
-
-            f = f.mul_by_line_eval(line_eval)
-            
-            if exp_miller_loop[i] == 1:
-                line_eval = T.line_evaluation(untwisted_Q,P)
-                T = T + untwisted_Q
-                
-                match denominator_elimination:
-                    case 'quadratic':
-                        line_eval = line_eval
-                    case 'cubic':
-                        raise ValueError("To do!")
-                    case None:
-                        line_eval = line_eval * T.line_evaluation(-T,P).invert()
-                
-                f = f.mul_by_line_eval(line_eval)
-            elif exp_miller_loop[i] == -1:
-                line_eval = T.line_evaluation(-untwisted_Q,P)
-                T = T - untwisted_Q
-                
-                match denominator_elimination:
-                    case 'quadratic':
-                        line_eval = line_eval
-                    case 'cubic':
-                        raise ValueError("To do!")
-                    case None:
-                        line_eval = line_eval * T.line_evaluation(-T,P).invert()
-                f = f.mul_by_line_eval(line_eval)
-            else:
-                pass
-
-        return f
+        return self.multi_miller_loop([(P,Q)],'base_curve',denominator_elimination)
     
     def triple_miller_loop_on_base_curve(self, P1, P2, P3, Q1, Q2, Q3, denominator_elimination: Optional[str] = None):
         """
-        Computes the product of three Miller loops on the base curve.
-        It is not optimised at the moment (it computes three loops and multiplies them)
+        Computes the product of three Miller loops on the base curve (see multi_miller_loop)
         """
-        assert(denominator_elimination in [None, 'quadratic', 'cubic'])
-
-        out1 = self.miller_loop_on_base_curve(P1,Q1,denominator_elimination)
-        out2 = self.miller_loop_on_base_curve(P2,Q2,denominator_elimination)
-        out3 = self.miller_loop_on_base_curve(P3,Q3,denominator_elimination)
-
-        return out1 * out2 * out3
+        return self.multi_miller_loop([(P1,Q1),(P2,Q2),(P3,Q3)],'base_curve',denominator_elimination)
     
     def miller_loop_on_twisted_curve(self, P, Q, denominator_elimination: Optional[str] = None):
         """
@@ -98,85 +64,148 @@ class BilinearPairing:
         
         The denominator_elimination variable decides which technique to use for denominator elimination
         """
+        return self.multi_miller_loop([(P,Q)],'twisted_curve',denominator_elimination)
+    
+    def triple_miller_loop_on_twisted_curve(self, P1, P2, P3, Q1, Q2, Q3, denominator_elimination: Optional[str] = None):
+        """
+        Computes the product of three Miller loops on the twisted curve (see multi_miller_loop)
+        """
+        return self.multi_miller_loop([(P1,Q1),(P2,Q2),(P3,Q3)],'twisted_curve',denominator_elimination)
+    
+    def miller_loop(self, P, Q):
+        """
+        Compute the Miller loop on P and Q, keeping T on the twisted curve in homogeneous projective coordinates.
+        This implementation is inversion-free.
+
+        At every step, T.double_with_line (or T.mixed_add_with_line) returns the coefficients (c0, cx, cy) of the line on the twisted
+        curve, which is evaluated at the twisted image of P (see evaluate_line). The evaluation is a sparse LineEvaluation, multiplied
+        into f with miller_output_type.mul_by_line_eval.
+        The vertical lines and the factors in the field of definition of the twist are dropped: the output differs from that of
+        miller_loop_on_base_curve by a factor sent to 1 by the final exponentiation
+        """
+        return self.multi_miller_loop([(P,Q)])
+
+    def multi_miller_loop(self, pairs: list, miller_loop_type: str = 'projective', denominator_elimination: Optional[str] = None):
+        """
+        Compute the product of the Miller loops on the pairs (P, Q) of pairs, walking exp_miller_loop once: the accumulator is squared once
+        per step, and the line evaluations of all the pairs are multiplied into it. The pairs in which P or Q is the point at infinity are
+        skipped (their Miller loop is 1).
+
+        miller_loop_type is one of:
+            'projective': the inversion-free loop of miller_loop. Q can be a PreparedG2 (see prepare_g2)
+            'base_curve': the affine loop of miller_loop_on_base_curve
+            'twisted_curve': the affine loop of miller_loop_on_twisted_curve
+        The output is exactly the product of the outputs of the corresponding single loops. denominator_elimination is only used by the
+        affine loops
+        """
+        assert(miller_loop_type in ['projective', 'base_curve', 'twisted_curve'])
         assert(denominator_elimination in [None, 'quadratic', 'cubic'])
 
         f = self.miller_output_type.identity()
-        twisted_P = P.to_twisted_curve()
         exp_miller_loop = self.exp_miller_loop
 
-        if exp_miller_loop[-1] == 1:
-            T = deepcopy(Q)
-        elif exp_miller_loop[-1] == -1:
-            T = -deepcopy(Q)
-        else:
+        if exp_miller_loop[-1] not in [1, -1]:
             raise ValueError('The most significant element of exp_miller_loop must be non-zero')
-        
+
+        loops = [self.line_evaluations(P,Q,miller_loop_type,denominator_elimination) for P, Q in pairs if not (P.is_infinity() or Q.is_infinity())]
+
         for i in range(len(exp_miller_loop)-2,-1,-1):
-            f = f.power(2)
+            f = f.square()
 
-            line_eval = T.line_evaluation(T,twisted_P)
-            T = T + T
+            for line_evaluations in loops:
+                f = f.mul_by_line_eval(next(line_evaluations))
+                if exp_miller_loop[i] != 0:
+                    f = f.mul_by_line_eval(next(line_evaluations))
 
-            match denominator_elimination:
-                case 'quadratic':
-                    line_eval = line_eval
-                case 'cubic':
-                    raise ValueError("To do!")
-                case None:
-                    line_eval = line_eval * T.line_evaluation(-T,twisted_P).invert()
+        return f
+
+    def line_evaluations(self, P, Q, miller_loop_type: str = 'projective', denominator_elimination: Optional[str] = None):
+        """
+        Generate the evaluations at P of the lines of the Miller loop on P and Q of type miller_loop_type (see multi_miller_loop), in the order
+        of the loop: at every step, the line of the doubling, then the line of the addition if the digit of exp_miller_loop is not zero
+        """
+        exp_miller_loop = self.exp_miller_loop
+
+        if miller_loop_type == 'projective':
+            twisted_P = self.twisted_coordinates(P)
+            if isinstance(Q, PreparedG2):
+                # Q must have been prepared for this pairing
+                assert(Q.curve == curve_identifier(self.twisted_curve))
+                Q.build(type(self.twisted_curve.a))
+                lines = Q.lines
+            else:
+                lines = self.line_coefficients(Q)
+            for line in lines:
+                yield evaluate_line(line, twisted_P)
+            return
+
+        if miller_loop_type == 'base_curve':
+            Q = Q.to_base_curve()
+        else:
+            P = P.to_twisted_curve()
+        minus_Q = -Q
+
+        T = Q if exp_miller_loop[-1] == 1 else minus_Q
+        for i in range(len(exp_miller_loop)-2,-1,-1):
+            T, line_eval = miller_loop_step(T, T, P, denominator_elimination)
+            yield line_eval
 
-            f = f.mul_by_line_eval(line_eval)
-            
             if exp_miller_loop[i] == 1:
-                line_eval = T.line_evaluation(Q,twisted_P)
-                T = T + Q
-                
-                match denominator_elimination:
-                    case 'quadratic':
-                        line_eval = line_eval
-                    case 'cubic':
-                        raise ValueError("To do!")
-                    case None:
-                        line_eval = line_eval * T.line_evaluation(-T,twisted_P).invert()
-                
-                f = f.mul_by_line_eval(line_eval)
+                T, line_eval = miller_loop_step(T, Q, P, denominator_elimination)
+                yield line_eval
             elif exp_miller_loop[i] == -1:
-                line_eval = T.line_evaluation(-Q,twisted_P)
-                T = T - Q
-                
-                match denominator_elimination:
-                    case 'quadratic':
-                        line_eval = line_eval
-                    case 'cubic':
-                        raise ValueError("To do!")
-                    case None:
-                        line_eval = line_eval * T.line_evaluation(-T,twisted_P).invert()
-                f = f.mul_by_line_eval(line_eval)
-            else:
-                pass
+                T, line_eval = miller_loop_step(T, minus_Q, P, denominator_elimination)
+                yield line_eval
 
-        return f
-    
-    def triple_miller_loop_on_twisted_curve(self, P1, P2, P3, Q1, Q2, Q3, denominator_elimination: Optional[str] = None):
+    def line_coefficients(self, Q):
         """
-        Computes the product of three Miller loops on the base curve.
-        It is not optimised at the moment (it computes three loops and multiplies them)
+        Generate the coefficients (c0, cx, cy) of the lines of the inversion-free Miller loop on Q (see miller_loop), in the order of the loop
         """
+        exp_miller_loop = self.exp_miller_loop
+        minus_Q = -Q
 
-        out1 = self.miller_loop_on_twisted_curve(P1,Q1,denominator_elimination)
-        out2 = self.miller_loop_on_twisted_curve(P2,Q2,denominator_elimination)
-        out3 = self.miller_loop_on_twisted_curve(P3,Q3,denominator_elimination)
+        T = Q.to_projective() if exp_miller_loop[-1] == 1 else minus_Q.to_projective()
+        for i in range(len(exp_miller_loop)-2,-1,-1):
+            T, line = T.double_with_line()
+            yield line
+
+            if exp_miller_loop[i] == 1:
+                T, line = T.mixed_add_with_line(Q)
+                yield line
+            elif exp_miller_loop[i] == -1:
+                T, line = T.mixed_add_with_line(minus_Q)
+                yield line
+
+    def prepare_g2(self, Q):
+        """
+        Compute the lines of the inversion-free Miller loop on Q once, for the Miller loops (and pairings) with a fixed point Q of the
+        twisted curve (e.g., the points of a Groth16 verifying key). See PreparedG2
+        """
+        curve = curve_identifier(self.twisted_curve)
+
+        if Q.is_infinity():
+            return PreparedG2(curve, [], [])
+
+        coefficients = [n for line in self.line_coefficients(Q) for coefficient in line for n in coefficient.to_list()]
+
+        return PreparedG2(curve, Q.to_list(), coefficients)
+
+    def twisted_coordinates(self, P):
+        """
+        The coordinates of the image of P on the twisted curve, as LineEvaluations in miller_output_type
+        """
+        twisted_P = P.to_twisted_curve()
+
+        return (LineEvaluation.from_element(twisted_P.x, self.miller_output_type), LineEvaluation.from_element(twisted_P.y, self.miller_output_type))
 
-        return out1 * out2 * out3
-    
     def pairing(self, P, Q):
         """
-        Computes the bilinear pairing on P and Q
+        Computes the bilinear pairing on P and Q, with the inversion-free Miller loop (see miller_loop)
         """
         if P.is_infinity() or Q.is_infinity():
             return self.miller_output_type.identity()
         else:
-            out = self.miller_loop_on_base_curve(P,Q)
+            out = self.miller_loop(P,Q)
             out = self.easy_exponentiation(out)
             out = self.hard_exponentiation(out)
 
@@ -184,18 +213,31 @@ class BilinearPairing:
 
     def triple_pairing(self, P1, P2, P3, Q1, Q2, Q3):
         """
-        Computes the product of three pairings
-
-        The current implementation only allows the computation when neither of the Pi's or the Qi's is the point at infinity
+        Computes the product of three pairings (see pairing_product)
         """
+        return self.pairing_product([(P1,Q1),(P2,Q2),(P3,Q3)])
 
-        assert(not(P1.is_infinity() or P2.is_infinity() or P3.is_infinity() or Q1.is_infinity() or Q2.is_infinity() or Q3.is_infinity())) 
+    def pairing_product(self, pairs: list):
+        """
+        Computes the product of the pairings on the pairs (P, Q) of pairs, with one multi_miller_loop and a single final exponentiation.
+        The pairs in which P or Q is the point at infinity are neutral, and the product of no pairs is the identity. Q can be a PreparedG2
+        (see prepare_g2)
+        """
+        pairs = [(P, Q) for P, Q in pairs if not (P.is_infinity() or Q.is_infinity())]
+        if len(pairs) == 0:
+            return self.miller_output_type.identity()
 
-        out = self.triple_miller_loop_on_base_curve(P1,P2,P3,Q1,Q2,Q3)
+        out = self.multi_miller_loop(pairs)
         out = self.easy_exponentiation(out)
         out = self.hard_exponentiation(out)
 
         return out
+
+    def pairing_product_is_one(self, pairs: list) -> bool:
+        """
+        Checks whether the product of the pairings on the pairs (P, Q) of pairs is the identity, as in the verification equation of Groth16
+        """
+        return self.pairing_product(pairs) == self.miller_output_type.identity()
     
 
 
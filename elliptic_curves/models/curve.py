@@ -5,11 +5,18 @@ class Curve:
     Curve class to keep track of curve parameters
     '''
 
-    def __init__(self, a, b):
+    def __init__(self, a, b, order = None, subgroup_order = None):
+        """
+        Curve y^2 = x^3 + a x + b over the field of a and b. If order (the number of points of the curve over that field) is given,
+        scalar multiplications reduce their scalars modulo order. subgroup_order is the order of the subgroup of cryptographic interest
+        (e.g., G1 or G2 of a pairing), used by is_in_subgroup
+        """
         assert(not(a.power(3).scalar_mul(4) - b.power(2).scalar_mul(27)).is_zero())                    # Assert curve is not singular
 
         self.a = a
         self.b = b
+        self.order = order
+        self.subgroup_order = subgroup_order
         
         return
 
@@ -22,7 +29,11 @@ class Curve:
             return y.power(2) - x.power(3) - self.a * x - self.b * Field.identity()
         
 class BilinearPairingCurve(BilinearPairing):
-    def __init__(self, q, r, val_miller_loop, exp_miller_loop, h1, h2, curve, twisted_curve, g1, g2, miller_output_type, easy_exponentiation, hard_exponentiation):
+    def __init__(self, q, r, val_miller_loop, exp_miller_loop, h1, h2, curve, twisted_curve, g1, g2, miller_output_type, easy_exponentiation, hard_exponentiation, fixed_base_window = 4):
+        """
+        If fixed_base_window is not None, fixed-base tables with that window are attached to g1 and g2 (see FixedBaseTable).
+        They are computed at the first multiplication of the generators
+        """
         self.q = q
         self.r = r
         # Value for which we compute the Miller loop: a s.t. e(P,Q) requires computing f_{a,Q}(P)
@@ -39,16 +50,53 @@ class BilinearPairingCurve(BilinearPairing):
         self.easy_exponentiation = easy_exponentiation
         self.hard_exponentiation = hard_exponentiation
 
+        if fixed_base_window is not None:
+            g1.precompute_fixed_base(window = fixed_base_window, order = r, lazy = True)
+            g2.precompute_fixed_base(window = fixed_base_window, order = r, lazy = True)
+
         return
     
-    def deserialise_vk(self, serialised: list[bytes]):
+    def validate_points(self, points: list):
+        """
+        Raise a ValueError if one of the points is not in its prime-order subgroup (G1 or G2)
+        """
+        for point in points:
+            if not point.is_in_subgroup():
+                raise ValueError(f'The point {point} is not in the subgroup of order r')
+
+        return
+
+    def serialise_vk(self, vk, compressed: bool = False) -> list[int]:
+        '''
+        Inverse of deserialise_vk: serialise the verifying key vk in the uncompressed (compressed = False) or compressed mode of arkworks
+        '''
+        out = vk['alpha'].serialise(compressed)
+        for key in ['beta', 'gamma', 'delta']:
+            out += vk[key].serialise(compressed)
+        out += list(len(vk['gamma_abc']).to_bytes(8, byteorder='little'))
+        for point in vk['gamma_abc']:
+            out += point.serialise(compressed)
+
+        return out
+
+    def serialise_proof(self, proof, compressed: bool = False) -> list[int]:
+        """
+        Inverse of deserialise_proof: serialise proof in the uncompressed (compressed = False) or compressed mode of arkworks
+        """
+        return proof['a'].serialise(compressed) + proof['b'].serialise(compressed) + proof['c'].serialise(compressed)
+
+    def deserialise_vk(self, serialised: list[bytes], validate: bool = False, compressed: bool = None):
         '''
         Deserialise the serialisation of a verifying key. This function is based on the deserialisation of VK in arkworks. [https://github.com/arkworks-rs/groth16/blob/master/src/data_structures.rs#L32]
+        If validate is True, raise a ValueError if a point is not in G1 or G2 (see is_in_subgroup)
 
         vk is a list of: alpha_g1, beta_g2, gamma_g2, delta_g2, gamma_abc_g1, and each element is serialised in turn
             alpha_g1 -> element in G1
             beta_g2, gamma_g2, delta_g2 -> elements in G2
             gamma_abc_g1 -> list of elements in G1 (as it is a vector, is prepended with the length of the list, encoded as an 8-byte little-endian number )
+
+        The points are serialised in the compressed mode of arkworks if compressed is True, in the uncompressed one if it is False.
+        If compressed is None, the mode is the one consistent with the length of serialised
         '''
         G1 = type(self.g1)
         G2 = type(self.g2)
@@ -59,15 +107,24 @@ class BilinearPairingCurve(BilinearPairing):
         length_G1 = (field_G1.get_modulus().bit_length() + 8) // 8 * field_G1.EXTENSION_DEGREE
         length_G2 = (field_G2.get_modulus().bit_length() + 8) // 8 * field_G2.EXTENSION_DEGREE
 
+        if compressed is None:
+            index = length_G1 + 3*length_G2
+            n_abc = int.from_bytes(bytes=bytearray(serialised[index:index+8]),byteorder='little')
+            compressed = (len(serialised) == index + 8 + n_abc * length_G1)
+
+        # Length of the serialisation of a point
+        size_G1 = length_G1 if compressed else 2*length_G1
+        size_G2 = length_G2 if compressed else 2*length_G2
+
         index = 0
-        alpha = G1.deserialise(serialised[:index+2*length_G1],field_G1)
-        index += 2*length_G1
-        beta = G2.deserialise(serialised[index:index+2*length_G2],field_G2)
-        index += 2*length_G2
-        gamma = G2.deserialise(serialised[index:index+2*length_G2],field_G2)
-        index += 2*length_G2
-        delta = G2.deserialise(serialised[index:index+2*length_G2],field_G2)
-        index += 2*length_G2
+        alpha = G1.deserialise(serialised[:index+size_G1],field_G1,compressed)
+        index += size_G1
+        beta = G2.deserialise(serialised[index:index+size_G2],field_G2,compressed)
+        index += size_G2
+        gamma = G2.deserialise(serialised[index:index+size_G2],field_G2,compressed)
+        index += size_G2
+        delta = G2.deserialise(serialised[index:index+size_G2],field_G2,compressed)
+        index += size_G2
 
         # Check correct length of gamma_abc
         n_abc = int.from_bytes(bytes=bytearray(serialised[index:index+8]),byteorder='little')
@@ -75,23 +132,31 @@ class BilinearPairingCurve(BilinearPairing):
 
         gamma_abc = []
         for i in range(n_abc):
-            gamma_abc.append(G1.deserialise(serialised[index:index+2*length_G1],field_G1))
-            index += 2*length_G1
+            gamma_abc.append(G1.deserialise(serialised[index:index+size_G1],field_G1,compressed))
+            index += size_G1
 
         assert(index == len(serialised))
+
+        if validate:
+            self.validate_points([alpha, beta, gamma, delta] + gamma_abc)
+
         return {'alpha' : alpha,
                 'beta': beta,
                 'gamma': gamma,
                 'delta': delta,
                 'gamma_abc': gamma_abc}
 
-    def deserialise_proof(self, serialised: list[bytes]):
+    def deserialise_proof(self, serialised: list[bytes], validate: bool = False, compressed: bool = None):
         """
         Function to deserialise a proof. This function is based on arkworks deserialisation of a proof. [https://github.com/arkworks-rs/groth16/blob/master/src/data_structures.rs#L9]
+        If validate is True, raise a ValueError if a point is not in G1 or G2 (see is_in_subgroup)
 
         A proof is formed by: A, B, C, and each element is serialised in turn
             A, C -> elements in G1
             B -> element in G2
+
+        The points are serialised in the compressed mode of arkworks if compressed is True, in the uncompressed one if it is False.
+        If compressed is None, the mode is deduced from the length of serialised
         """
         G1 = type(self.g1)
         G2 = type(self.g2)
@@ -102,16 +167,26 @@ class BilinearPairingCurve(BilinearPairing):
         length_G1 = (field_G1.get_modulus().bit_length() + 8) // 8 * field_G1.EXTENSION_DEGREE
         length_G2 = (field_G2.get_modulus().bit_length() + 8) // 8 * field_G2.EXTENSION_DEGREE
 
+        if compressed is None:
+            compressed = (len(serialised) == 2*length_G1 + length_G2)
+
+        # Length of the serialisation of a point
+        size_G1 = length_G1 if compressed else 2*length_G1
+        size_G2 = length_G2 if compressed else 2*length_G2
+
         index = 0
-        a = G1.deserialise(serialised[index:index+2*length_G1],field_G1)
-        index += 2*length_G1
-        b = G2.deserialise(serialised[index:index+2*length_G2],field_G2)
-        index += 2*length_G2
-        c = G1.deserialise(serialised[index:index+2*length_G1],field_G1)
-        index += 2*length_G1
+        a = G1.deserialise(serialised[index:index+size_G1],field_G1,compressed)
+        index += size_G1
+        b = G2.deserialise(serialised[index:index+size_G2],field_G2,compressed)
+        index += size_G2
+        c = G1.deserialise(serialised[index:index+size_G1],field_G1,compressed)
+        index += size_G1
 
         assert(index == len(serialised))
 
+        if validate:
+            self.validate_points([a, b, c])
+
         return {'a': a,
                 'b': b,
                 'c': c}
@@ -137,11 +212,13 @@ class BilinearPairingCurve(BilinearPairing):
 
         pub_extended = [1] + pub
 
-        # Compute \sum_(i=0)^l a_i * gamma_abc[i]
+        # Compute \sum_(i=0)^l a_i * gamma_abc[i], keeping the partial sums \sum_(j=0)^i a_j * gamma_abc[j]
         n_pub = len(pub_extended) - 1
-        sum_gamma_abc = gamma_abc[0]
+        products = [None] + [gamma_abc[i].multiply(pub_extended[i]) for i in range(1,n_pub+1)]
+        partial_sums = [gamma_abc[0]]
         for i in range(1,n_pub+1):
-            sum_gamma_abc += gamma_abc[i].multiply(pub_extended[i])
+            partial_sums.append(partial_sums[-1] + products[i])
+        sum_gamma_abc = partial_sums[-1]
 
         # Lambdas for the pairing
         lambdas_B_exp_miller_loop = [list(map(lambda s: s.to_list(),el)) for el in B.get_lambdas(exp_miller_loop)]
@@ -149,20 +226,15 @@ class BilinearPairingCurve(BilinearPairing):
         lambdas_minus_delta_exp_miller_loop = [list(map(lambda s: s.to_list(),el)) for el in (-delta).get_lambdas(exp_miller_loop)]
 
 		# Inverse of the Miller loop output
-        match miller_loop_type:
-            case 'base_curve':
-                inverse_miller_loop = self.triple_miller_loop_on_base_curve(A,sum_gamma_abc,C,B,-gamma,-delta,denominator_elimination).invert().to_list()
-            case 'twisted_curve':
-                inverse_miller_loop = self.triple_miller_loop_on_twisted_curve(A,sum_gamma_abc,C,B,-gamma,-delta,denominator_elimination).invert().to_list()
+        inverse_miller_loop = self.multi_miller_loop([(A,B),(sum_gamma_abc,-gamma),(C,-delta)],miller_loop_type,denominator_elimination).invert().to_list()
 
         # Compute lamdbas for partial sums: gradients between a_i * gamma_abc[i] and \sum_(j=0)^(i-1) a_j * gamma_abc[j]
         lamdbas_partial_sums = []
         for i in range(n_pub,0,-1):
-            sum_gamma_abc -= gamma_abc[i].multiply(pub_extended[i])
-            if sum_gamma_abc.is_infinity() or gamma_abc[i].multiply(pub_extended[i]).is_infinity():
+            if partial_sums[i-1].is_infinity() or products[i].is_infinity():
                 lamdbas_partial_sums.append([])
             else:
-                lam = sum_gamma_abc.get_lambda(gamma_abc[i].multiply(pub_extended[i]))
+                lam = partial_sums[i-1].get_lambda(products[i])
                 lamdbas_partial_sums.append(lam.to_list())
 
 		# Lambdas for multiplications pub[i] * gamma_abc[i]
@@ -1,8 +1,18 @@
 from copy import deepcopy
+from secrets import randbelow
+from typing import Optional
+
+from elliptic_curves.fields.exponentiation import window_size, wnaf_digits, signed_digits
+from elliptic_curves.models.fixed_base import FixedBaseTable
+from elliptic_curves.models.line_evaluation import LineEvaluation, slot_field
 
 # The two classes below are not meant to be directly used by the user. They should be exported using the function below.
 class EllipticCurve:
     CURVE = None
+    # FixedBaseTable used by multiply, see precompute_fixed_base
+    fixed_base_table = None
+    # ScalarDecomposition used by multiply_with_endomorphism, for curves with an efficient endomorphism
+    scalar_decomposition = None
 
     def __init__(self, x, y):
         """
@@ -16,20 +26,33 @@ class EllipticCurve:
 
         return
 
+    @classmethod
+    def _new(Curve, x, y):
+        """
+        Build a point from coordinates known to satisfy the curve equation, skipping the check
+        """
+        out = object.__new__(Curve)
+        out.x = x
+        out.y = y
+
+        return out
+
     def __eq__(P,Q):
-        return P.__dict__ == Q.__dict__
+        if P.is_infinity() or Q.is_infinity():
+            return P.is_infinity() and Q.is_infinity()
+        else:
+            return P.x == Q.x and P.y == Q.y
 
     def __repr__(self):
         return f'({self.x},{self.y})'
 
     def __neg__(self):
+        Curve = type(self)
+
         if self.is_infinity():
-            out = deepcopy(self)
+            return Curve.point_at_infinity()
         else:
-            out = deepcopy(self)
-            out.y = -out.y
-        
-        return out
+            return Curve._new(self.x, -self.y)
 
     def __add__(P,Q):
         assert(type(P) == type(Q))
@@ -43,17 +66,81 @@ class EllipticCurve:
             if P == -Q:
                 out = Curve.point_at_infinity()
             else:
-                out = deepcopy(P)
-
+                # A fresh point: the sum must not inherit the FixedBaseTable of P
                 lambdaCoeff = P.get_lambda(Q)
-                out.x = lambdaCoeff.power(2) - P.x - Q.x
-                out.y = lambdaCoeff * (P.x - out.x) - P.y
+                x = lambdaCoeff.power(2) - P.x - Q.x
+                out = Curve._new(x, lambdaCoeff * (P.x - x) - P.y)
 
         return out
 
     def __sub__(P,Q):
         return P + (-Q)
 
+    def batch_add(pairs: list) -> list:
+        """
+        Compute P + Q for every pair (P, Q) of affine points of pairs, with a single field inversion for all the gradients (Montgomery's
+        trick). Each pair is handled as in __add__: the point at infinity, P == -Q and P == Q (doubling) are detected per pair
+        """
+        if len(pairs) == 0:
+            return []
+
+        Curve = type(pairs[0][0])
+
+        # numerators[i] / denominators[i] is the gradient of pairs[i], for the pairs which need one
+        numerators = []
+        denominators = []
+        lanes = []
+        for i, (P, Q) in enumerate(pairs):
+            if P.is_infinity() or Q.is_infinity():
+                continue
+            if P.x == Q.x:
+                if P.y == -Q.y:
+                    continue
+                numerators.append(P.x.square().scalar_mul(3) + Curve.CURVE.a * type(P.x).identity())
+                denominators.append(P.y + P.y)
+            else:
+                numerators.append(Q.y - P.y)
+                denominators.append(Q.x - P.x)
+            lanes.append(i)
+
+        if len(denominators) > 0:
+            inverses = type(denominators[0]).batch_invert(denominators)
+        else:
+            inverses = []
+
+        out = []
+        for P, Q in pairs:
+            if P.is_infinity():
+                out.append(Q)
+            elif Q.is_infinity():
+                out.append(P)
+            else:
+                out.append(Curve.point_at_infinity())
+
+        for i, numerator, inverse in zip(lanes, numerators, inverses):
+            P, Q = pairs[i]
+            gradient = numerator * inverse
+            x = gradient.square() - P.x - Q.x
+            out[i] = Curve._new(x, gradient * (P.x - x) - P.y)
+
+        return out
+
+    def tree_sum(points: list):
+        """
+        Compute the sum of the affine points in points (which must not be empty) by adding them in pairs, level by level, with one
+        batch_add (hence one field inversion) per level
+        """
+        assert(len(points) > 0)
+        Curve = type(points[0])
+
+        while len(points) > 1:
+            sums = Curve.batch_add([(points[i], points[i+1]) for i in range(0, len(points) - 1, 2)])
+            if len(points) % 2 == 1:
+                sums.append(points[-1])
+            points = sums
+
+        return points[0]
+
     def get_lambda(self,Q):
         r"""
         Compute the gradient of the line through self and Q.
@@ -114,35 +201,158 @@ class EllipticCurve:
     def is_infinity(self) -> bool:
         return (self.x is None) and (self.y is None)
 
+    def is_in_subgroup(self) -> bool:
+        """
+        Whether self is in the subgroup of order Curve.CURVE.subgroup_order (e.g., G1 or G2 of a pairing). The generic check multiplies
+        self by the order of the subgroup (it is skipped if the subgroup is the whole curve): curves with an efficient endomorphism
+        override this method with faster criteria
+        """
+        Curve = type(self)
+        subgroup_order = Curve.CURVE.subgroup_order
+        assert(subgroup_order is not None)
+
+        if self.is_infinity():
+            return True
+        if subgroup_order == Curve.CURVE.order and type(self.x) is type(Curve.CURVE.a):
+            return True
+
+        # In Jacobian coordinates, so that fixed-base tables (which reduce scalars modulo subgroup_order) are not used
+        return self.to_jacobian().multiply(subgroup_order).is_infinity()
+
+    def clear_cofactor(self):
+        """
+        Map self to the subgroup of order Curve.CURVE.subgroup_order, by multiplying it by the cofactor order // subgroup_order.
+        Curves with a faster method override this method
+        """
+        Curve = type(self)
+        cofactor = Curve.CURVE.order // Curve.CURVE.subgroup_order
+
+        # In Jacobian coordinates, so that fixed-base tables (which reduce scalars modulo subgroup_order) are not used
+        return self.to_jacobian().multiply(cofactor).to_affine()
+
+    def batch_is_in_subgroup(points: list) -> bool:
+        """
+        Check whether all the points are in the subgroup of order Curve.CURVE.subgroup_order, with checks on random linear combinations
+        sum c[i] * points[i] (computed with msm), with random c[i] of a few bits more than l.
+
+        A combination of points which are not all in the subgroup is in the subgroup with probability at most 1/l + 2^-bits, where l is
+        the smallest prime factor of the cofactor (the index of the subgroup, e.g., l = 3 for G1 and l = 13 for G2 of BLS12_381) and bits
+        is the size of the c[i]. The check is repeated with fresh coefficients until this probability is at most 2^-64 (see
+        batch_subgroup_check_parameters), and the points are checked separately if this takes at least as many checks as there are points
+        (or if the subgroup is the whole curve)
+        """
+        points = [P for P in points if not P.is_infinity()]
+        if len(points) == 0:
+            return True
+
+        Curve = type(points[0])
+        cofactor = Curve.CURVE.order // Curve.CURVE.subgroup_order
+        rounds, bits = batch_subgroup_check_parameters(cofactor)
+
+        # Without a cofactor, is_in_subgroup is free on points with coordinates in the field of definition of the curve
+        if cofactor == 1 or rounds >= len(points):
+            return all(P.is_in_subgroup() for P in points)
+
+        return all(msm(points, [randbelow(1 << bits) for P in points]).is_in_subgroup() for i in range(rounds))
+
     def multiply(self, n: int):
+        """
+        Compute n * self with a width-w NAF of n, after reducing n with reduce_scalar. The odd multiples self, 3 self, 5 self, ... are
+        precomputed in Jacobian coordinates and normalised with a single inversion, negative digits use their negations, and the sum runs in
+        Jacobian coordinates with mixed additions. The result is normalised with a single inversion at the end.
+
+        If a FixedBaseTable is attached to self (see precompute_fixed_base), it is used instead
+        """
         Curve = type(self)
 
+        if self.fixed_base_table is not None:
+            return self.fixed_base_table.multiply(n)
+
         if self.is_infinity():
-            result = deepcopy(self)
-        else:
-            if n == 0:
-                result = Curve.point_at_infinity()
-            else:
-                val = deepcopy(self)
-                result = Curve.point_at_infinity()
+            return Curve.point_at_infinity()
 
-                if n < 0:
-                    n = -n
-                    val = -val
-                
-                while n > 0:
-                    if n % 2 == 1:
-                        result = result + val
-                    val = val + val
-                    n = n // 2
+        n = reduce_scalar(self, n)
+        if n == 0:
+            return Curve.point_at_infinity()
+
+        val = self if n > 0 else -self
+        width = window_size(abs(n).bit_length()) + 1
+        table = val.odd_multiples(1 << (width - 2))
 
-        return result
+        return wnaf_evaluate(table, wnaf_digits(abs(n), width), lambda P: P.to_jacobian(), lambda R, P: R.mixed_add(P)).to_affine()
+
+    def multiply_with_endomorphism(self, n: int):
+        """
+        Compute n * self with the endomorphism of the curve (GLV/GLS method). n is split with Curve.scalar_decomposition into short
+        scalars k[i] such that n * self = sum k[i] * endomorphism^i(self), and the products are computed jointly with a single chain of
+        doublings (see joint_wnaf_evaluate). The odd multiples of endomorphism^i(self) are obtained by applying the endomorphism to those
+        of self.
+
+        The curve class must define endomorphism (a method mapping affine points to affine points) and scalar_decomposition (a
+        ScalarDecomposition). The result is correct only if self belongs to the subgroup on which the endomorphism acts as
+        multiplication by scalar_decomposition.eigenvalue (e.g., G1 or G2 of a pairing)
+        """
+        Curve = type(self)
+
+        if self.is_infinity():
+            return Curve.point_at_infinity()
+
+        k = Curve.scalar_decomposition.decompose(n)
+        width = window_size(max(abs(k_i) for k_i in k).bit_length()) + 1
+        if all(k_i == 0 for k_i in k):
+            return Curve.point_at_infinity()
+
+        tables = []
+        digits = []
+        table = self.odd_multiples(1 << (width - 2))
+        for i, k_i in enumerate(k):
+            if k_i != 0:
+                tables.append(table if k_i > 0 else [-point for point in table])
+                digits.append(wnaf_digits(abs(k_i), width))
+            if i < len(k) - 1:
+                table = [point.endomorphism() for point in table]
+
+        return joint_wnaf_evaluate(tables, digits, lambda P: P.to_jacobian(), lambda R, P: R.mixed_add(P)).to_affine()
+
+    def precompute_fixed_base(self, window: int = 4, order: int = None, lazy: bool = False):
+        """
+        Attach to self a FixedBaseTable (see its documentation for window, order and lazy), used by multiply from now on.
+        The table is returned, so that it can be serialised with to_bytes
+        """
+        self.fixed_base_table = FixedBaseTable(self, window, order, lazy)
+
+        return self.fixed_base_table
+
+    def attach_fixed_base_table(self, table):
+        """
+        Attach to self a FixedBaseTable computed for self, e.g., one deserialised with FixedBaseTable.from_bytes
+        """
+        assert(table.base == self)
+
+        self.fixed_base_table = table
+
+        return
+
+    def odd_multiples(self, count: int) -> list:
+        """
+        Return the affine points self, 3 self, ..., (2 count - 1) self. They are computed in Jacobian coordinates and normalised with a
+        single inversion
+        """
+        P = self.to_jacobian()
+        multiples = [P]
+        if count > 1:
+            double = P.double()
+            for k in range(1,count):
+                multiples.append(multiples[-1] + double)
+
+        return type(P).batch_to_affine(multiples)
 
     def to_projective(self):
         Field = type(self.x)
         
         if self.is_infinity():
-            return EllipticCurveProjective.point_at_infinity(Field)
+            # The point at infinity has no coordinates: it is given those of the field of definition of the curve
+            return EllipticCurveProjective.point_at_infinity(type(EllipticCurve.CURVE.a))
         else:
             return EllipticCurveProjective(
                 x=deepcopy(self.x),
@@ -150,11 +360,28 @@ class EllipticCurve:
                 z=Field.identity()
                 )
 
+    def to_jacobian(self):
+        Field = type(self.x)
+
+        if self.is_infinity():
+            return EllipticCurveJacobian.point_at_infinity(type(EllipticCurve.CURVE.a))
+        else:
+            return EllipticCurveJacobian._new(self.x, self.y, Field.identity())
+
     def line_evaluation(self,Q,P):
         r"""
         Evaluate the line through self and Q at P. If self == Q, the line is the tanget at self. If self == -Q, the line is the vertical
         
         The line is y - self.y = lambda * (x - self.x), where lambda = self.getLambda(Q)
+        The evaluation is an element of the largest of the fields of the coordinates of self, Q and P (see sparse_line_evaluation).
+        Remark: self, Q and P must not be the point at infinity.
+        """
+        return self.sparse_line_evaluation(Q,P).to_dense()
+
+    def sparse_line_evaluation(self,Q,P):
+        r"""
+        The evaluation of line_evaluation as a LineEvaluation, which only stores the non-zero slots of the evaluation (see LineEvaluation),
+        for the sparse multiplications of the Miller loops.
         Remark: self, Q and P must not be the point at infinity.
         """
         if self.is_infinity() or Q.is_infinity() or P.is_infinity():
@@ -173,17 +400,41 @@ class EllipticCurve:
             Field = Field_P
 
         if self == -Q:
-            out = P.x * Field.identity() - Q.x * Field.identity()
+            out = LineEvaluation.from_element(P.x, Field) - LineEvaluation.from_element(Q.x, Field)
         else:
-            lam = self.get_lambda(Q) * Field.identity()
-            out = P.y * Field.identity() - self.y * Field.identity() - lam * (P.x  * Field.identity()  - self.x  * Field.identity())
+            lam = self.get_lambda(Q)
+            x_difference = LineEvaluation.from_element(P.x, Field) - LineEvaluation.from_element(self.x, Field)
+            if lam.EXTENSION_DEGREE <= slot_field(Field).EXTENSION_DEGREE:
+                x_difference = x_difference.scale(lam)
+            else:
+                x_difference = LineEvaluation.from_element(x_difference * lam, Field)
+            out = LineEvaluation.from_element(P.y, Field) - LineEvaluation.from_element(self.y, Field) - x_difference
 
         return out
     
-    def deserialise(serialised: list[bytes], field):
+    def serialise(self, compressed: bool = False) -> list[int]:
+        """
+        Inverse of deserialise: serialise self as a list of ints, in the uncompressed (compressed = False) or compressed mode of arkworks
+        """
+        Curve = type(self)
+
+        if self.is_infinity():
+            zero = type(Curve.CURVE.a).zero().serialise()
+            out = zero if compressed else zero + zero
+            out[-1] = out[-1] | (1 << 6)
+            return out
+
+        out = self.x.serialise() if compressed else self.x.serialise() + self.y.serialise()
+        # Lexicographic comparison, starting from the last coordinate
+        if self.y.to_list()[::-1] > (-self.y).to_list()[::-1]:
+            out[-1] = out[-1] | (1 << 7)
+
+        return out
+
+    def deserialise(serialised: list[bytes], field, compressed: bool = False):
         """
         Function that a list of integers and inteprets it as a point on the elliptic curve self and returns its serialisation.
-        This function is based on the deserialisation function for the trait SWCurveConfig of arkworks, only uncompressed mode. [https://github.com/arkworks-rs/algebra/blob/master/ec/src/models/short_weierstrass/mod.rs#L115]
+        This function is based on the deserialisation function for the trait SWCurveConfig of arkworks. [https://github.com/arkworks-rs/algebra/blob/master/ec/src/models/short_weierstrass/mod.rs#L115]
         
         It works as follows: serialised is a list of ints representing the little-endian encoding of (x,y). The encoding is:
             [LE(x), LE(y)_mod]
@@ -192,6 +443,8 @@ class EllipticCurve:
         where flags is the OR of:
             1 << 7 if y > -y (lexicographic order)
             1 << 6 if Point at infinity
+
+        In compressed mode, the encoding is LE(x)_mod, with the same flags, and y is recovered with a square root
         """
         is_infinity = (serialised[-1] >> 6) & 1
         is_largest = (serialised[-1] >> 7) & 1
@@ -199,11 +452,19 @@ class EllipticCurve:
         if is_infinity:
             return EllipticCurve.point_at_infinity()
         else:        
-            serialised_x = serialised[:len(serialised)//2]
-            x = field.deserialise(serialised_x)
-            serialised_y = serialised[len(serialised)//2:]
-            serialised_y[-1] = serialised_y[-1]  & ~(1 << 7)
-            y = field.deserialise(serialised_y)
+            if compressed:
+                serialised_x = list(serialised)
+                serialised_x[-1] = serialised_x[-1] & ~(3 << 6)
+                x = field.deserialise(serialised_x)
+                y = (x.power(3) + EllipticCurve.CURVE.a * x + EllipticCurve.CURVE.b).sqrt()
+                if y is None:
+                    raise ValueError('The serialised x-coordinate is not the x-coordinate of a point of the curve')
+            else:
+                serialised_x = serialised[:len(serialised)//2]
+                x = field.deserialise(serialised_x)
+                serialised_y = serialised[len(serialised)//2:]
+                serialised_y[-1] = serialised_y[-1]  & ~(1 << 7)
+                y = field.deserialise(serialised_y)
 
             y_is_largest = None
             for el, minus_el in zip(y.to_list()[::-1],(-y).to_list()[::-1]):
@@ -230,6 +491,12 @@ class EllipticCurve:
         return out
 
 class EllipticCurveProjective:
+    """
+    Point on the elliptic curve in homogeneous projective coordinates: (x : y : z) represents the affine point (x/z, y/z).
+    The point at infinity is (0 : 1 : 0).
+
+    The arithmetic is inversion-free. Points are not modified in place by the operations below
+    """
     CURVE = None
 
     def __init__(self, x, y, z):
@@ -245,90 +512,430 @@ class EllipticCurveProjective:
 
         return
 
+    @classmethod
+    def _new(Curve, x, y, z):
+        """
+        Build a point from coordinates known to satisfy the curve equation, skipping the check
+        """
+        out = object.__new__(Curve)
+        out.x = x
+        out.y = y
+        out.z = z
+
+        return out
+
     def __eq__(P,Q):
-        if P.z.is_zero():
-            if Q.z.is_zero():
-                return True
-            else:
-                return False
+        if P.is_infinity() or Q.is_infinity():
+            return P.is_infinity() and Q.is_infinity()
         else:
-            if Q.z.is_zero():
-                return False
-            else:
-                return P.to_affine() == Q.to_affine()
+            return P.x * Q.z == Q.x * P.z and P.y * Q.z == Q.y * P.z
 
     def __repr__(self):
         return f'[{self.x} : {self.y} : {self.z}]'
 
     def __neg__(self):
-        out = deepcopy(self)
-        out.y = -out.y
-        return out
+        Curve = type(self)
+
+        return Curve._new(self.x, -self.y, self.z)
 
     def __add__(P,Q):
+        """
+        Addition in homogeneous coordinates (add-1998-cmo-2): 12M + 2S
+        """
         assert(type(P) == type(Q))
-        Field = type(P.z)
         Curve = type(P)
 
-        if P.z.is_zero():
-            return deepcopy(Q)
-        elif Q.z.is_zero():
-            return deepcopy(P)
-        else:
-            sumAff = P.to_affine() + Q.to_affine()
-            if P != Q:
-                denominator = P.z * Q.z * (Q.x - P.x).power(3)                                      # Order chosen to be consistent with affine sum
-            else:
-                denominator = P.z * Q.z * (P.x.scalar_mul(2)).power(3)
+        if P.is_infinity():
+            return Q
+        elif Q.is_infinity():
+            return P
 
-            if sumAff.is_infinity():                                                                # Points are inverse of one-another
-                out = Curve.point_at_infinity(field=Field)
+        y1z2 = P.y * Q.z
+        x1z2 = P.x * Q.z
+        z1z2 = P.z * Q.z
+        u = Q.y * P.z - y1z2
+        v = Q.x * P.z - x1z2
+
+        if v.is_zero():
+            if u.is_zero():
+                return P.double()
             else:
-                out = deepcopy(P)
-                out.x = sumAff.x * denominator
-                out.y = sumAff.y * denominator
-                out.z = denominator
+                return Curve.point_at_infinity(field=type(P.z))
 
-            return out
+        vv = v.square()
+        vvv = v * vv
+        r = vv * x1z2
+        a = u.square() * z1z2 - vvv - r - r
+
+        return Curve._new(v * a, u * (r - a) - vvv * y1z2, vvv * z1z2)
 
     def __sub__(P,Q):
         return P + (-Q)
 
+    def mixed_add(self, Q):
+        """
+        Add the affine point Q to self (madd-1998-cmo): 9M + 2S
+        """
+        Curve = type(self)
+
+        if Q.is_infinity():
+            return self
+        elif self.is_infinity():
+            return Q.to_projective()
+
+        u = Q.y * self.z - self.y
+        v = Q.x * self.z - self.x
+
+        if v.is_zero():
+            if u.is_zero():
+                return self.double()
+            else:
+                return Curve.point_at_infinity(field=type(self.z))
+
+        vv = v.square()
+        vvv = v * vv
+        r = vv * self.x
+        a = u.square() * self.z - vvv - r - r
+
+        return Curve._new(v * a, u * (r - a) - vvv * self.y, vvv * self.z)
+
+    def double(self):
+        """
+        Doubling in homogeneous coordinates (dbl-2007-bl): 5M + 6S, 1M less if a = 0
+        """
+        Curve = type(self)
+
+        if self.is_infinity() or self.y.is_zero():
+            return Curve.point_at_infinity(field=type(self.z))
+
+        xx = self.x.square()
+        w = xx + xx + xx
+        if not Curve.CURVE.a.is_zero():
+            w = w + Curve.CURVE.a * self.z.square()
+        s = self.y * self.z
+        s = s + s
+        ss = s.square()
+        r = self.y * s
+        rr = r.square()
+        b = (self.x + r).square() - xx - rr
+        h = w.square() - b - b
+
+        return Curve._new(h * s, w * (b - h) - rr - rr, s * ss)
+
+    def double_with_line(self):
+        """
+        Compute 2 * self together with the tangent line at self, without inversions. self must not be the point at infinity nor a point of
+        order two.
+
+        The line is returned as the coefficients (c0, cx, cy) of c0 + cx * x + cy * y: it is the tangent multiplied by -2 * self.y * self.z
+        and divided by self.z, which is y^2 z - x^3 - a x z^2 - b z^3 = 0 used to remove the factor self.z from c0
+        """
+        Curve = type(self)
+        a = Curve.CURVE.a
+
+        xx = self.x.square()
+        yy = self.y.square()
+        zz = self.z.square()
+        w = xx + xx + xx
+        bzz = Curve.CURVE.b * zz
+        c0 = bzz + bzz + bzz - yy
+        if not a.is_zero():
+            w = w + a * zz
+            xz = (self.x + self.z).square() - xx - zz
+            c0 = c0 + a * xz
+        s = self.y * self.z
+        s = s + s
+        ss = s.square()
+        r = self.y * s
+        rr = r.square()
+        b = (self.x + r).square() - xx - rr
+        h = w.square() - b - b
+
+        return Curve._new(h * s, w * (b - h) - rr - rr, s * ss), (c0, w, -s)
+
+    def mixed_add_with_line(self, Q):
+        """
+        Compute self + Q, for Q affine, together with the line through self and Q, without inversions. self and Q must not be the point
+        at infinity.
+
+        The line is returned as the coefficients (c0, cx, cy) of c0 + cx * x + cy * y: it is the line through Q with slope
+        (self.y - Q.y * self.z) / (self.x - Q.x * self.z), multiplied by self.x - Q.x * self.z. If self = -Q, it is the vertical x - Q.x
+        """
+        Curve = type(self)
+
+        u = Q.y * self.z - self.y
+        v = Q.x * self.z - self.x
+
+        if v.is_zero():
+            if u.is_zero():
+                return self.double_with_line()
+            else:
+                Field = type(self.z)
+                return Curve.point_at_infinity(field=Field), (-Q.x, Field.identity(), Field.zero())
+
+        vv = v.square()
+        vvv = v * vv
+        r = vv * self.x
+        a = u.square() * self.z - vvv - r - r
+
+        return Curve._new(v * a, u * (r - a) - vvv * self.y, vvv * self.z), (u * Q.x - v * Q.y, -u, v)
+
     def point_at_infinity(field):
-        return EllipticCurveProjective(field.zero(),field.identity(),field.zero())
+        return EllipticCurveProjective._new(field.zero(),field.identity(),field.zero())
 
     def is_infinity(self) -> bool:
-        return (self.x.is_zero()) and (self.y.x == 1) and (self.z.is_zero())
+        return self.z.is_zero()
 
     def multiply(self, n: int):
+        """
+        Compute n * self with a width-w NAF of n (after reducing n with reduce_scalar), without leaving projective coordinates
+        """
         Curve = type(self)
-        Field = type(self.x)
 
         if self.is_infinity():
-            result = deepcopy(self)
+            return self
+
+        n = reduce_scalar(self, n)
+        if n == 0:
+            return Curve.point_at_infinity(field=type(self.z))
+
+        val = self if n > 0 else -self
+        width = window_size(abs(n).bit_length()) + 1
+        double = val.double()
+        table = [val]
+        for k in range(1,1 << (width - 2)):
+            table.append(table[-1] + double)
+
+        return wnaf_evaluate(table, wnaf_digits(abs(n), width), lambda P: P, lambda R, P: R + P)
+
+    def to_affine(self):
+        if self.is_infinity():
+            return EllipticCurve.point_at_infinity()
+
+        z_inverse = self.z.invert()
+
+        return EllipticCurve._new(self.x * z_inverse, self.y * z_inverse)
+
+    def to_list(self) -> list[int]:
+        """
+        Returns the list of coordinates defining self. First the x-coordinate, then the y-coordinate, then the z-coordinate
+        """
+        out = []
+        out.extend(self.x.to_list())
+        out.extend(self.y.to_list())
+        out.extend(self.z.to_list())
+        
+        return out
+
+class EllipticCurveJacobian:
+    """
+    Point on the elliptic curve in Jacobian coordinates: (x : y : z) represents the affine point (x/z^2, y/z^3).
+    The point at infinity is (1 : 1 : 0).
+
+    The arithmetic is inversion-free, and is the one used by EllipticCurve.multiply. Points are not modified in place by the operations below
+    """
+    CURVE = None
+
+    def __init__(self, x, y, z):
+        """
+        Jacobian point on the elliptic curve specified by curve class
+        """
+        Curve = type(self)
+        # (x : y : z) in Jacobian coordinates is (x*z : y : z^3) in homogeneous coordinates
+        assert(Curve.CURVE.evaluate_equation(x*z,y,z.power(3)).is_zero())
+
+        self.x = x
+        self.y = y
+        self.z = z
+
+        return
+
+    @classmethod
+    def _new(Curve, x, y, z):
+        """
+        Build a point from coordinates known to satisfy the curve equation, skipping the check
+        """
+        out = object.__new__(Curve)
+        out.x = x
+        out.y = y
+        out.z = z
+
+        return out
+
+    def __eq__(P,Q):
+        if P.is_infinity() or Q.is_infinity():
+            return P.is_infinity() and Q.is_infinity()
         else:
+            zz_P = P.z.square()
+            zz_Q = Q.z.square()
+            return P.x * zz_Q == Q.x * zz_P and P.y * zz_Q * Q.z == Q.y * zz_P * P.z
+
+    def __repr__(self):
+        return f'[{self.x} : {self.y} : {self.z}]'
+
+    def __neg__(self):
+        Curve = type(self)
+
+        return Curve._new(self.x, -self.y, self.z)
 
-            if n == 0:
-                result = Curve.point_at_infinity(field=Field)
+    def __add__(P,Q):
+        """
+        Addition in Jacobian coordinates (add-2007-bl): 11M + 5S
+        """
+        assert(type(P) == type(Q))
+        Curve = type(P)
+
+        if P.is_infinity():
+            return Q
+        elif Q.is_infinity():
+            return P
+
+        z1z1 = P.z.square()
+        z2z2 = Q.z.square()
+        u1 = P.x * z2z2
+        u2 = Q.x * z1z1
+        s1 = P.y * Q.z * z2z2
+        s2 = Q.y * P.z * z1z1
+        h = u2 - u1
+        r = s2 - s1
+
+        if h.is_zero():
+            if r.is_zero():
+                return P.double()
             else:
-                val = deepcopy(self)
-                result = Curve.point_at_infinity(field=Field)
+                return Curve.point_at_infinity(field=type(P.z))
 
-                if n < 0:
-                    n = -n
-                    val = -val
-                
-                while n > 0:
-                    if n % 2 == 1:
-                        result = result + val
-                    val = val + val
-                    n = n // 2
+        i = (h + h).square()
+        j = h * i
+        r = r + r
+        v = u1 * i
+        x3 = r.square() - j - v - v
+        s1j = s1 * j
+
+        return Curve._new(x3, r * (v - x3) - s1j - s1j, ((P.z + Q.z).square() - z1z1 - z2z2) * h)
+
+    def __sub__(P,Q):
+        return P + (-Q)
+
+    def mixed_add(self, Q):
+        """
+        Add the affine point Q to self (madd-2007-bl): 7M + 4S
+        """
+        Curve = type(self)
+
+        if Q.is_infinity():
+            return self
+        elif self.is_infinity():
+            return Q.to_jacobian()
+
+        z1z1 = self.z.square()
+        u2 = Q.x * z1z1
+        s2 = Q.y * self.z * z1z1
+        h = u2 - self.x
+        r = s2 - self.y
+
+        if h.is_zero():
+            if r.is_zero():
+                return self.double()
+            else:
+                return Curve.point_at_infinity(field=type(self.z))
+
+        hh = h.square()
+        i = hh + hh
+        i = i + i
+        j = h * i
+        r = r + r
+        v = self.x * i
+        x3 = r.square() - j - v - v
+        y1j = self.y * j
+
+        return Curve._new(x3, r * (v - x3) - y1j - y1j, (self.z + h).square() - z1z1 - hh)
+
+    def double(self):
+        """
+        Doubling in Jacobian coordinates: dbl-2009-l (2M + 5S) if a = 0, dbl-2007-bl (1M + 8S) otherwise
+        """
+        Curve = type(self)
+
+        if self.is_infinity() or self.y.is_zero():
+            return Curve.point_at_infinity(field=type(self.z))
+
+        xx = self.x.square()
+        yy = self.y.square()
+        yyyy = yy.square()
+        s = (self.x + yy).square() - xx - yyyy
+        s = s + s
+        m = xx + xx + xx
+        if Curve.CURVE.a.is_zero():
+            z3 = self.y * self.z
+            z3 = z3 + z3
+        else:
+            zz = self.z.square()
+            m = m + Curve.CURVE.a * zz.square()
+            z3 = (self.y + self.z).square() - yy - zz
+        x3 = m.square() - s - s
+        yyyy = yyyy + yyyy
+        yyyy = yyyy + yyyy
+        yyyy = yyyy + yyyy
+
+        return Curve._new(x3, m * (s - x3) - yyyy, z3)
+
+    def point_at_infinity(field):
+        return EllipticCurveJacobian._new(field.identity(),field.identity(),field.zero())
+
+    def is_infinity(self) -> bool:
+        return self.z.is_zero()
+
+    def multiply(self, n: int):
+        """
+        Compute n * self with a width-w NAF of n (after reducing n with reduce_scalar), without leaving Jacobian coordinates
+        """
+        Curve = type(self)
+
+        if self.is_infinity():
+            return self
 
-        return result
+        n = reduce_scalar(self, n)
+        if n == 0:
+            return Curve.point_at_infinity(field=type(self.z))
+
+        val = self if n > 0 else -self
+        width = window_size(abs(n).bit_length()) + 1
+        double = val.double()
+        table = [val]
+        for k in range(1,1 << (width - 2)):
+            table.append(table[-1] + double)
+
+        return wnaf_evaluate(table, wnaf_digits(abs(n), width), lambda P: P, lambda R, P: R + P)
 
     def to_affine(self):
-        if not self.z.is_zero():
-            return EllipticCurve(x=self.x * self.z.invert(),y=self.y * self.z.invert())
+        if self.is_infinity():
+            return EllipticCurve.point_at_infinity()
+
+        z_inverse = self.z.invert()
+        zz_inverse = z_inverse.square()
+
+        return EllipticCurve._new(self.x * zz_inverse, self.y * zz_inverse * z_inverse)
+
+    def batch_to_affine(points: list) -> list:
+        """
+        Convert a list of Jacobian points to affine coordinates with a single field inversion
+        """
+        if len(points) == 0:
+            return []
+
+        Field = type(points[0].z)
+        z_inverses = Field.batch_invert([P.z for P in points])
+
+        out = []
+        for P, z_inverse in zip(points, z_inverses):
+            if P.is_infinity():
+                out.append(EllipticCurve.point_at_infinity())
+            else:
+                zz_inverse = z_inverse.square()
+                out.append(EllipticCurve._new(P.x * zz_inverse, P.y * zz_inverse * z_inverse))
+
+        return out
 
     def to_list(self) -> list[int]:
         """
@@ -341,9 +948,161 @@ class EllipticCurveProjective:
         
         return out
 
+def reduce_scalar(point, n: int) -> int:
+    """
+    Reduce the scalar n modulo the number of points of the curve of point, to the representative of smallest absolute value (negations
+    are free). The reduction is skipped if the order of the curve is unknown, or if point has coordinates in an extension of the field
+    of definition of the curve, as it then belongs to a larger group
+    """
+    order = type(point).CURVE.order
+
+    if order is None or type(point.x) is not type(type(point).CURVE.a):
+        return n
+
+    n = n % order
+
+    return n - order if n > order // 2 else n
+
+def smallest_prime_factor(n: int, bound: int) -> Optional[int]:
+    """
+    The smallest prime factor of n if it is smaller than bound, None otherwise (trial division)
+    """
+    for p in range(2, min(bound, n + 1)):
+        if n % p == 0:
+            return p
+
+    return None
+
+def batch_subgroup_check_parameters(cofactor: int) -> tuple[int, int]:
+    """
+    Number of random linear combinations checked by batch_is_in_subgroup for a subgroup of index cofactor, and size in bits of their
+    coefficients, so that points which are not all in the subgroup pass the checks with probability at most 2^-64 (a check fails to
+    detect them with probability at most 1/l + 2^-bits, see batch_is_in_subgroup). The smallest prime factor l of cofactor is searched
+    below 2^16: if there is none, the bound l > 2^16 is used
+    """
+    if cofactor == 1:
+        return 1, 64
+
+    l = smallest_prime_factor(cofactor, 1 << 16)
+    if l is None:
+        l, bits = 1 << 16, 64
+    else:
+        bits = l.bit_length() + 8
+
+    # Smallest rounds such that (1/l + 2^-bits)^rounds <= 2^-64, i.e., (2^bits + l)^rounds <= (l * 2^bits)^rounds * 2^-64
+    rounds = 1
+    while ((1 << bits) + l) ** rounds << 64 > (l << bits) ** rounds:
+        rounds += 1
+
+    return rounds, bits
+
+def wnaf_evaluate(table: list, digits: list[int], to_accumulator, add):
+    """
+    Compute sum digits[i] * 2^i * P, where table[k] = (2k+1) P and digits is a width-w NAF, LSB to MSB (see wnaf_digits).
+    to_accumulator converts a point of table to the model in which the sum is computed, and add(R, T) adds the point T of table to R
+    """
+    return joint_wnaf_evaluate([table], [digits], to_accumulator, add)
+
+def joint_wnaf_evaluate(tables: list[list], digits: list[list[int]], to_accumulator, add):
+    """
+    Compute sum_j sum_i digits[j][i] * 2^i * P_j with a single chain of doublings (Straus' method), where tables[j][k] = (2k+1) P_j and
+    digits[j] is a width-w NAF, LSB to MSB. to_accumulator and add are as in wnaf_evaluate. Return None if all the digits are zero
+    """
+    negated_tables = [[-point for point in table] for table in tables]
+    length = max(len(d) for d in digits)
+
+    result = None
+    for i in range(length-1,-1,-1):
+        if result is not None:
+            result = result.double()
+        for table, negated_table, d in zip(tables, negated_tables, digits):
+            digit = d[i] if i < len(d) else 0
+            if digit != 0:
+                point = table[digit >> 1] if digit > 0 else negated_table[(-digit) >> 1]
+                result = to_accumulator(point) if result is None else add(result, point)
+
+    return result
+
+def msm_window_size(n_points: int) -> int:
+    """
+    Window size of the buckets of msm for n_points points (about ln(n_points) + 2)
+    """
+    if n_points < 32:
+        return 3
+    else:
+        return n_points.bit_length() * 69 // 100 + 2
+
+def msm(points: list, scalars: list[int]):
+    """
+    Multi-scalar multiplication: compute sum scalars[i] * points[i] for affine points of the same curve, with Pippenger's bucket method.
+
+    The scalars are reduced with reduce_scalar and recoded in signed digits of window bits (see msm_window_size), so that a window needs
+    2^(window-1) buckets: for each window, every point is added (with a mixed addition, negated for negative digits) to the bucket of its
+    digit, and the buckets are summed with running sums. The windows are combined with window doublings. Buckets and sums are in Jacobian
+    coordinates, and the result is normalised with a single inversion.
+
+    With few points, the products are computed separately with multiply and summed
+    """
+    assert(len(points) == len(scalars))
+    assert(len(points) > 0)
+    Curve = type(points[0])
+
+    # Drop the trivial terms, and make every scalar positive
+    terms = []
+    for P, n in zip(points, scalars):
+        if P.is_infinity():
+            continue
+        n = reduce_scalar(P, n)
+        if n > 0:
+            terms.append((P, n))
+        elif n < 0:
+            terms.append((-P, -n))
+
+    if len(terms) == 0:
+        return Curve.point_at_infinity()
+
+    infinity = type(terms[0][0].to_jacobian()).point_at_infinity(type(terms[0][0].x))
+
+    if len(terms) < 4:
+        result = infinity
+        for P, n in terms:
+            result = result.mixed_add(P.multiply(n))
+        return result.to_affine()
+
+    window = msm_window_size(len(terms))
+    n_buckets = 1 << (window - 1)
+    digits = [signed_digits(n, window) for _, n in terms]
+    negated_points = [-P for P, _ in terms]
+
+    result = infinity
+    for w in range(max(len(d) for d in digits) - 1, -1, -1):
+        for i in range(window):
+            result = result.double()
+
+        # buckets[k] = sum of the points with digit k+1 (or their negations for digit -(k+1))
+        buckets = [infinity] * n_buckets
+        for (P, _), minus_P, d in zip(terms, negated_points, digits):
+            if w < len(d) and d[w] != 0:
+                if d[w] > 0:
+                    buckets[d[w] - 1] = buckets[d[w] - 1].mixed_add(P)
+                else:
+                    buckets[-d[w] - 1] = buckets[-d[w] - 1].mixed_add(minus_P)
+
+        # sum (k+1) * buckets[k] = sum_k running_k, where running_k = sum_(j >= k) buckets[j]
+        running = infinity
+        window_sum = infinity
+        for bucket in buckets[::-1]:
+            running = running + bucket
+            window_sum = window_sum + running
+
+        result = result + window_sum
+
+    return result.to_affine()
+
 def elliptic_curve_from_curve(curve):
     """
-    Exports EllipticCurve and EllipticCurveProjective for a give curve
+    Exports EllipticCurve and EllipticCurveProjective for a give curve. The Jacobian version of the curve (EllipticCurveJacobian) is
+    reached through the to_jacobian method of the affine points
     """
 
     class AffineEllipticCurve(EllipticCurve):
@@ -359,15 +1118,24 @@ def elliptic_curve_from_curve(curve):
             Field = type(self.x)
             
             if self.is_infinity():
-                return ProjectiveEllipticCurve.point_at_infinity(Field)
+                # The point at infinity has no coordinates: it is given those of the field of definition of the curve
+                return ProjectiveEllipticCurve.point_at_infinity(type(AffineEllipticCurve.CURVE.a))
             else:
                 return ProjectiveEllipticCurve(
                     x=deepcopy(self.x),
                     y=deepcopy(self.y),
                     z=Field.identity()
                     )
+
+        def to_jacobian(self):
+            Field = type(self.x)
+
+            if self.is_infinity():
+                return JacobianEllipticCurve.point_at_infinity(type(AffineEllipticCurve.CURVE.a))
+            else:
+                return JacobianEllipticCurve._new(self.x, self.y, Field.identity())
         
-        def deserialise(serialised: list[bytes], field):
+        def deserialise(serialised: list[bytes], field, compressed: bool = False):
             """
             See comments for function above
             """
@@ -377,11 +1145,19 @@ def elliptic_curve_from_curve(curve):
             if is_infinity:
                 return AffineEllipticCurve.point_at_infinity()
             else:        
-                serialised_x = serialised[:len(serialised)//2]
-                x = field.deserialise(serialised_x)
-                serialised_y = serialised[len(serialised)//2:]
-                serialised_y[-1] = serialised_y[-1]  & ~(1 << 7)
-                y = field.deserialise(serialised_y)
+                if compressed:
+                    serialised_x = list(serialised)
+                    serialised_x[-1] = serialised_x[-1] & ~(3 << 6)
+                    x = field.deserialise(serialised_x)
+                    y = (x.power(3) + AffineEllipticCurve.CURVE.a * x + AffineEllipticCurve.CURVE.b).sqrt()
+                    if y is None:
+                        raise ValueError('The serialised x-coordinate is not the x-coordinate of a point of the curve')
+                else:
+                    serialised_x = serialised[:len(serialised)//2]
+                    x = field.deserialise(serialised_x)
+                    serialised_y = serialised[len(serialised)//2:]
+                    serialised_y[-1] = serialised_y[-1]  & ~(1 << 7)
+                    y = field.deserialise(serialised_y)
 
                 y_is_largest = None
                 for el, minus_el in zip(y.to_list()[::-1],(-y).to_list()[::-1]):
@@ -401,12 +1177,52 @@ def elliptic_curve_from_curve(curve):
         CURVE = curve
         
         def point_at_infinity(field):
-            return ProjectiveEllipticCurve(field.zero(),field.identity(),field.zero())
+            return ProjectiveEllipticCurve._new(field.zero(),field.identity(),field.zero())
 
         def to_affine(self):
-            if not self.z.is_zero():
-                return AffineEllipticCurve(x=self.x * self.z.invert(),y=self.y * self.z.invert())
-    
+            if self.is_infinity():
+                return AffineEllipticCurve.point_at_infinity()
+
+            z_inverse = self.z.invert()
+
+            return AffineEllipticCurve._new(self.x * z_inverse, self.y * z_inverse)
+
+    class JacobianEllipticCurve(EllipticCurveJacobian):
+        CURVE = curve
+
+        def point_at_infinity(field):
+            return JacobianEllipticCurve._new(field.identity(),field.identity(),field.zero())
+
+        def to_affine(self):
+            if self.is_infinity():
+                return AffineEllipticCurve.point_at_infinity()
+
+            z_inverse = self.z.invert()
+            zz_inverse = z_inverse.square()
+
+            return AffineEllipticCurve._new(self.x * zz_inverse, self.y * zz_inverse * z_inverse)
+
+        def batch_to_affine(points: list) -> list:
+            """
+            Convert a list of Jacobian points to affine coordinates with a single field inversion
+            """
+            if len(points) == 0:
+                return []
+
+            Field = type(points[0].z)
+            z_inverses = Field.batch_invert([P.z for P in points])
+
+            out = []
+            for P, z_inverse in zip(points, z_inverses):
+                if P.is_infinity():
+                    out.append(AffineEllipticCurve.point_at_infinity())
+                else:
+                    zz_inverse = z_inverse.square()
+                    out.append(AffineEllipticCurve._new(P.x * zz_inverse, P.y * zz_inverse * z_inverse))
+
+            return out
+
+    # The Jacobian model is reached with AffineEllipticCurve.to_jacobian
     return AffineEllipticCurve, ProjectiveEllipticCurve
 
         
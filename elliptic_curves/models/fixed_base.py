@@ -0,0 +1,122 @@
+from elliptic_curves.fields.exponentiation import signed_digits
+
+class FixedBaseTable:
+    """
+    Precomputed multiples of a fixed point, used to compute n * base with additions only.
+
+    The scalar is reduced modulo order (to its representative of smallest absolute value) and recoded in signed digits of window bits:
+    |n| = sum digits[i] * 2^(window * i), with -2^(window-1) <= digits[i] <= 2^(window-1). The table stores the affine points
+    j * 2^(window * i) * base for 1 <= j <= 2^(window-1), so that n * base is the sum of one (possibly negated) entry per window.
+
+    window is the memory/speed trade-off: the table holds about (order.bit_length() / window) * 2^(window-1) points, and a multiplication
+    costs about order.bit_length() / window mixed additions (and no doublings).
+    """
+
+    def __init__(self, base, window: int = 4, order: int = None, lazy: bool = False):
+        """
+        Table for base. order is the order of base, by default the number of points of its curve.
+        If lazy is True, the points are computed at the first multiplication
+        """
+        assert(window >= 1)
+        assert(not base.is_infinity())
+
+        self.base = base
+        self.window = window
+        self.order = order if order is not None else type(base).CURVE.order
+        assert(self.order is not None)
+
+        # One more window than needed for order/2, for the final carry of the recoding
+        self.n_windows = -(-(self.order // 2).bit_length() // window) + 1
+        self.table = None
+
+        if not lazy:
+            self.build()
+
+        return
+
+    def __deepcopy__(self, memo):
+        # Tables are never modified once built
+        return self
+
+    def build(self):
+        """
+        Compute the points of the table (in Jacobian coordinates, normalised with a single inversion)
+        """
+        if self.table is not None:
+            return
+
+        entries_per_window = 1 << (self.window - 1)
+
+        # window_base = 2^(window * i) * base, multiple = j * window_base
+        points = []
+        window_base = self.base.to_jacobian()
+        for i in range(self.n_windows):
+            multiple = window_base
+            points.append(multiple)
+            for j in range(2,entries_per_window+1):
+                multiple = window_base.double() if j == 2 else multiple + window_base
+                points.append(multiple)
+            window_base = multiple.double()
+
+        points = type(window_base).batch_to_affine(points)
+        self.table = [points[i * entries_per_window:(i + 1) * entries_per_window] for i in range(self.n_windows)]
+
+        return
+
+    def multiply(self, n: int):
+        """
+        Compute n * base
+        """
+        self.build()
+        Curve = type(self.base)
+
+        n = n % self.order
+        if n > self.order // 2:
+            n -= self.order
+
+        result = None
+        for digit, window in zip(signed_digits(abs(n), self.window), self.table):
+            if digit != 0:
+                point = window[digit - 1] if digit > 0 else -window[-digit - 1]
+                result = point.to_jacobian() if result is None else result.mixed_add(point)
+
+        if result is None:
+            return Curve.point_at_infinity()
+
+        result = result.to_affine()
+
+        return result if n > 0 else -result
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the table as the concatenation of the little-endian encodings of the coordinates of its points (x, then y)
+        """
+        self.build()
+
+        out = bytearray()
+        for window in self.table:
+            for point in window:
+                out += point.x.to_bytes()
+                out += point.y.to_bytes()
+
+        return bytes(out)
+
+    def from_bytes(buf, base, window: int = 4, order: int = None):
+        """
+        Read a table serialised with to_bytes from buf (bytes, bytearray, memoryview, mmap, ...). base, window and order must be those
+        of the serialised table
+        """
+        Curve = type(base)
+        Field = type(base.x)
+
+        out = FixedBaseTable(base, window, order, lazy = True)
+        entries_per_window = 1 << (window - 1)
+        n_points = out.n_windows * entries_per_window
+
+        coordinates = Field.from_buffer_array(buf, 2 * n_points)
+        points = [Curve(coordinates[2*k], coordinates[2*k+1]) for k in range(n_points)]
+        assert(points[0] == base)
+
+        out.table = [points[i * entries_per_window:(i + 1) * entries_per_window] for i in range(out.n_windows)]
+
+        return out
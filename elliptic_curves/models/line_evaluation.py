@@ -0,0 +1,128 @@
+def slot_field(Field):
+    """
+    The first extension of the prime field in the tower of Field (e.g., Fq2 for Fq12 = Fq6[w], Fq6 = Fq2[v], and for Fq4 = Fq2[r]), or
+    Field itself if it is a prime field
+    """
+    while Field.EXTENSION_DEGREE > 1 and Field.BASE_FIELD.EXTENSION_DEGREE > 1:
+        Field = Field.BASE_FIELD
+
+    return Field
+
+def embed(x, Field):
+    """
+    Embed the element x of a subfield of the tower of Field into Field, by padding its coordinates with zeros (no multiplications)
+    """
+    if type(x) is Field:
+        return x
+
+    zeros = [Field.BASE_FIELD.zero() for i in range(Field.EXTENSION_DEGREE_OVER_BASE_FIELD - 1)]
+
+    return Field(embed(x, Field.BASE_FIELD), *zeros)
+
+def coordinates(x, Slot):
+    """
+    Coordinates of x over the subfield Slot of its tower, in the order of to_list
+    """
+    if type(x) is Slot:
+        return [x]
+
+    children = [x.x0, x.x1] if type(x).EXTENSION_DEGREE_OVER_BASE_FIELD == 2 else [x.x0, x.x1, x.x2]
+
+    return [coordinate for child in children for coordinate in coordinates(child, Slot)]
+
+def assemble(coordinates: list, Field):
+    """
+    Inverse of coordinates: the element of Field with the given coordinates over a subfield of its tower
+    """
+    if len(coordinates) == 1:
+        return embed(coordinates[0], Field)
+
+    n = Field.EXTENSION_DEGREE_OVER_BASE_FIELD
+    length = len(coordinates) // n
+
+    return Field(*[assemble(coordinates[i * length:(i + 1) * length], Field.BASE_FIELD) for i in range(n)])
+
+class LineEvaluation:
+    """
+    Sparse element of the output field of a Miller loop, used for the evaluations of lines.
+
+    The elements of Field are written in coordinates over Slot = slot_field(Field), the slots, in the order of to_list: for Fq12 = Fq6[w],
+    Fq6 = Fq2[v], slot 3i + j is the coefficient of v^j w^i, and for Fq4 = Fq2[r], slot i is the coefficient of r^i.
+    Only the non-zero slots are stored, in slots = {index: coefficient}, sorted by index. Fields implement mul_by_line_eval with kernels
+    for the sparsity patterns (see pattern) of the lines of their Miller loops
+    """
+
+    def __init__(self, Field, slots: dict):
+        self.Field = Field
+        self.slots = {index: slots[index] for index in sorted(slots) if not slots[index].is_zero()}
+
+        return
+
+    def from_element(x, Field):
+        """
+        The LineEvaluation of the element x of Field (or of a subfield of Field)
+        """
+        Slot = slot_field(Field)
+
+        if type(x).EXTENSION_DEGREE <= Slot.EXTENSION_DEGREE:
+            return LineEvaluation(Field, {0: embed(x, Slot)})
+
+        return LineEvaluation(Field, dict(enumerate(coordinates(embed(x, Field), Slot))))
+
+    def __repr__(self):
+        return f'LineEvaluation({self.slots})'
+
+    def __eq__(x,y):
+        return x.Field is y.Field and x.slots == y.slots
+
+    def __add__(x,y):
+        slots = dict(x.slots)
+        for index, coefficient in y.slots.items():
+            slots[index] = slots[index] + coefficient if index in slots else coefficient
+
+        return LineEvaluation(x.Field, slots)
+
+    def __neg__(self):
+        return LineEvaluation(self.Field, {index: -coefficient for index, coefficient in self.slots.items()})
+
+    def __sub__(x,y):
+        return x + (-y)
+
+    def __mul__(x,y):
+        """
+        Product with an element y of Field (with y.mul_by_line_eval), or with another LineEvaluation. The result is an element of Field
+        """
+        if isinstance(y, LineEvaluation):
+            y = y.to_dense()
+
+        return y.mul_by_line_eval(x)
+
+    def scale(self, c):
+        """
+        Multiply every slot by c, an element of the slot field (or of one of its subfields)
+        """
+        return LineEvaluation(self.Field, {index: coefficient * c for index, coefficient in self.slots.items()})
+
+    def pattern(self) -> tuple[int]:
+        """
+        The indices of the non-zero slots
+        """
+        return tuple(self.slots)
+
+    def is_zero(self) -> bool:
+        return len(self.slots) == 0
+
+    def to_dense(self):
+        """
+        The element of Field represented by self
+        """
+        Slot = slot_field(self.Field)
+        n_slots = self.Field.EXTENSION_DEGREE // Slot.EXTENSION_DEGREE
+
+        return assemble([self.slots[index] if index in self.slots else Slot.zero() for index in range(n_slots)], self.Field)
+
+    def invert(self):
+        """
+        The inverse of self, as an element of Field
+        """
+        return self.to_dense().invert()
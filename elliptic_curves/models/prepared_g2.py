@@ -0,0 +1,80 @@
+def curve_identifier(curve) -> list[int]:
+    """
+    Identifier of the twisted curve y^2 = x^3 + a x + b of a pairing: the modulus of its field, followed by a.to_list() and b.to_list()
+    """
+    return [type(curve.a).get_modulus()] + curve.a.to_list() + curve.b.to_list()
+
+class PreparedG2:
+    """
+    Precomputed lines of the inversion-free Miller loop (see BilinearPairing.miller_loop) for a fixed point Q of the twisted curve, computed
+    with BilinearPairing.prepare_g2. The Miller loops on a PreparedG2 only evaluate the lines at P.
+
+    The point and the coefficients (c0, cx, cy) of the lines, in the order in which the loop uses them, are stored as the integers of their
+    to_list, so that prepared points can be pickled, and serialised with to_bytes. The lines are converted to field elements at the first
+    Miller loop (see build). The twisted curve for which the point was prepared is recorded (see curve_identifier), and the Miller loops
+    check that it is theirs.
+    """
+
+    def __init__(self, curve: list[int], point: list[int], coefficients: list[int]):
+        """
+        curve is the curve_identifier of the twisted curve, point is Q.to_list() (the empty list for the point at infinity), coefficients
+        the concatenation of the to_list of the coefficients
+        """
+        self.curve = curve
+        self.point = point
+        self.coefficients = coefficients
+        self.lines = None
+
+        return
+
+    def __eq__(x,y):
+        return x.curve == y.curve and x.point == y.point and x.coefficients == y.coefficients
+
+    def __getstate__(self):
+        # The lines are recomputed from the integers after unpickling
+        return {'curve': self.curve, 'point': self.point, 'coefficients': self.coefficients, 'lines': None}
+
+    def is_infinity(self) -> bool:
+        return len(self.point) == 0
+
+    def build(self, Field):
+        """
+        Convert the coefficients to elements of Field (the field of definition of the twisted curve), grouped in lines (c0, cx, cy)
+        """
+        if self.lines is not None:
+            return
+
+        degree = Field.EXTENSION_DEGREE
+        elements = [Field.from_list(self.coefficients[i:i+degree]) for i in range(0,len(self.coefficients),degree)]
+        self.lines = [tuple(elements[i:i+3]) for i in range(0,len(elements),3)]
+
+        return
+
+    def to_bytes(self, Field) -> bytes:
+        """
+        Serialise the prepared point as the concatenation of the little-endian encodings of the integers of curve, point and coefficients,
+        with the length of the encoding of the elements of the base field of Field (the field of definition of the twisted curve)
+        """
+        length = (Field.get_modulus().bit_length() + 8) // 8
+
+        return b''.join(n.to_bytes(length=length,byteorder='little') for n in self.curve + self.point + self.coefficients)
+
+    def from_bytes(buf, Field):
+        """
+        Read a prepared point serialised with to_bytes from buf (bytes, bytearray, memoryview, mmap, ...)
+        """
+        length = (Field.get_modulus().bit_length() + 8) // 8
+        view = memoryview(buf)
+        assert(len(view) % length == 0)
+
+        integers = [int.from_bytes(view[i:i+length],byteorder='little') for i in range(0,len(view),length)]
+        n_curve = 1 + 2 * Field.EXTENSION_DEGREE
+        assert(len(integers) >= n_curve)
+        curve, integers = integers[:n_curve], integers[n_curve:]
+        if len(integers) == 0:
+            return PreparedG2(curve, [], [])
+
+        n_point = 2 * Field.EXTENSION_DEGREE
+        assert((len(integers) - n_point) % (3 * Field.EXTENSION_DEGREE) == 0)
+
+        return PreparedG2(curve, integers[:n_point], integers[n_point:])
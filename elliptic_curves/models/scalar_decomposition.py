@@ -0,0 +1,55 @@
+from fractions import Fraction
+from math import lcm
+
+class ScalarDecomposition:
+    """
+    Decomposition of scalars along an endomorphism acting on a group of order order as multiplication by eigenvalue (GLV/GLS method):
+    n = k[0] + k[1] * eigenvalue + ... + k[d-1] * eigenvalue^(d-1) mod order, with every k[i] of about order.bit_length() / d bits.
+
+    basis is a reduced basis (d vectors of length d) of the lattice {(k[0], ..., k[d-1]) : sum k[i] * eigenvalue^i = 0 mod order}.
+    The decomposition of n is (n, 0, ..., 0) minus the closest vector of the lattice found by Babai rounding: (n, 0, ..., 0) is written
+    in the basis, and its coordinates are rounded to the nearest integers
+    """
+
+    def __init__(self, basis: list[list[int]], eigenvalue: int, order: int):
+        d = len(basis)
+        assert(all(len(vector) == d for vector in basis))
+        assert(all(sum(k * pow(eigenvalue,i,order) for i, k in enumerate(vector)) % order == 0 for vector in basis))
+
+        self.basis = basis
+        self.eigenvalue = eigenvalue
+        self.order = order
+
+        # The coordinates of (n, 0, ..., 0) are n * x, where x is the solution of x * basis = (1, 0, ..., 0). It is computed with Gaussian
+        # elimination on the transpose of basis, and stored as numerators[j] / denominator
+        matrix = [[Fraction(basis[j][i]) for j in range(d)] + [Fraction(1 if i == 0 else 0)] for i in range(d)]
+        for column in range(d):
+            pivot = next(i for i in range(column, d) if matrix[i][column] != 0)
+            matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+            matrix[column] = [element / matrix[column][column] for element in matrix[column]]
+            for i in range(d):
+                if i != column and matrix[i][column] != 0:
+                    matrix[i] = [element - matrix[i][column] * pivot_element for element, pivot_element in zip(matrix[i], matrix[column])]
+
+        solution = [row[d] for row in matrix]
+        self.denominator = lcm(*[element.denominator for element in solution])
+        self.numerators = [int(element * self.denominator) for element in solution]
+
+        return
+
+    def decompose(self, n: int) -> list[int]:
+        """
+        Return the short k such that n = sum k[i] * eigenvalue^i mod order
+        """
+        n = n % self.order
+        denominator = self.denominator
+
+        # Nearest integers to the coordinates of (n, 0, ..., 0) in the basis
+        coordinates = [(2 * n * numerator + denominator) // (2 * denominator) for numerator in self.numerators]
+
+        k = [n if i == 0 else 0 for i in range(len(self.basis))]
+        for c, vector in zip(coordinates, self.basis):
+            for i in range(len(k)):
+                k[i] -= c * vector[i]
+
+        return k
@@ -8,4 +8,5 @@ setup(
                 'elliptic_curves.instantiations',
                 'elliptic_curves.models',
                 'elliptic_curves.fields'],
+    extras_require={'numpy': ['numpy']},
 )
\ No newline at end of file
@@ -1,4 +1,19 @@
-from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381, Fq12, Fq, Fq2, Fr, BLS12_381, BLS12_381_Twist
+import pickle
+
+from elliptic_curves.fields.addition_chain import compile_chain
+from elliptic_curves.models.fixed_base import FixedBaseTable
+from elliptic_curves.models.ec import msm, batch_subgroup_check_parameters
+from elliptic_curves.models.line_evaluation import LineEvaluation
+from elliptic_curves.models.prepared_g2 import PreparedG2
+from elliptic_curves.instantiations.bls12_381.bls12_381 import bls12_381, Fq12, Fq6, Fq, Fq2, Fr, BLS12_381, BLS12_381_Twist
+from elliptic_curves.instantiations.bls12_381.cyclotomic import batch_decompress
+from elliptic_curves.instantiations.bls12_381.parameters import glv_lambda, u, h_eff1, h_eff2
+
+# FqArray needs numpy, which is an optional dependency
+try:
+    from elliptic_curves.fields.fq_array import fq_array_from_base_field
+except ImportError:
+    fq_array_from_base_field = None
 
 g1 = bls12_381.g1
 g2 = bls12_381.g2
@@ -59,10 +74,561 @@ def test_deserialisation() -> bool:
 
     return True
 
+def test_batch_invert() -> bool:
+    for Field in [Fq, Fq2, Fq6, Fq12]:
+        elements = [Field.generate_random_point() for i in range(5)]
+        elements.insert(2,Field.zero())
+        inverses = Field.batch_invert(elements)
+
+        for element, inverse in zip(elements, inverses):
+            if element.is_zero():
+                assert(inverse.is_zero())
+            else:
+                assert(inverse == element.invert())
+
+        assert(Field.batch_invert([]) == [])
+        assert(Field.batch_invert([Field.zero()]) == [Field.zero()])
+
+    return True
+
+def test_frobenius() -> bool:
+    for Field, exponents in [(Fq2, range(4)), (Fq6, range(7)), (Fq12, [1,2])]:
+        a = Field.generate_random_point()
+        for n in exponents:
+            assert(a.frobenius(n) == a.power(bls12_381.q**n))
+
+    return True
+
+def test_multiplication_and_square() -> bool:
+    for Field in [Fq, Fq2, Fq6, Fq12]:
+        a = Field.generate_random_point()
+        b = Field.generate_random_point()
+        assert(a.square() == a * a)
+        assert(a * b == b * a)
+        assert((a * b) * b.invert() == a)
+        assert(a.power(7) == a * a * a * a * a * a * a)
+
+    # Elements of different prime fields cannot be added or subtracted
+    for operation in [lambda: Fq.identity() + Fr.identity(), lambda: Fq.identity() - Fr.identity()]:
+        try:
+            operation()
+            return False
+        except AssertionError:
+            pass
+
+    return True
+
+def test_cyclotomic_arithmetic() -> bool:
+    f = bls12_381.easy_exponentiation(Fq12.generate_random_point())
+
+    assert(f.cyclotomic_square() == f.square())
+    assert(super(Fq12,f).cyclotomic_square() == f.square())
+    assert(f.conjugate() == f.invert())
+    for n in [0, 1, 2, 5, -7, 2**64 + 3, bls12_381.val_miller_loop, bls12_381.val_miller_loop // 2]:
+        assert(f.cyclotomic_exp(n) == f.power(n))
+        assert(f.compressed_cyclotomic_exp(n) == f.power(n))
+    assert(Fq12.identity().compressed_cyclotomic_exp(12345) == Fq12.identity())
+
+    # Elements with b0 == a2 == 0 after the compressed squarings cannot be decompressed: the uncompressed squarings are used instead
+    g = Fq12(Fq6(Fq2.generate_random_point(), Fq2.zero(), Fq2.zero()), Fq6(Fq2.zero(), Fq2.generate_random_point(), Fq2.zero()))
+    assert(batch_decompress([g.compressed_cyclotomic_square()]) == [None])
+    squares = g
+    for i in range(10):
+        squares = squares.cyclotomic_square()
+    assert(g.repeated_cyclotomic_square(10) == squares and squares != Fq12.identity())
+    assert(g.compressed_cyclotomic_exp(2**10 + 1) == squares * g)
+
+    return True
+
+def test_windowed_exponentiation() -> bool:
+    f = Fq12.generate_random_point()
+    gt = bls12_381.easy_exponentiation(Fq12.generate_random_point())
+    table = f.power_table(255)
+    cyclotomic_table = gt.cyclotomic_power_table(255)
+
+    for i in range(3):
+        n = Fr.generate_random_point().x
+        expected = Fq12.identity()
+        for bit in bin(n)[2:]:
+            expected = expected * expected
+            if bit == '1':
+                expected = expected * f
+
+        assert(f.power(n) == expected)
+        assert(table.power(n) == expected)
+        assert(table.power(-n) == expected.invert())
+        assert(cyclotomic_table.power(n) == gt.power(n))
+        assert(cyclotomic_table.power(-n) == gt.power(n).conjugate())
+
+    return True
+
+def test_addition_chain() -> bool:
+    f = Fq12.generate_random_point()
+    gt = bls12_381.easy_exponentiation(f)
+    u = bls12_381.val_miller_loop
+
+    for n in [u, u//2, -u, 1, -1, 2**64, Fr.generate_random_point().x]:
+        assert(gt.cyclotomic_power_by_chain(compile_chain(n)) == gt.power(n))
+        assert(f.power_by_chain(compile_chain(n, signed=False)) == f.power(n))
+        assert(Fq6.identity().power_by_chain(compile_chain(n, signed=False)) == Fq6.identity())
+
+    return True
+
+
+def test_buffer_serialisation() -> bool:
+    for Field in [Fq, Fq2, Fq6, Fq12]:
+        elements = [Field.generate_random_point() for i in range(4)]
+        buffer = bytearray(b''.join(element.to_bytes() for element in elements))
+        length = len(buffer) // 4
+
+        assert(elements[0].to_bytes() == bytes(elements[0].serialise()))
+        assert(Field.from_buffer(buffer, 2 * length) == elements[2])
+        assert(Field.from_buffer(memoryview(bytes(buffer))) == elements[0])
+        assert(Field.from_buffer_array(buffer, 4) == elements)
+        assert(Field.from_buffer_array(memoryview(buffer), 2, length) == elements[1:3])
+        assert(Field.deserialise(list(buffer[:length])) == elements[0])
+
+    return True
+
+def test_fq_array() -> bool:
+    FqArray = fq_array_from_base_field(Fq)
+
+    a = [Fq.generate_random_point() for i in range(9)] + [Fq.zero(), -Fq.identity()]
+    b = [Fq.generate_random_point() for i in range(9)] + [-Fq.identity(), Fq.zero()]
+    A = FqArray.from_elements(a)
+    B = FqArray.from_elements(b)
+
+    assert(A.to_elements() == a)
+    assert(A[3] == a[3])
+    assert((A + B).to_elements() == [x + y for x, y in zip(a, b)])
+    assert((A - B).to_elements() == [x - y for x, y in zip(a, b)])
+    assert((-A).to_elements() == [-x for x in a])
+    assert((A * B).to_elements() == [x * y for x, y in zip(a, b)])
+    assert(A.square().to_elements() == [x.square() for x in a])
+    assert(A.batch_invert().to_elements() == Fq.batch_invert(a))
+
+    return True
+
+def test_sqrt() -> bool:
+    for Field in [Fq, Fr, Fq2]:
+        assert(Field.zero().sqrt() == Field.zero())
+        assert(Field.zero().legendre_symbol() == 0)
+
+        for i in range(10):
+            a = Field.generate_random_point()
+            square = a.square()
+            assert(square.is_square())
+            assert(square.legendre_symbol() == 1)
+            assert(square.sqrt().square() == square)
+
+            # a is a square iff a^((Q-1)/2) = 1, Q the order of the field
+            is_square = a.power((Field.get_modulus()**Field.EXTENSION_DEGREE - 1)//2) == Field.identity()
+            assert(a.is_square() == is_square)
+            assert((a.sqrt() is not None) == is_square)
+
+    return True
+
+def test_point_arithmetic() -> bool:
+    for generator in [g1, g2]:
+        P = generator.multiply(5)
+        Q = generator.multiply(11)
+        assert(P == generator + generator + generator + generator + generator)
+        assert(generator.multiply(-3) == -(generator + generator + generator))
+        assert(generator.multiply(bls12_381.r).is_infinity())
+
+        for to_model in [lambda R: R.to_projective(), lambda R: R.to_jacobian()]:
+            P_model = to_model(P)
+            Q_model = to_model(Q)
+
+            assert((P_model + Q_model).to_affine() == P + Q)
+            assert((P_model - Q_model).to_affine() == P - Q)
+            assert(P_model.double().to_affine() == P + P)
+            assert(P_model.mixed_add(Q).to_affine() == P + Q)
+            assert(P_model.mixed_add(P) == P_model.double())
+            assert(P_model.mixed_add(-P).is_infinity())
+            assert((P_model - P_model).is_infinity())
+            assert(P_model.multiply(-7).to_affine() == P.multiply(-7))
+            # Equality does not depend on the representative
+            assert(P_model.double() + Q_model == Q_model.double().double() + P_model.double() - Q_model.double().mixed_add(Q))
+
+    return True
+
+def test_wnaf_multiplication() -> bool:
+    for generator in [g1, g2]:
+        multiples = [type(generator).point_at_infinity()]
+        for i in range(40):
+            multiples.append(multiples[-1] + generator)
+        for n in range(-40,41):
+            assert(generator.multiply(n) == (multiples[n] if n >= 0 else -multiples[-n]))
+            assert(generator.to_projective().multiply(n) == multiples[abs(n)].to_projective().multiply(1 if n >= 0 else -1))
+            assert(generator.to_jacobian().multiply(n).to_affine() == generator.multiply(n))
+
+        # Scalars are reduced modulo the order of the curve
+        order = type(generator).CURVE.order
+        n = Fr.generate_random_point().x
+        assert(generator.multiply(n + 3 * order) == generator.multiply(n))
+        assert(generator.multiply(n - order) == generator.multiply(n))
+        assert(generator.multiply(bls12_381.r - 1) == -generator)
+
+    # Points with coordinates in an extension field are not reduced
+    untwisted_g2 = g2.to_base_curve()
+    assert(untwisted_g2.multiply(bls12_381.r).is_infinity())
+    assert(untwisted_g2.multiply(bls12_381.r + 2) == untwisted_g2 + untwisted_g2)
+
+    return True
+
+def test_fixed_base_table() -> bool:
+    for generator in [g1, g2]:
+        # The generators come with a table, the copies below do not
+        plain_generator = type(generator)(generator.x, generator.y)
+        assert(generator.fixed_base_table is not None and plain_generator.fixed_base_table is None)
+
+        # Points derived from the generator do not inherit its table
+        double = generator + generator
+        assert(double.fixed_base_table is None)
+        assert(double.multiply(1) == double and double.multiply(3) == generator.multiply(6))
+        assert((double + generator).multiply(2) == generator.multiply(6))
+        n = Fr.generate_random_point().x
+        assert(double.multiply(n) == generator.multiply(2 * n))
+
+        for n in [0, 1, -1, bls12_381.r - 1, bls12_381.r + 2, Fr.generate_random_point().x, -Fr.generate_random_point().x]:
+            assert(generator.multiply(n) == plain_generator.multiply(n))
+
+        for window in [1, 3]:
+            table = FixedBaseTable(plain_generator, window, bls12_381.r)
+            n = Fr.generate_random_point().x
+            assert(table.multiply(n) == plain_generator.multiply(n))
+
+        # Tables can be serialised and read back
+        table = FixedBaseTable.from_bytes(memoryview(generator.fixed_base_table.to_bytes()), plain_generator, 4, bls12_381.r)
+        plain_generator.attach_fixed_base_table(table)
+        n = Fr.generate_random_point().x
+        assert(plain_generator.multiply(n) == generator.multiply(n))
+
+    return True
+
+def test_msm() -> bool:
+    for generator in [g1, g2]:
+        for N in [1, 3, 40]:
+            points = [generator.multiply(Fr.generate_random_point().x) for i in range(N)]
+            scalars = [Fr.generate_random_point().x for i in range(N)]
+            if N > 1:
+                # Infinity, zero scalar, negative scalar, and a term cancelling another one
+                points[0] = type(generator).point_at_infinity()
+                scalars[1] = 0
+                scalars[2] = -bls12_381.r - scalars[2]
+            if N > 3:
+                points[3] = points[2]
+                scalars[3] = -scalars[2]
+
+            expected = type(generator).point_at_infinity()
+            for P, n in zip(points, scalars):
+                expected = expected + P.multiply(n)
+            assert(msm(points, scalars) == expected)
+
+    return True
+
+def test_batch_add() -> bool:
+    for generator in [g1, g2]:
+        Curve = type(generator)
+        infinity = Curve.point_at_infinity()
+        points = [generator.multiply(Fr.generate_random_point().x) for i in range(10)]
+
+        # Generic sums, doublings, inverses and the point at infinity
+        pairs = [(points[0], points[1]), (points[2], points[2]), (points[3], -points[3]), (infinity, points[4]), (points[5], infinity), (infinity, infinity)]
+        for (P, Q), R in zip(pairs, Curve.batch_add(pairs)):
+            assert(R == P + Q)
+
+        expected = infinity
+        for P in points:
+            expected = expected + P
+        assert(Curve.tree_sum(points) == expected)
+        assert(Curve.tree_sum(points[:3] + [-points[1]]) == points[0] + points[2])
+
+    return True
+
+def test_glv() -> bool:
+    # The endomorphism acts on G1 as multiplication by glv_lambda
+    assert(g1.endomorphism() == g1.multiply(glv_lambda))
+
+    for i in range(20):
+        n = Fr.generate_random_point().x
+        k = BLS12_381.scalar_decomposition.decompose(n)
+        assert((k[0] + k[1] * glv_lambda - n) % bls12_381.r == 0)
+        assert(all(abs(k_i).bit_length() <= 128 for k_i in k))
+
+    P = g1.multiply(Fr.generate_random_point().x)
+    for n in [0, 1, -1, glv_lambda, bls12_381.r - 1, bls12_381.r, 3 * bls12_381.r + 5] + [(-1)**i * Fr.generate_random_point().x for i in range(10)]:
+        assert(P.multiply_with_endomorphism(n) == P.multiply(n))
+    assert(BLS12_381.point_at_infinity().multiply_with_endomorphism(5).is_infinity())
+
+    return True
+
+def test_gls() -> bool:
+    # psi agrees with untwist-Frobenius-twist, and acts on G2 as multiplication by u
+    Q = g2.to_base_curve()
+    expected = BLS12_381(Q.x.frobenius(1), Q.y.frobenius(1)).to_twisted_curve()
+    assert(g2.psi() == BLS12_381_Twist(expected.x.x0.x0, expected.y.x0.x0))
+    assert(g2.psi() == g2.multiply(u))
+
+    for i in range(20):
+        n = Fr.generate_random_point().x
+        k = BLS12_381_Twist.scalar_decomposition.decompose(n)
+        assert((k[0] + k[1] * u + k[2] * u**2 + k[3] * u**3 - n) % bls12_381.r == 0)
+        assert(all(abs(k_i).bit_length() <= 64 for k_i in k))
+
+    Q = g2.multiply(Fr.generate_random_point().x)
+    for n in [0, 1, -1, u, bls12_381.r - 1, bls12_381.r, 3 * bls12_381.r + 5] + [(-1)**i * Fr.generate_random_point().x for i in range(10)]:
+        assert(Q.multiply_with_endomorphism(n) == Q.multiply(n))
+
+    return True
+
+def random_point(Curve, Field):
+    while True:
+        x = Field.generate_random_point()
+        y = (x * x * x + Curve.CURVE.a * x + Curve.CURVE.b).sqrt()
+        if y is not None:
+            return Curve(x, y)
+
+def test_subgroup_membership() -> bool:
+    for generator in [g1, g2]:
+        assert(generator.is_in_subgroup())
+        assert(generator.multiply(Fr.generate_random_point().x).is_in_subgroup())
+        assert(type(generator).point_at_infinity().is_in_subgroup())
+
+    # Random points of the curves are not in G1 and G2, except after clearing the cofactor
+    P = random_point(BLS12_381, Fq)
+    assert(not P.is_in_subgroup())
+    assert(P.multiply(bls12_381.h1).is_in_subgroup())
+    Q = random_point(BLS12_381_Twist, Fq2)
+    assert(not Q.is_in_subgroup())
+    assert(Q.multiply(bls12_381.h2).is_in_subgroup())
+
+    # Batched check
+    points = [g2.multiply(Fr.generate_random_point().x) for i in range(5)]
+    assert(BLS12_381_Twist.batch_is_in_subgroup(points))
+    assert(not BLS12_381_Twist.batch_is_in_subgroup(points + [Q]))
+
+    # A single point of small order l (a factor of the cofactor) is rejected, also by the checks on random linear combinations
+    for Curve, Field, generator, l in [(BLS12_381, Fq, g1, 3), (BLS12_381_Twist, Fq2, g2, 13)]:
+        # The l-part of the group may not be cyclic: project on it, then multiply by l until the next multiple is the point at infinity
+        m = Curve.CURVE.order
+        while m % l == 0:
+            m //= l
+        torsion = Curve.point_at_infinity()
+        while torsion.is_infinity():
+            torsion = random_point(Curve, Field).to_jacobian().multiply(m).to_affine()
+        while not torsion.multiply(l).is_infinity():
+            torsion = torsion.multiply(l)
+        assert(not torsion.is_in_subgroup())
+        rounds, bits = batch_subgroup_check_parameters(Curve.CURVE.order // Curve.CURVE.subgroup_order)
+        points = [generator.multiply(Fr.generate_random_point().x) for i in range(rounds + 1)]
+        assert(Curve.batch_is_in_subgroup(points))
+        assert(not Curve.batch_is_in_subgroup(points[:3] + [torsion]))
+        assert(not Curve.batch_is_in_subgroup(points + [torsion]))
+
+    # GT is the subgroup of order r of the cyclotomic subgroup
+    f = Fq12.generate_random_point()
+    assert(bls12_381.pairing(g1, g2).is_in_subgroup())
+    assert(not f.is_in_subgroup())
+    assert(not bls12_381.easy_exponentiation(f).is_in_subgroup())
+    assert(bls12_381.hard_exponentiation(bls12_381.easy_exponentiation(f)).is_in_subgroup())
+
+    # Deserialisation with validation
+    proof = g1.serialise() + g2.serialise() + g1.multiply(3).serialise()
+    assert(bls12_381.deserialise_proof(proof, validate = True)['c'] == g1.multiply(3))
+    try:
+        bls12_381.deserialise_proof(P.serialise() + g2.serialise() + g1.serialise(), validate = True)
+        return False
+    except ValueError:
+        pass
+
+    return True
+
+def test_cofactor_clearing() -> bool:
+    # h_eff1 = 1 - u and h_eff2 = 3 (u^2 - 1) h2 clear the cofactors: on the points of G1 and G2 obtained with h1 and h2, they act as
+    # multiplications by h_eff1 / h1 mod r and h_eff2 / h2
+    for i in range(3):
+        P = random_point(BLS12_381, Fq)
+        assert(P.clear_cofactor().is_in_subgroup())
+        assert(P.clear_cofactor() == P.multiply(bls12_381.h1).multiply(h_eff1 * pow(bls12_381.h1,-1,bls12_381.r)))
+
+        Q = random_point(BLS12_381_Twist, Fq2)
+        assert(Q.clear_cofactor().is_in_subgroup())
+        assert(Q.clear_cofactor() == Q.multiply(bls12_381.h2).multiply(h_eff2 // bls12_381.h2))
+
+    for Curve in [BLS12_381, BLS12_381_Twist]:
+        assert(Curve.point_at_infinity().clear_cofactor().is_infinity())
+
+    return True
+
+def test_compressed_serialisation() -> bool:
+    for generator in [g1, g2]:
+        Curve = type(generator)
+        Field = type(Curve.CURVE.a)
+        for P in [generator, -generator, generator.multiply(Fr.generate_random_point().x), Curve.point_at_infinity()]:
+            for compressed in [False, True]:
+                assert(Curve.deserialise(P.serialise(compressed), Field, compressed) == P)
+            assert(2 * len(P.serialise(compressed = True)) == len(P.serialise()))
+
+        # An x-coordinate with no point on the curve
+        x = Field.generate_random_point()
+        while (x * x * x + Curve.CURVE.a * x + Curve.CURVE.b).sqrt() is not None:
+            x = Field.generate_random_point()
+        try:
+            Curve.deserialise(x.serialise(), Field, compressed = True)
+            return False
+        except ValueError:
+            pass
+
+    # Proofs and verifying keys are read in either mode
+    proof = {'a': g1.multiply(3), 'b': g2.multiply(4), 'c': g1.multiply(5)}
+    vk = {'alpha': g1.multiply(6), 'beta': g2.multiply(7), 'gamma': g2.multiply(8), 'delta': g2.multiply(9), 'gamma_abc': [g1.multiply(i + 10) for i in range(3)]}
+    for compressed in [False, True]:
+        assert(bls12_381.deserialise_proof(bls12_381.serialise_proof(proof, compressed)) == proof)
+        assert(bls12_381.deserialise_proof(bls12_381.serialise_proof(proof, compressed), compressed = compressed) == proof)
+        assert(bls12_381.deserialise_vk(bls12_381.serialise_vk(vk, compressed)) == vk)
+        assert(bls12_381.deserialise_vk(bls12_381.serialise_vk(vk, compressed), compressed = compressed) == vk)
+
+    return True
+
+def test_line_evaluation() -> bool:
+    # Sparse line evaluations are the lines evaluated in Fq12
+    P = g1.multiply(Fr.generate_random_point().x)
+    Q = g2.multiply(Fr.generate_random_point().x)
+    twisted_P = P.to_twisted_curve()
+    untwisted_Q = Q.to_base_curve()
+    for T, R, S in [(Q, Q, twisted_P), (Q, Q.multiply(3), twisted_P), (untwisted_Q, untwisted_Q, P), (untwisted_Q, -untwisted_Q, P)]:
+        line_eval = T.sparse_line_evaluation(R, S)
+        if T == -R:
+            expected = S.x * Fq12.identity() - R.x * Fq12.identity()
+        else:
+            lam = T.get_lambda(R) * Fq12.identity()
+            expected = S.y * Fq12.identity() - T.y * Fq12.identity() - lam * (S.x * Fq12.identity() - T.x * Fq12.identity())
+        assert(line_eval.to_dense() == expected)
+        assert(T.line_evaluation(R, S) == expected)
+
+    # The lines on the twisted curve and on the base curve have slots 0, 1, 4 and 0, 4, 5
+    assert(Q.sparse_line_evaluation(Q, twisted_P).pattern() == (0, 1, 4))
+    assert(untwisted_Q.sparse_line_evaluation(untwisted_Q, P).pattern() == (0, 4, 5))
+
+    # The sparse multiplications agree with the dense ones
+    f = Fq12.generate_random_point()
+    for pattern in [(0, 1, 4), (0, 4, 5), (0, 2), (3,)]:
+        line_eval = LineEvaluation(Fq12, {index: Fq2.generate_random_point() for index in pattern})
+        assert(f.mul_by_line_eval(line_eval) == f * line_eval.to_dense())
+        assert(line_eval * f == f * line_eval.to_dense())
+
+    return True
+
+def test_multi_miller_loop():
+    Ps = [g1.multiply(Fr.generate_random_point().x) for i in range(4)]
+    Qs = [g2.multiply(Fr.generate_random_point().x) for i in range(4)]
+    pairs = list(zip(Ps, Qs))
+
+    # The shared loop is the product of the single loops, in every mode
+    for miller_loop_type, single_loop in [('projective', bls12_381.miller_loop), ('twisted_curve', bls12_381.miller_loop_on_twisted_curve)]:
+        product = bls12_381.miller_output_type.identity()
+        for P, Q in pairs:
+            product = product * single_loop(P, Q)
+        assert(bls12_381.multi_miller_loop(pairs, miller_loop_type) == product)
+    assert(bls12_381.multi_miller_loop(pairs[:3], 'base_curve', 'quadratic') == bls12_381.triple_miller_loop_on_base_curve(*Ps[:3], *Qs[:3], 'quadratic'))
+
+    # Pairs with the point at infinity are skipped
+    infinity_pairs = [(type(g1).point_at_infinity(), Qs[0]), (Ps[0], type(g2).point_at_infinity())]
+    assert(bls12_381.multi_miller_loop(pairs + infinity_pairs) == bls12_381.multi_miller_loop(pairs))
+    assert(bls12_381.multi_miller_loop(infinity_pairs) == bls12_381.miller_output_type.identity())
+
+def test_prepared_g2():
+    P = g1.multiply(Fr.generate_random_point().x)
+    Q = g2.multiply(Fr.generate_random_point().x)
+    prepared = bls12_381.prepare_g2(Q)
+
+    # The Miller loops on the prepared point are those on Q
+    assert(bls12_381.multi_miller_loop([(P, prepared)]) == bls12_381.miller_loop(P, Q))
+    assert(bls12_381.multi_miller_loop([(P, prepared), (g1, g2)]) == bls12_381.miller_loop(P, Q) * bls12_381.miller_loop(g1, g2))
+
+    # Pickling and serialisation
+    unpickled = pickle.loads(pickle.dumps(prepared))
+    assert(unpickled == prepared and unpickled.lines is None)
+    deserialised = PreparedG2.from_bytes(prepared.to_bytes(Fq2), Fq2)
+    assert(deserialised == prepared)
+    assert(bls12_381.multi_miller_loop([(P, deserialised)]) == bls12_381.miller_loop(P, Q))
+
+    # Prepared points are only accepted by the pairing for which they were prepared
+    other_curve = PreparedG2([prepared.curve[0] + 2] + prepared.curve[1:], prepared.point, prepared.coefficients)
+    rejected = False
+    try:
+        bls12_381.multi_miller_loop([(P, other_curve)])
+    except AssertionError:
+        rejected = True
+    assert(rejected)
+
+    # The point at infinity
+    infinity = bls12_381.prepare_g2(type(g2).point_at_infinity())
+    assert(infinity.is_infinity())
+    assert(PreparedG2.from_bytes(infinity.to_bytes(Fq2), Fq2).is_infinity())
+    assert(bls12_381.multi_miller_loop([(P, infinity)]) == bls12_381.miller_output_type.identity())
+
+def test_pairing_product():
+    a, b = Fr.generate_random_point().x, Fr.generate_random_point().x
+    P, Q = g1.multiply(a), g2.multiply(b)
+
+    # e(aG1, bG2) e(-abG1, G2) = 1
+    pairs = [(P, Q), (-g1.multiply(a * b), g2)]
+    assert(bls12_381.pairing_product_is_one(pairs))
+    assert(bls12_381.pairing_product_is_one([(P, bls12_381.prepare_g2(Q)), (-g1.multiply(a * b), bls12_381.prepare_g2(g2))]))
+    assert(not bls12_381.pairing_product_is_one([(P, Q), (g1, g2)]))
+    assert(bls12_381.pairing_product([(P, Q), (g1, g2)]) == bls12_381.pairing(P, Q) * pairing_g1_g2)
+
+    # The points at infinity are neutral
+    infinity_pairs = [(type(g1).point_at_infinity(), Q), (P, type(g2).point_at_infinity())]
+    assert(bls12_381.pairing_product(infinity_pairs + [(g1, g2)]) == pairing_g1_g2)
+    assert(bls12_381.pairing_product_is_one(infinity_pairs))
+    assert(bls12_381.pairing_product_is_one([]))
+    assert(bls12_381.triple_pairing(g1, type(g1).point_at_infinity(), g1, g2, g2, g2) == pairing_g1_g2.power(2))
+
+def test_projective_miller_loop():
+    # The sparse multiplication agrees with the dense one
+    f = Fq12.generate_random_point()
+    c0, c1, c4 = Fq2.generate_random_point(), Fq2.generate_random_point(), Fq2.generate_random_point()
+    assert(f.mul_by_014(c0, c1, c4) == f * Fq12(Fq6(c0, c1, Fq2.zero()), Fq6(Fq2.zero(), c4, Fq2.zero())))
+
+    # The inversion-free Miller loop gives the same pairing as the affine one
+    for i in range(3):
+        P = g1.multiply(Fr.generate_random_point().x)
+        Q = g2.multiply(Fr.generate_random_point().x)
+        miller_output = bls12_381.miller_loop_on_base_curve(P,Q)
+        assert(bls12_381.pairing(P,Q) == bls12_381.hard_exponentiation(bls12_381.easy_exponentiation(miller_output)))
 
 assert(test_pairing())
 assert(test_triple_pairing())
 assert(test_deserialisation())
+assert(test_batch_invert())
+assert(test_frobenius())
+assert(test_multiplication_and_square())
+assert(test_cyclotomic_arithmetic())
+assert(test_windowed_exponentiation())
+assert(test_addition_chain())
+assert(test_buffer_serialisation())
+assert(test_sqrt())
+assert(test_point_arithmetic())
+assert(test_wnaf_multiplication())
+assert(test_fixed_base_table())
+assert(test_msm())
+assert(test_batch_add())
+assert(test_glv())
+assert(test_gls())
+assert(test_subgroup_membership())
+assert(test_cofactor_clearing())
+assert(test_compressed_serialisation())
+assert(test_line_evaluation())
+test_projective_miller_loop()
+test_multi_miller_loop()
+test_prepared_g2()
+test_pairing_product()
+if fq_array_from_base_field is not None:
+    assert(test_fq_array())
 
 print("BLS12_381: all tests successful")
 
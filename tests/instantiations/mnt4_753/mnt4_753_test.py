@@ -1,4 +1,16 @@
-from elliptic_curves.instantiations.mnt4_753.mnt4_753 import Fq4, mnt4_753, Fr
+import pickle
+
+from elliptic_curves.models.fixed_base import FixedBaseTable
+from elliptic_curves.models.ec import msm, batch_subgroup_check_parameters
+from elliptic_curves.models.line_evaluation import LineEvaluation
+from elliptic_curves.models.prepared_g2 import PreparedG2
+from elliptic_curves.instantiations.mnt4_753.mnt4_753 import Fq, Fq2, Fq4, mnt4_753, Fr, MNT4_753, MNT4_753_Twist
+
+# FqArray needs numpy, which is an optional dependency
+try:
+    from elliptic_curves.fields.fq_array import fq_array_from_base_field
+except ImportError:
+    fq_array_from_base_field = None
 
 g1 = mnt4_753.g1
 g2 = mnt4_753.g2
@@ -33,9 +45,455 @@ def test_triple_pairing() -> bool:
     triple_pairing = mnt4_753.triple_pairing(P1,P2,P3,Q1,Q2,Q3)
     return triple_pairing == pairing_g1_g2.power(3)
 
+def test_batch_invert() -> bool:
+    for Field in [Fq, Fq2, Fq4]:
+        elements = [Field.generate_random_point() for i in range(5)]
+        elements.insert(0,Field.zero())
+        inverses = Field.batch_invert(elements)
+
+        for element, inverse in zip(elements, inverses):
+            if element.is_zero():
+                assert(inverse.is_zero())
+            else:
+                assert(inverse == element.invert())
+
+    return True
+
+def test_frobenius() -> bool:
+    for Field in [Fq2, Fq4]:
+        a = Field.generate_random_point()
+        for n in range(5):
+            assert(a.frobenius(n) == a.power(mnt4_753.q**n))
+
+    return True
+
+def test_multiplication_and_square() -> bool:
+    for Field in [Fq, Fq2, Fq4]:
+        a = Field.generate_random_point()
+        b = Field.generate_random_point()
+        assert(a.square() == a * a)
+        assert(a * b == b * a)
+        assert((a * b) * b.invert() == a)
+        assert(a.power(7) == a * a * a * a * a * a * a)
+
+    # Elements of different prime fields cannot be added or subtracted
+    for operation in [lambda: Fq.identity() + Fr.identity(), lambda: Fq.identity() - Fr.identity()]:
+        try:
+            operation()
+            return False
+        except AssertionError:
+            pass
+
+    return True
+
+def test_cyclotomic_arithmetic() -> bool:
+    f = mnt4_753.easy_exponentiation(Fq4.generate_random_point())
+
+    assert(f.cyclotomic_square() == f.square())
+    assert(f.conjugate() == f.invert())
+    for n in [0, 1, 2, 5, -7, mnt4_753.val_miller_loop]:
+        assert(f.cyclotomic_exp(n) == f.power(n))
+
+    return True
+
+
+def test_buffer_serialisation() -> bool:
+    for Field in [Fq, Fq2, Fq4]:
+        elements = [Field.generate_random_point() for i in range(4)]
+        buffer = bytearray(b''.join(element.to_bytes() for element in elements))
+        length = len(buffer) // 4
+
+        assert(elements[0].to_bytes() == bytes(elements[0].serialise()))
+        assert(Field.from_buffer(buffer, 2 * length) == elements[2])
+        assert(Field.from_buffer(memoryview(bytes(buffer))) == elements[0])
+        assert(Field.from_buffer_array(buffer, 4) == elements)
+        assert(Field.from_buffer_array(memoryview(buffer), 2, length) == elements[1:3])
+        assert(Field.deserialise(list(buffer[:length])) == elements[0])
+
+    return True
+
+def test_fq_array() -> bool:
+    FqArray = fq_array_from_base_field(Fq)
+
+    a = [Fq.generate_random_point() for i in range(9)] + [Fq.zero(), -Fq.identity()]
+    b = [Fq.generate_random_point() for i in range(9)] + [-Fq.identity(), Fq.zero()]
+    A = FqArray.from_elements(a)
+    B = FqArray.from_elements(b)
+
+    assert(A.to_elements() == a)
+    assert(A[3] == a[3])
+    assert((A + B).to_elements() == [x + y for x, y in zip(a, b)])
+    assert((A - B).to_elements() == [x - y for x, y in zip(a, b)])
+    assert((-A).to_elements() == [-x for x in a])
+    assert((A * B).to_elements() == [x * y for x, y in zip(a, b)])
+    assert(A.square().to_elements() == [x.square() for x in a])
+    assert(A.batch_invert().to_elements() == Fq.batch_invert(a))
+
+    return True
+
+def test_sqrt() -> bool:
+    for Field in [Fq, Fr, Fq2, Fq4]:
+        assert(Field.zero().sqrt() == Field.zero())
+        assert(Field.zero().legendre_symbol() == 0)
+
+        for i in range(10):
+            a = Field.generate_random_point()
+            square = a.square()
+            assert(square.is_square())
+            assert(square.legendre_symbol() == 1)
+            assert(square.sqrt().square() == square)
+
+            # a is a square iff a^((Q-1)/2) = 1, Q the order of the field
+            is_square = a.power((Field.get_modulus()**Field.EXTENSION_DEGREE - 1)//2) == Field.identity()
+            assert(a.is_square() == is_square)
+            assert((a.sqrt() is not None) == is_square)
+
+    return True
+
+def test_point_arithmetic() -> bool:
+    for generator in [g1, g2]:
+        P = generator.multiply(5)
+        Q = generator.multiply(11)
+        assert(P == generator + generator + generator + generator + generator)
+        assert(generator.multiply(-3) == -(generator + generator + generator))
+        assert(generator.multiply(mnt4_753.r).is_infinity())
+
+        for to_model in [lambda R: R.to_projective(), lambda R: R.to_jacobian()]:
+            P_model = to_model(P)
+            Q_model = to_model(Q)
+
+            assert((P_model + Q_model).to_affine() == P + Q)
+            assert((P_model - Q_model).to_affine() == P - Q)
+            assert(P_model.double().to_affine() == P + P)
+            assert(P_model.mixed_add(Q).to_affine() == P + Q)
+            assert(P_model.mixed_add(P) == P_model.double())
+            assert(P_model.mixed_add(-P).is_infinity())
+            assert((P_model - P_model).is_infinity())
+            assert(P_model.multiply(-7).to_affine() == P.multiply(-7))
+            # Equality does not depend on the representative
+            assert(P_model.double() + Q_model == Q_model.double().double() + P_model.double() - Q_model.double().mixed_add(Q))
+
+    return True
+
+def test_wnaf_multiplication() -> bool:
+    for generator in [g1, g2]:
+        multiples = [type(generator).point_at_infinity()]
+        for i in range(40):
+            multiples.append(multiples[-1] + generator)
+        for n in range(-40,41):
+            assert(generator.multiply(n) == (multiples[n] if n >= 0 else -multiples[-n]))
+            assert(generator.to_projective().multiply(n) == multiples[abs(n)].to_projective().multiply(1 if n >= 0 else -1))
+            assert(generator.to_jacobian().multiply(n).to_affine() == generator.multiply(n))
+
+        # Scalars are reduced modulo the order of the curve
+        order = type(generator).CURVE.order
+        n = Fr.generate_random_point().x
+        assert(generator.multiply(n + 3 * order) == generator.multiply(n))
+        assert(generator.multiply(n - order) == generator.multiply(n))
+        assert(generator.multiply(mnt4_753.r - 1) == -generator)
+
+    # Points with coordinates in an extension field are not reduced
+    untwisted_g2 = g2.to_base_curve()
+    assert(untwisted_g2.multiply(mnt4_753.r).is_infinity())
+    assert(untwisted_g2.multiply(mnt4_753.r + 2) == untwisted_g2 + untwisted_g2)
+
+    return True
+
+def test_fixed_base_table() -> bool:
+    for generator in [g1, g2]:
+        # The generators come with a table, the copies below do not
+        plain_generator = type(generator)(generator.x, generator.y)
+        assert(generator.fixed_base_table is not None and plain_generator.fixed_base_table is None)
+
+        # Points derived from the generator do not inherit its table
+        double = generator + generator
+        assert(double.fixed_base_table is None)
+        assert(double.multiply(1) == double and double.multiply(3) == generator.multiply(6))
+        assert((double + generator).multiply(2) == generator.multiply(6))
+        n = Fr.generate_random_point().x
+        assert(double.multiply(n) == generator.multiply(2 * n))
+
+        for n in [0, 1, -1, mnt4_753.r - 1, mnt4_753.r + 2, Fr.generate_random_point().x, -Fr.generate_random_point().x]:
+            assert(generator.multiply(n) == plain_generator.multiply(n))
+
+        for window in [1, 3]:
+            table = FixedBaseTable(plain_generator, window, mnt4_753.r)
+            n = Fr.generate_random_point().x
+            assert(table.multiply(n) == plain_generator.multiply(n))
+
+        # Tables can be serialised and read back
+        table = FixedBaseTable.from_bytes(memoryview(generator.fixed_base_table.to_bytes()), plain_generator, 4, mnt4_753.r)
+        plain_generator.attach_fixed_base_table(table)
+        n = Fr.generate_random_point().x
+        assert(plain_generator.multiply(n) == generator.multiply(n))
+
+    return True
+
+def test_msm() -> bool:
+    for generator in [g1, g2]:
+        for N in [1, 3, 40]:
+            points = [generator.multiply(Fr.generate_random_point().x) for i in range(N)]
+            scalars = [Fr.generate_random_point().x for i in range(N)]
+            if N > 1:
+                # Infinity, zero scalar, negative scalar, and a term cancelling another one
+                points[0] = type(generator).point_at_infinity()
+                scalars[1] = 0
+                scalars[2] = -mnt4_753.r - scalars[2]
+            if N > 3:
+                points[3] = points[2]
+                scalars[3] = -scalars[2]
+
+            expected = type(generator).point_at_infinity()
+            for P, n in zip(points, scalars):
+                expected = expected + P.multiply(n)
+            assert(msm(points, scalars) == expected)
+
+    return True
+
+def test_batch_add() -> bool:
+    for generator in [g1, g2]:
+        Curve = type(generator)
+        infinity = Curve.point_at_infinity()
+        points = [generator.multiply(Fr.generate_random_point().x) for i in range(10)]
+
+        # Generic sums, doublings, inverses and the point at infinity
+        pairs = [(points[0], points[1]), (points[2], points[2]), (points[3], -points[3]), (infinity, points[4]), (points[5], infinity), (infinity, infinity)]
+        for (P, Q), R in zip(pairs, Curve.batch_add(pairs)):
+            assert(R == P + Q)
+
+        expected = infinity
+        for P in points:
+            expected = expected + P
+        assert(Curve.tree_sum(points) == expected)
+        assert(Curve.tree_sum(points[:3] + [-points[1]]) == points[0] + points[2])
+
+    return True
+
+def random_point(Curve, Field):
+    while True:
+        x = Field.generate_random_point()
+        y = (x * x * x + Curve.CURVE.a * x + Curve.CURVE.b).sqrt()
+        if y is not None:
+            return Curve(x, y)
+
+def test_subgroup_membership() -> bool:
+    for generator in [g1, g2]:
+        assert(generator.is_in_subgroup())
+        assert(generator.multiply(Fr.generate_random_point().x).is_in_subgroup())
+        assert(type(generator).point_at_infinity().is_in_subgroup())
+
+    # G1 is the whole curve
+    P = random_point(MNT4_753, Fq)
+    assert(P.is_in_subgroup())
+    # Random points of the twist are not in G2, except after clearing the cofactor
+    Q = random_point(MNT4_753_Twist, Fq2)
+    assert(not Q.is_in_subgroup())
+    assert(Q.multiply(mnt4_753.h2).is_in_subgroup())
+
+    # Batched check
+    points = [g2.multiply(Fr.generate_random_point().x) for i in range(5)]
+    assert(MNT4_753_Twist.batch_is_in_subgroup(points))
+    assert(not MNT4_753_Twist.batch_is_in_subgroup(points + [Q]))
+
+    # A single point of small order l (a factor of the cofactor) is rejected, also by the checks on random linear combinations
+    for Curve, Field, generator, l in [(MNT4_753_Twist, Fq2, g2, 11)]:
+        # The l-part of the group may not be cyclic: project on it, then multiply by l until the next multiple is the point at infinity
+        m = Curve.CURVE.order
+        while m % l == 0:
+            m //= l
+        torsion = Curve.point_at_infinity()
+        while torsion.is_infinity():
+            torsion = random_point(Curve, Field).to_jacobian().multiply(m).to_affine()
+        while not torsion.multiply(l).is_infinity():
+            torsion = torsion.multiply(l)
+        assert(not torsion.is_in_subgroup())
+        rounds, bits = batch_subgroup_check_parameters(Curve.CURVE.order // Curve.CURVE.subgroup_order)
+        points = [generator.multiply(Fr.generate_random_point().x) for i in range(rounds + 1)]
+        assert(Curve.batch_is_in_subgroup(points))
+        assert(not Curve.batch_is_in_subgroup(points[:3] + [torsion]))
+        assert(not Curve.batch_is_in_subgroup(points + [torsion]))
+
+    # GT is the subgroup of order r of the cyclotomic subgroup
+    f = Fq4.generate_random_point()
+    assert(mnt4_753.pairing(g1, g2).is_in_subgroup())
+    assert(not f.is_in_subgroup())
+    assert(not mnt4_753.easy_exponentiation(f).is_in_subgroup())
+    assert(mnt4_753.hard_exponentiation(mnt4_753.easy_exponentiation(f)).is_in_subgroup())
+
+    # Deserialisation with validation
+    proof = g1.serialise() + g2.serialise() + g1.multiply(3).serialise()
+    assert(mnt4_753.deserialise_proof(proof, validate = True)['c'] == g1.multiply(3))
+    try:
+        mnt4_753.deserialise_proof(g1.serialise() + Q.serialise() + g1.serialise(), validate = True)
+        return False
+    except ValueError:
+        pass
+
+    return True
+
+def test_cofactor_clearing() -> bool:
+    Q = random_point(MNT4_753_Twist, Fq2)
+    assert(Q.clear_cofactor() == Q.multiply(mnt4_753.h2))
+    assert(Q.clear_cofactor().is_in_subgroup())
+
+    # G1 is the whole curve
+    P = random_point(MNT4_753, Fq)
+    assert(P.clear_cofactor() == P)
+
+    return True
+
+def test_compressed_serialisation() -> bool:
+    for generator in [g1, g2]:
+        Curve = type(generator)
+        Field = type(Curve.CURVE.a)
+        for P in [generator, -generator, generator.multiply(Fr.generate_random_point().x), Curve.point_at_infinity()]:
+            for compressed in [False, True]:
+                assert(Curve.deserialise(P.serialise(compressed), Field, compressed) == P)
+            assert(2 * len(P.serialise(compressed = True)) == len(P.serialise()))
+
+        # An x-coordinate with no point on the curve
+        x = Field.generate_random_point()
+        while (x * x * x + Curve.CURVE.a * x + Curve.CURVE.b).sqrt() is not None:
+            x = Field.generate_random_point()
+        try:
+            Curve.deserialise(x.serialise(), Field, compressed = True)
+            return False
+        except ValueError:
+            pass
+
+    # Proofs and verifying keys are read in either mode
+    proof = {'a': g1.multiply(3), 'b': g2.multiply(4), 'c': g1.multiply(5)}
+    vk = {'alpha': g1.multiply(6), 'beta': g2.multiply(7), 'gamma': g2.multiply(8), 'delta': g2.multiply(9), 'gamma_abc': [g1.multiply(i + 10) for i in range(3)]}
+    for compressed in [False, True]:
+        assert(mnt4_753.deserialise_proof(mnt4_753.serialise_proof(proof, compressed)) == proof)
+        assert(mnt4_753.deserialise_proof(mnt4_753.serialise_proof(proof, compressed), compressed = compressed) == proof)
+        assert(mnt4_753.deserialise_vk(mnt4_753.serialise_vk(vk, compressed)) == vk)
+        assert(mnt4_753.deserialise_vk(mnt4_753.serialise_vk(vk, compressed), compressed = compressed) == vk)
+
+    return True
+
+def test_line_evaluation() -> bool:
+    # Sparse line evaluations are the lines evaluated in Fq4
+    P = g1.multiply(Fr.generate_random_point().x)
+    Q = g2.multiply(Fr.generate_random_point().x)
+    twisted_P = P.to_twisted_curve()
+    untwisted_Q = Q.to_base_curve()
+    for T, R, S in [(Q, Q, twisted_P), (Q, Q.multiply(3), twisted_P), (untwisted_Q, untwisted_Q, P), (Q, -Q, twisted_P)]:
+        line_eval = T.sparse_line_evaluation(R, S)
+        if T == -R:
+            expected = S.x * Fq4.identity() - R.x * Fq4.identity()
+        else:
+            lam = T.get_lambda(R) * Fq4.identity()
+            expected = S.y * Fq4.identity() - T.y * Fq4.identity() - lam * (S.x * Fq4.identity() - T.x * Fq4.identity())
+        assert(line_eval.to_dense() == expected)
+        assert(T.line_evaluation(R, S) == expected)
+
+    # The sparse multiplications agree with the dense ones
+    f = Fq4.generate_random_point()
+    for pattern in [(0, 1), (0,), (1,)]:
+        line_eval = LineEvaluation(Fq4, {index: Fq2.generate_random_point() for index in pattern})
+        assert(f.mul_by_line_eval(line_eval) == f * line_eval.to_dense())
+
+    return True
+
+def test_multi_miller_loop():
+    Ps = [g1.multiply(Fr.generate_random_point().x) for i in range(3)]
+    Qs = [g2.multiply(Fr.generate_random_point().x) for i in range(3)]
+    pairs = list(zip(Ps, Qs))
+
+    # The shared loop is the product of the single loops, in every mode
+    for miller_loop_type, single_loop in [('projective', mnt4_753.miller_loop), ('twisted_curve', mnt4_753.miller_loop_on_twisted_curve)]:
+        product = mnt4_753.miller_output_type.identity()
+        for P, Q in pairs:
+            product = product * single_loop(P, Q)
+        assert(mnt4_753.multi_miller_loop(pairs, miller_loop_type) == product)
+    assert(mnt4_753.multi_miller_loop(pairs[:3], 'base_curve', 'quadratic') == mnt4_753.triple_miller_loop_on_base_curve(*Ps[:3], *Qs[:3], 'quadratic'))
+
+    # Pairs with the point at infinity are skipped
+    infinity_pairs = [(type(g1).point_at_infinity(), Qs[0]), (Ps[0], type(g2).point_at_infinity())]
+    assert(mnt4_753.multi_miller_loop(pairs + infinity_pairs) == mnt4_753.multi_miller_loop(pairs))
+    assert(mnt4_753.multi_miller_loop(infinity_pairs) == mnt4_753.miller_output_type.identity())
+
+def test_prepared_g2():
+    P = g1.multiply(Fr.generate_random_point().x)
+    Q = g2.multiply(Fr.generate_random_point().x)
+    prepared = mnt4_753.prepare_g2(Q)
+
+    # The Miller loops on the prepared point are those on Q
+    assert(mnt4_753.multi_miller_loop([(P, prepared)]) == mnt4_753.miller_loop(P, Q))
+    assert(mnt4_753.multi_miller_loop([(P, prepared), (g1, g2)]) == mnt4_753.miller_loop(P, Q) * mnt4_753.miller_loop(g1, g2))
+
+    # Pickling and serialisation
+    unpickled = pickle.loads(pickle.dumps(prepared))
+    assert(unpickled == prepared and unpickled.lines is None)
+    deserialised = PreparedG2.from_bytes(prepared.to_bytes(Fq2), Fq2)
+    assert(deserialised == prepared)
+    assert(mnt4_753.multi_miller_loop([(P, deserialised)]) == mnt4_753.miller_loop(P, Q))
+
+    # Prepared points are only accepted by the pairing for which they were prepared
+    other_curve = PreparedG2([prepared.curve[0] + 2] + prepared.curve[1:], prepared.point, prepared.coefficients)
+    rejected = False
+    try:
+        mnt4_753.multi_miller_loop([(P, other_curve)])
+    except AssertionError:
+        rejected = True
+    assert(rejected)
+
+    # The point at infinity
+    infinity = mnt4_753.prepare_g2(type(g2).point_at_infinity())
+    assert(infinity.is_infinity())
+    assert(PreparedG2.from_bytes(infinity.to_bytes(Fq2), Fq2).is_infinity())
+    assert(mnt4_753.multi_miller_loop([(P, infinity)]) == mnt4_753.miller_output_type.identity())
+
+def test_pairing_product():
+    a, b = Fr.generate_random_point().x, Fr.generate_random_point().x
+    P, Q = g1.multiply(a), g2.multiply(b)
+
+    # e(aG1, bG2) e(-abG1, G2) = 1
+    pairs = [(P, Q), (-g1.multiply(a * b), g2)]
+    assert(mnt4_753.pairing_product_is_one(pairs))
+    assert(mnt4_753.pairing_product_is_one([(P, mnt4_753.prepare_g2(Q)), (-g1.multiply(a * b), mnt4_753.prepare_g2(g2))]))
+    assert(not mnt4_753.pairing_product_is_one([(P, Q), (g1, g2)]))
+    assert(mnt4_753.pairing_product([(P, Q), (g1, g2)]) == mnt4_753.pairing(P, Q) * pairing_g1_g2)
+
+    # The points at infinity are neutral
+    infinity_pairs = [(type(g1).point_at_infinity(), Q), (P, type(g2).point_at_infinity())]
+    assert(mnt4_753.pairing_product(infinity_pairs + [(g1, g2)]) == pairing_g1_g2)
+    assert(mnt4_753.pairing_product_is_one(infinity_pairs))
+    assert(mnt4_753.pairing_product_is_one([]))
+    assert(mnt4_753.triple_pairing(g1, type(g1).point_at_infinity(), g1, g2, g2, g2) == pairing_g1_g2.power(2))
+
+def test_projective_miller_loop():
+    # The inversion-free Miller loop gives the same pairing as the affine one
+    for i in range(2):
+        P = g1.multiply(Fr.generate_random_point().x)
+        Q = g2.multiply(Fr.generate_random_point().x)
+        miller_output = mnt4_753.miller_loop_on_base_curve(P,Q)
+        assert(mnt4_753.pairing(P,Q) == mnt4_753.hard_exponentiation(mnt4_753.easy_exponentiation(miller_output)))
 
 assert(test_pairing())
 assert(test_triple_pairing())
+assert(test_batch_invert())
+assert(test_frobenius())
+assert(test_multiplication_and_square())
+assert(test_cyclotomic_arithmetic())
+assert(test_buffer_serialisation())
+assert(test_sqrt())
+assert(test_point_arithmetic())
+assert(test_wnaf_multiplication())
+assert(test_fixed_base_table())
+assert(test_msm())
+assert(test_batch_add())
+assert(test_subgroup_membership())
+assert(test_cofactor_clearing())
+assert(test_compressed_serialisation())
+assert(test_line_evaluation())
+test_projective_miller_loop()
+test_multi_miller_loop()
+test_prepared_g2()
+test_pairing_product()
+if fq_array_from_base_field is not None:
+    assert(test_fq_array())
 
 print("MNT4_753: all tests successful")
 